@@ -0,0 +1,250 @@
+import argparse
+import json
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from game_rng import CHANCE_AMOUNTS
+from simulator import AlwaysBuyPolicy, NeverBuyPolicy, CautiousPolicy
+
+# Square type codes used by the packed board arrays
+GO = 0
+PROPERTY = 1
+INCOME_TAX = 2
+CHANCE = 3
+GO_TO_JAIL = 4
+NO_EFFECT = 5
+
+TYPE_CODES = {
+    'Go': GO,
+    'Property': PROPERTY,
+    'Income Tax': INCOME_TAX,
+    'Chance': CHANCE,
+    'Go to Jail': GO_TO_JAIL,
+}
+
+START_CASH = 1500
+GO_SALARY = 1500
+JAIL_FINE = 150
+NO_OWNER = -1
+
+
+def policy_parameters(policy):
+    # Fixed policies reduce to two cash thresholds: buy when cash - price >= buy_reserve,
+    # pay the jail fine when cash - 150 >= jail_reserve (otherwise roll for doubles).
+    if isinstance(policy, NeverBuyPolicy):
+        return float('inf'), float('inf')
+    if isinstance(policy, CautiousPolicy):
+        return policy.reserve, policy.reserve
+    if type(policy) is AlwaysBuyPolicy:
+        return 0, float('inf')
+    raise ValueError(f"{type(policy).__name__} has no fixed batch equivalent.")
+
+
+class BatchEngine:
+    def __init__(self, map_data, num_games, policies, seed=None, max_rounds=100):
+        if np is None:
+            raise ImportError("BatchEngine requires numpy (pip install numpy).")
+        self.map_size = map_data['map_size']
+        self.num_games = num_games
+        self.num_players = len(policies)
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+
+        size = self.map_size
+        self.types = np.full(size, NO_EFFECT, dtype=np.int8)
+        self.prices = np.zeros(size, dtype=np.int64)
+        self.rents = np.zeros(size, dtype=np.int64)
+        self.jail_position = -1
+        for pos_str, sq in map_data['squares'].items():
+            pos = int(pos_str) - 1
+            square_type = sq['square_type']
+            self.types[pos] = TYPE_CODES.get(square_type, NO_EFFECT)
+            if square_type == 'Property':
+                self.prices[pos] = sq['price']
+                self.rents[pos] = sq['rent']
+            elif square_type == 'In Jail/Just Visiting' and self.jail_position < 0:
+                self.jail_position = pos
+
+        params = [policy_parameters(p) for p in policies]
+        self.buy_reserve = [max(buy, 0) for buy, _ in params]
+        self.jail_reserve = [jail for _, jail in params]
+        self.chance_amounts = np.array(CHANCE_AMOUNTS, dtype=np.int64)
+
+        shape = (num_games, self.num_players)
+        self.position = np.zeros(shape, dtype=np.int64)
+        self.cash = np.full(shape, START_CASH, dtype=np.int64)
+        self.in_jail = np.zeros(shape, dtype=bool)
+        self.jail_turns = np.zeros(shape, dtype=np.int64)
+        self.bankrupt = np.zeros(shape, dtype=bool)
+        self.owner = np.full((num_games, size), NO_OWNER, dtype=np.int16)
+        self.active = np.full(num_games, self.num_players, dtype=np.int64)
+        self.round_num = np.ones(num_games, dtype=np.int64)
+        self.done = self.active <= 1
+        self.landings = np.zeros(size, dtype=np.int64)
+
+    @classmethod
+    def from_map_file(cls, map_file, num_games, policies, seed=None, max_rounds=100):
+        with open(map_file, 'r') as f:
+            map_data = json.load(f)
+        return cls(map_data, num_games, policies, seed, max_rounds)
+
+    def run(self):
+        while not self.done.all():
+            for seat in range(self.num_players):
+                games = np.nonzero(~self.done & ~self.bankrupt[:, seat])[0]
+                if games.size == 0:
+                    continue
+                jailed = self.in_jail[games, seat]
+                movers = games[~jailed]
+                if jailed.any():
+                    movers = np.concatenate((movers, self._jail_turn(games[jailed], seat)))
+                if movers.size:
+                    self._move(movers, seat)
+                self.done[games[self.active[games] <= 1]] = True
+            running = ~self.done
+            self.round_num[running] += 1
+            self.done |= self.round_num > self.max_rounds
+        return self.results()
+
+    def results(self):
+        best = self.cash.max(axis=1, keepdims=True)
+        return {
+            'winners': self.cash == best,
+            'round_num': self.round_num,
+            'cash': self.cash,
+            'bankrupt': self.bankrupt,
+        }
+
+    def summary(self):
+        winners = self.cash == self.cash.max(axis=1, keepdims=True)
+        return {
+            'games': self.num_games,
+            'win_share': (winners / winners.sum(axis=1, keepdims=True)).mean(axis=0),
+            'mean_rounds': float(self.round_num.mean()),
+            'bankrupt_rate': self.bankrupt.mean(axis=0),
+            'landing_share': self.landings / max(int(self.landings.sum()), 1),
+        }
+
+    def _roll(self, count):
+        dice = self.rng.integers(1, 5, size=(count, 2))
+        return dice[:, 0], dice[:, 1]
+
+    def _declare_bankrupt(self, games, seat, release=True):
+        self.bankrupt[games, seat] = True
+        self.active[games] -= 1
+        if release:
+            owners = self.owner[games]
+            owners[owners == seat] = NO_OWNER
+            self.owner[games] = owners
+
+    def _check_bankruptcy(self, games, seat):
+        broke = games[self.cash[games, seat] < 0]
+        if broke.size:
+            self._declare_bankrupt(broke, seat)
+        return broke
+
+    def _jail_turn(self, games, seat):
+        # Mirrors GameController.handle_jail; returns the games whose player moves this turn
+        cash = self.cash[games, seat]
+        early = self.jail_turns[games, seat] < 2
+        pay = cash - JAIL_FINE >= self.jail_reserve[seat]
+        can_pay = cash >= JAIL_FINE
+
+        rollers = games[early & ~pay]
+        dice1, dice2 = self._roll(rollers.size)
+        doubles = dice1 == dice2
+        self.jail_turns[rollers[~doubles], seat] += 1
+
+        fined = games[(early & pay & can_pay) | (~early & can_pay)]
+        self.cash[fined, seat] -= JAIL_FINE
+
+        released = np.concatenate((rollers[doubles], fined))
+        self.in_jail[released, seat] = False
+        self.jail_turns[released, seat] = 0
+
+        broke = games[~early & ~can_pay]
+        if broke.size:
+            # handle_jail does not release the properties of a player bankrupted in jail
+            self._declare_bankrupt(broke, seat, release=False)
+        return released
+
+    def _move(self, games, seat):
+        dice1, dice2 = self._roll(games.size)
+        raw = self.position[games, seat] + dice1 + dice2
+        position = raw % self.map_size
+        self.cash[games[(raw >= self.map_size) & (position != 0)], seat] += GO_SALARY
+        self.position[games, seat] = position
+        self.landings += np.bincount(position, minlength=self.map_size)
+
+        square_type = self.types[position]
+        go = games[square_type == GO]
+        self.cash[go, seat] += GO_SALARY
+
+        chance = games[square_type == CHANCE]
+        if chance.size:
+            draws = self.rng.integers(0, self.chance_amounts.size, size=chance.size)
+            self.cash[chance, seat] += self.chance_amounts[draws]
+            self._check_bankruptcy(chance, seat)
+
+        taxed = games[square_type == INCOME_TAX]
+        if taxed.size:
+            cash = self.cash[taxed, seat]
+            self.cash[taxed, seat] = cash - (cash * 0.1 // 10 * 10).astype(np.int64)
+            self._check_bankruptcy(taxed, seat)
+
+        jailed = games[square_type == GO_TO_JAIL]
+        if jailed.size and self.jail_position >= 0:
+            self.position[jailed, seat] = self.jail_position
+            self.in_jail[jailed, seat] = True
+
+        on_property = square_type == PROPERTY
+        if on_property.any():
+            self._property(games[on_property], position[on_property], seat)
+
+    def _property(self, games, position, seat):
+        owner = self.owner[games, position].astype(np.int64)
+        cash = self.cash[games, seat]
+
+        buy = (owner == NO_OWNER) & (cash - self.prices[position] >= self.buy_reserve[seat])
+        self.cash[games[buy], seat] -= self.prices[position[buy]]
+        self.owner[games[buy], position[buy]] = seat
+
+        renting = (owner != NO_OWNER) & (owner != seat)
+        tenants = games[renting]
+        if tenants.size:
+            rent = self.rents[position[renting]]
+            landlords = owner[renting]
+            self.cash[tenants, seat] -= rent
+            solvent = self.cash[tenants, seat] >= 0
+            self.cash[tenants[solvent], landlords[solvent]] += rent[solvent]
+            self._check_bankruptcy(tenants, seat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many Monopoly games at once with NumPy.")
+    parser.add_argument('map_file')
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    policies = [AlwaysBuyPolicy() for _ in range(args.players)]
+    start = time.perf_counter()
+    engine = BatchEngine.from_map_file(args.map_file, args.games, policies, seed=args.seed)
+    engine.run()
+    elapsed = time.perf_counter() - start
+    summary = engine.summary()
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/sec)")
+    print(f"Mean rounds: {summary['mean_rounds']:.1f}")
+    for seat, share in enumerate(summary['win_share'], 1):
+        print(f"Seat {seat} win share: {share:.3f}")
+    for pos, share in enumerate(summary['landing_share'], 1):
+        print(f"Square {pos}: landed {share:.3%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board_file import convert_map_to_board
+from model import GameState
+from map_editor import load_map
+import map_editor
+
+
+def synthetic_map(size):
+    types = ['Chance', 'Income Tax', 'Free Parking']
+    squares = {'1': {'square_type': 'Go', 'name': 'Go'},
+               '2': {'square_type': 'In Jail/Just Visiting', 'name': 'In Jail/Just Visiting'}}
+    for pos in range(3, size + 1):
+        if pos % 10 == 0:
+            square_type = types[pos % 3]
+            squares[str(pos)] = {'square_type': square_type, 'name': square_type}
+        else:
+            squares[str(pos)] = {'square_type': 'Property', 'name': f"Street {pos}",
+                                 'price': 100 + pos % 700, 'rent': 10 + pos % 90, 'owner': None}
+    return {'map_size': size, 'squares': squares}
+
+
+def measure(func):
+    # timed without tracemalloc, which slows allocation-heavy code several times over
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def setup_game(map_file):
+    game_state = GameState()
+    game_state.setup_new_game(map_file, ["Alan", "Ben", "Cat"])
+    # a few hundred squares visited, as in a real game
+    for pos in range(1, game_state.map_size + 1, max(1, game_state.map_size // 300)):
+        game_state.squares[pos].get('rent')
+    return game_state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare .map JSON and compiled boards.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    map_editor.display = lambda message: None
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            map_file = os.path.join(tmp, f"board_{size}.map")
+            board_file = os.path.join(tmp, f"board_{size}.board")
+            with open(map_file, 'w') as f:
+                json.dump(synthetic_map(size), f)
+            convert_map_to_board(map_file, board_file)
+            for label, path in (('json', map_file), ('board', board_file)):
+                game_time, game_peak = measure(lambda: setup_game(path))
+                editor_time, editor_peak = measure(lambda: load_map(path).get_square(size // 2))
+                print(f"{size:>8} squares {label:>5}: {os.path.getsize(path) / 2**20:7.1f} MiB, "
+                      f"game setup {game_time * 1000:8.1f} ms / {game_peak / 2**20:7.1f} MiB, "
+                      f"editor load {editor_time * 1000:8.1f} ms / {editor_peak / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
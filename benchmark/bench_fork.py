@@ -0,0 +1,62 @@
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_generator import MapSpec, generate_squares
+from model import GameState
+
+
+def timed(action, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(size, forks):
+    state = GameState()
+    squares = {str(pos): sq for pos, sq in generate_squares(MapSpec(size))}
+    state.setup_from_map_data({'map_size': size, 'squares': squares}, ["Alan", "Ben", "Cat", "Dan"])
+    properties = list(state.board_index.property_positions.values())
+    # half of the properties owned, so a ledger copied on the first purchase would show
+    for i, position in enumerate(properties[::2]):
+        player_id = i % 4 + 1
+        square = state.squares.writable(position)
+        square['owner'], square['owner_id'] = state.players[player_id]['name'], player_id
+        state.ownership.acquire(position, player_id)
+    deep = timed(lambda: (copy.deepcopy(state.players), copy.deepcopy(state.squares)), max(1, forks // 1000))
+    fork = timed(state.fork, forks)
+    # a child that plays a turn: reads a square, changes a player
+    def fork_and_touch():
+        child = state.fork()
+        child.squares[size // 2]
+        child.players[1]['cash'] -= 10
+    touched = timed(fork_and_touch, forks)
+    # a child that buys the last unowned property
+    position = properties[-1] if len(properties) % 2 == 0 else properties[-2]
+    def fork_and_buy():
+        child = state.fork()
+        square = child.squares.writable(position)
+        child.players[1]['cash'] -= square['price']
+        square['owner'], square['owner_id'] = 'Alan', 1
+        child.ownership.acquire(position, 1)
+    bought = timed(fork_and_buy, forks)
+    print(f"{size} squares ({len(properties) // 2 + len(properties) % 2} owned): deepcopy {deep * 1e6:.0f}us, "
+          f"fork {fork * 1e6:.1f}us, fork + turn {touched * 1e6:.1f}us, fork + purchase {bought * 1e6:.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time GameState.fork against deep copies.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[40, 10000, 100000])
+    parser.add_argument('--forks', type=int, default=10000)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.forks)
+
+
+if __name__ == "__main__":
+    main()
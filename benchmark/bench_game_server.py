@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import GameServer, GameClient, bot_answer
+
+
+async def run(map_file, games, players):
+    server = GameServer(map_file, turn_timeout=60)
+    await server.start()
+    clients = []
+    for game in range(games):
+        for seat in range(players):
+            client = await GameClient.connect('127.0.0.1', server.port)
+            client.send(f"JOIN game{game} bot{seat}")
+            clients.append(client)
+    await asyncio.sleep(0.5)
+    start = time.perf_counter()
+    for game in range(games):
+        clients[game * players].send('START')
+    finished = await asyncio.gather(*(client.play(bot_answer) for client in clients))
+    elapsed = time.perf_counter() - start
+    messages = sum(len(client.messages) for client in clients)
+    await server.close()
+    print(f"{games} games, {len(clients)} connections: {elapsed:.2f}s, {sum(finished)} finished, "
+          f"{messages / elapsed:.0f} messages/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many networked games at once against one server.")
+    parser.add_argument('--map', default='map/default_board.map')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--players', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.map, args.games, args.players))
+
+
+if __name__ == "__main__":
+    main()
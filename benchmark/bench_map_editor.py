@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import map_editor
+
+
+def scripted_answers(size):
+    # the prompts create_new_map asks for a map of the given size, in order
+    yield str(size)
+    yield '1'
+    yield '7'
+    for pos in range(3, size + 1):
+        if pos % 10 == 0:
+            yield '4'
+        else:
+            yield from ('2', f"Street {pos}", str(100 + pos % 700), str(10 + pos % 90))
+
+
+def create_map(size):
+    answers = scripted_answers(size)
+    map_editor.prompt = lambda message: next(answers)
+    start = time.perf_counter()
+    map_data = map_editor.create_new_map()
+    elapsed = time.perf_counter() - start
+    assert map_data.validate_map() == []
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time create_new_map with scripted input.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[12500, 25000, 50000])
+    args = parser.parse_args()
+
+    map_editor.display = lambda message: None
+    map_editor.display_options = lambda options: None
+    for size in args.sizes:
+        elapsed = create_map(size)
+        print(f"{size:>7} squares: {elapsed * 1000:8.1f} ms, {elapsed / size * 1e6:6.2f} us per square")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import RecordTable, Player, Square
+
+
+def synthetic_board(size):
+    squares = {'1': {'square_type': 'Go', 'name': 'Go'}}
+    for pos in range(2, size + 1):
+        squares[str(pos)] = {'square_type': 'Property', 'name': f"Street {pos}",
+                             'price': 100 + pos % 700, 'rent': 10 + pos % 90, 'owner': None}
+    return {'map_size': size, 'squares': squares}
+
+
+def legacy_state(map_data, player_names):
+    # squares/players exactly as the JSON-dict GameState used to hold them
+    squares = {pos: dict(sq) for pos, sq in map_data['squares'].items()}
+    players = {str(i): {'name': name, 'cash': 1500, 'position': 1, 'in_jail': False,
+                        'jail_turns': 0, 'bankrupt': False, 'properties': []}
+               for i, name in enumerate(player_names, 1)}
+    return squares, players
+
+
+def compact_state(map_data, player_names):
+    squares = RecordTable.from_dict(map_data['squares'], Square)
+    players = RecordTable(Player, [Player(name) for name in player_names])
+    return squares, players
+
+
+def measure(build, *args):
+    tracemalloc.start()
+    state = build(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-game memory of squares and players.")
+    parser.add_argument('--map-file', default='map/default_board.map')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 10000])
+    parser.add_argument('--players', type=int, default=6)
+    args = parser.parse_args()
+
+    names = [f"player_{i}" for i in range(1, args.players + 1)]
+    with open(args.map_file, 'r') as f:
+        boards = [(args.map_file, json.load(f))]
+    boards += [(f"synthetic {size}", synthetic_board(size)) for size in args.sizes]
+
+    for label, map_data in boards:
+        legacy = measure(legacy_state, map_data, names)
+        compact = measure(compact_state, map_data, names)
+        print(f"{label:>24}: dicts {legacy / 1024:9.1f} KiB, records {compact / 1024:9.1f} KiB "
+              f"({compact / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import GameState
+from save_format import encode_binary, decode_binary
+
+
+def synthetic_game(size, players):
+    squares = {'1': {'square_type': 'Go', 'name': 'Go'}}
+    for pos in range(2, size + 1):
+        squares[str(pos)] = {'square_type': 'Property', 'name': f"Street {pos}",
+                             'price': 100 + pos % 700, 'rent': 10 + pos % 90, 'owner': None}
+    game_state = GameState()
+    game_state.setup_from_map_data({'map_size': size, 'squares': squares},
+                                   [f"player_{i}" for i in range(1, players + 1)])
+    # hand out half of the board so ownership and property lists are populated
+    for pos in range(2, size + 1, 2):
+        pid = pos % players + 1
+        square = game_state.squares[pos]
+        square.owner = game_state.players[pid].name
+        square.owner_id = pid
+        game_state.players[pid].properties.append(square.name)
+    return game_state
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def changed_save(game_state, durable):
+    game_state.update_player_cash(1, 1)
+    game_state.save_game(durable=durable)
+
+
+def queued_save_time(repeat, game_state):
+    # time the game loop spends in save_game; the background write is flushed
+    # outside the timing so it does not compete with the next measurement
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        changed_save(game_state, durable=False)
+        best = min(best, time.perf_counter() - start)
+        game_state.flush_saves()
+    return best
+
+
+def codec_times(repeat, data, save_format):
+    # the format's own cost, without building save_data() or the loaded tables
+    if save_format == 'binary':
+        raw = encode_binary(data)
+        return best_of(repeat, lambda: encode_binary(data)), best_of(repeat, lambda: decode_binary(raw))
+    raw = json.dumps(data).encode('utf-8')
+    return best_of(repeat, lambda: json.dumps(data).encode('utf-8')), best_of(repeat, lambda: json.loads(raw))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON and binary save files.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[20, 10000, 100000])
+    parser.add_argument('--players', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for size in args.sizes:
+                game_state = synthetic_game(size, args.players)
+                data = game_state.save_data()
+                for save_format in ('json', 'binary'):
+                    game_state.save_format = save_format
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        # a cash change each time, or the unchanged game would not be saved again
+                        save_time = best_of(args.repeat, lambda: changed_save(game_state, durable=True))
+                        queue_time = queued_save_time(args.repeat, game_state)
+                    save_file = f"save/save_round_{game_state.round_num}.save"
+                    file_size = os.path.getsize(save_file)
+                    load_time = best_of(args.repeat, lambda: GameState().load_game(save_file))
+                    encode_time, decode_time = codec_times(args.repeat, data, save_format)
+                    print(f"{size:>7} squares {save_format:>6}: {file_size / 1024:9.1f} KiB, "
+                          f"save {save_time * 1000:8.2f} ms (game loop waits {queue_time * 1000:6.2f} ms), "
+                          f"load {load_time * 1000:8.2f} ms, encode {encode_time * 1000:7.2f} ms, "
+                          f"decode {decode_time * 1000:7.2f} ms")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import view
+from view import GameView
+from view_sink import ConsoleSink, BufferedSink, NullSink, JsonLinesSink
+from model import GameState
+from controller import GameController
+
+
+def play_games(map_file, games, sink):
+    # the interactive GameView, with every prompt answered by a scripted player
+    builtins_input = builtins.input
+    builtins.input = lambda prompt='': 'y' if not prompt else '1'
+    previous = view.set_sink(sink)
+    try:
+        for game in range(games):
+            random.seed(game)
+            model = GameState()
+            model.setup_new_game(map_file, ["Alan", "Ben", "Cat"])
+            GameController(model, type('View', (), {'GameView': GameView})).game_loop()
+    finally:
+        view.set_sink(previous)
+        builtins.input = builtins_input
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare GameView output sinks.")
+    parser.add_argument('--map', default='map/default_board.map')
+    parser.add_argument('--games', type=int, default=200)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, 'w')
+    sinks = (('console', ConsoleSink), ('buffered', lambda: BufferedSink(devnull)), ('null', NullSink),
+             ('json-lines', lambda: JsonLinesSink(devnull)))
+    for label, make_sink in sinks:
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            play_games(args.map, args.games, make_sink())
+            elapsed = time.perf_counter() - start
+        print(f"{label:>10}: {args.games / elapsed:7.0f} games/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from save_format import (
+    HAS_NAME, HAS_PRICE, HAS_RENT, HAS_OWNER, HAS_OWNER_ID, PRICE_NONE, RENT_NONE, NONE_INDEX
+)
+
+# Compiled board layout (little-endian), version 2:
+#   header   magic, version, map_size, column length, defined square count,
+#            type count, string count
+#   types    string index of each square type; type code k is entry k - 1
+#   columns  one packed column per field, indexed by position - 1: type code
+#            (0 = undefined), key flags, name, price, rent, owner name, owner id;
+#            a price or rent of None is stored as 0 with its *_NONE flag set
+#   strings  u32 end offsets, then the UTF-8 bytes back to back
+# Every section starts on an 8-byte boundary so the columns can be cast in
+# place from the memory map; nothing is decoded until a position is read.
+BOARD_MAGIC = b'MNPLBORD'
+BOARD_VERSION = 2
+# version 1 is version 2 without the *_NONE flags
+READABLE_VERSIONS = (1, 2)
+
+HEADER = struct.Struct('<8sHIIIII')
+# (field, array typecode) of the square columns, in file order
+COLUMNS = (('types', 'B'), ('flags', 'B'), ('names', 'i'), ('prices', 'q'), ('rents', 'q'),
+           ('owners', 'i'), ('owner_ids', 'i'))
+UNDEFINED = 0
+
+
+class BoardFormatError(ValueError):
+    pass
+
+
+def is_board(raw):
+    return raw[:len(BOARD_MAGIC)] == BOARD_MAGIC
+
+
+def is_board_file(path):
+    with open(path, 'rb') as f:
+        return is_board(f.read(len(BOARD_MAGIC)))
+
+
+def _padding(length):
+    return b'\0' * (-length % 8)
+
+
+def _packed(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    raw = column.tobytes()
+    return raw + _padding(len(raw))
+
+
+def compile_board(data):
+    # bytes of the compiled board for a parsed .map JSON document
+    squares = {int(pos): sq for pos, sq in data['squares'].items()}
+    length = max([data['map_size']] + list(squares))
+    strings = {}
+
+    def add(value):
+        if value is None:
+            return NONE_INDEX
+        return strings.setdefault(value, len(strings))
+
+    type_codes = {}
+    columns = {field: [0] * length for field, _ in COLUMNS}
+    for field in ('names', 'owners', 'owner_ids'):
+        columns[field] = [NONE_INDEX] * length
+    for pos, sq in squares.items():
+        i = pos - 1
+        square_type = sq['square_type']
+        if square_type not in type_codes:
+            type_codes[square_type] = len(type_codes) + 1
+            add(square_type)
+        flags = 0
+        for key, flag in (('name', HAS_NAME), ('price', HAS_PRICE), ('rent', HAS_RENT),
+                          ('owner', HAS_OWNER), ('owner_id', HAS_OWNER_ID)):
+            if key in sq:
+                flags |= flag
+        price = sq.get('price')
+        rent = sq.get('rent')
+        if price is None and flags & HAS_PRICE:
+            flags |= PRICE_NONE
+        if rent is None and flags & HAS_RENT:
+            flags |= RENT_NONE
+        owner_id = sq.get('owner_id')
+        columns['types'][i] = type_codes[square_type]
+        columns['flags'][i] = flags
+        columns['names'][i] = add(sq.get('name'))
+        columns['prices'][i] = 0 if price is None else price
+        columns['rents'][i] = 0 if rent is None else rent
+        columns['owners'][i] = add(sq.get('owner'))
+        columns['owner_ids'][i] = NONE_INDEX if owner_id is None else owner_id
+    if len(type_codes) > 255:
+        raise BoardFormatError("A compiled board supports at most 255 square types.")
+
+    encoded = [value.encode('utf-8') for value in strings]
+    ends = []
+    total = 0
+    for value in encoded:
+        total += len(value)
+        ends.append(total)
+    header = HEADER.pack(BOARD_MAGIC, BOARD_VERSION, data['map_size'], length, len(squares),
+                         len(type_codes), len(encoded))
+    chunks = [header, _padding(HEADER.size), _packed('I', [strings[t] for t in type_codes])]
+    chunks.extend(_packed(typecode, columns[field]) for field, typecode in COLUMNS)
+    chunks.append(_packed('I', ends))
+    chunks.extend(encoded)
+    return b''.join(chunks)
+
+
+def write_board(data, board_file):
+    # replaced rather than rewritten in place: the old file may still be memory-mapped
+    temp_file = board_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(compile_board(data))
+    os.replace(temp_file, board_file)
+
+
+def _all_none(column):
+    # every entry is NONE_INDEX (-1), i.e. every byte is 0xff
+    raw = column if isinstance(column, memoryview) else memoryview(column).cast('B')
+    return raw.tobytes().count(b'\xff') == raw.nbytes
+
+
+class BoardFile:
+    # Read-only view of a compiled board. Squares are read by position straight
+    # from the memory-mapped columns; strings are decoded on first use.
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        try:
+            self._open()
+        except (struct.error, TypeError, ValueError) as e:
+            self.close()
+            if isinstance(e, BoardFormatError):
+                raise
+            raise BoardFormatError(f"Corrupt board file {path}: {e}") from None
+
+    def _open(self):
+        if not is_board(self.mm):
+            raise BoardFormatError(f"{self.path} is not a compiled board.")
+        (_, version, self.map_size, self.length, self.square_count, type_count,
+         string_count) = HEADER.unpack_from(self.mm, 0)
+        if version not in READABLE_VERSIONS:
+            raise BoardFormatError(f"Unsupported board version {version}.")
+        self.sections = []
+        offset = HEADER.size + len(_padding(HEADER.size))
+        type_indexes, offset = self._column('I', offset, type_count)
+        self.types_offset = offset
+        for field, typecode in COLUMNS:
+            column, offset = self._column(typecode, offset, self.length)
+            setattr(self, field, column)
+        self.ends, offset = self._column('I', offset, string_count)
+        self.string_offset = offset
+        if string_count and offset + self.ends[-1] > len(self.mm):
+            raise BoardFormatError("Truncated board file.")
+        self.strings = {}
+        self.type_names = [self.string(index) for index in type_indexes]
+
+    def _column(self, typecode, offset, count):
+        size = array(typecode).itemsize * count
+        end = offset + size
+        if end > len(self.mm):
+            raise BoardFormatError("Truncated board file.")
+        if sys.byteorder == 'little':
+            column = self.view[offset:end].cast(typecode)
+            self.sections.append(column)
+        else:
+            column = array(typecode)
+            column.frombytes(self.view[offset:end])
+            column.byteswap()
+        return column, end + len(_padding(size))
+
+    def close(self):
+        for column in getattr(self, 'sections', ()):
+            column.release()
+        self.sections = []
+        self.view.release()
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def string(self, index):
+        if index == NONE_INDEX:
+            return None
+        value = self.strings.get(index)
+        if value is None:
+            start = self.ends[index - 1] if index else 0
+            value = self.strings[index] = str(
+                self.view[self.string_offset + start:self.string_offset + self.ends[index]], 'utf-8')
+        return value
+
+    def defined(self, position):
+        return 1 <= position <= self.length and self.types[position - 1] != UNDEFINED
+
+    def square_type(self, position):
+        code = self.types[position - 1]
+        return self.type_names[code - 1] if code != UNDEFINED else None
+
+    def name(self, position):
+        return self.string(self.names[position - 1])
+
+    def square(self, position):
+        # the square's JSON dict (only the keys the map had), or None if undefined
+        if not 1 <= position <= self.length:
+            return None
+        i = position - 1
+        code = self.types[i]
+        if code == UNDEFINED:
+            return None
+        flags = self.flags[i]
+        sq = {'square_type': self.type_names[code - 1]}
+        if flags & HAS_NAME:
+            sq['name'] = self.string(self.names[i])
+        if flags & HAS_PRICE:
+            sq['price'] = None if flags & PRICE_NONE else self.prices[i]
+        if flags & HAS_RENT:
+            sq['rent'] = None if flags & RENT_NONE else self.rents[i]
+        if flags & HAS_OWNER:
+            sq['owner'] = self.string(self.owners[i])
+        if flags & HAS_OWNER_ID:
+            owner_id = self.owner_ids[i]
+            sq['owner_id'] = None if owner_id == NONE_INDEX else owner_id
+        return sq
+
+    def positions(self):
+        types = self.types
+        return [i + 1 for i in range(self.length) if types[i] != UNDEFINED]
+
+    def _code(self, square_type):
+        return self.type_names.index(square_type) + 1 if square_type in self.type_names else None
+
+    def first_position(self, square_type):
+        # searched in the mapped type column without reading it into Python
+        code = self._code(square_type)
+        if code is None:
+            return None
+        start = self.types_offset
+        found = self.mm.find(bytes([code]), start, start + self.length)
+        return found - start + 1 if found != -1 else None
+
+    def positions_of(self, square_type):
+        code = self._code(square_type)
+        if code is None:
+            return ()
+        types = self.types
+        return tuple(i + 1 for i in range(self.length) if types[i] == code)
+
+    def property_positions(self):
+        code = self._code('Property')
+        positions = {}
+        if code is not None:
+            types = self.types
+            names = self.names
+            for i in range(self.length):
+                if types[i] == code:
+                    positions.setdefault(self.string(names[i]), i + 1)
+        return positions
+
+    def owned(self):
+        # (position, owner_id, owner name) of squares that record an owner
+        owner_ids = self.owner_ids
+        owners = self.owners
+        if _all_none(owner_ids) and _all_none(owners):
+            return
+        for i in range(self.length):
+            if owner_ids[i] != NONE_INDEX or owners[i] != NONE_INDEX:
+                owner_id = owner_ids[i]
+                yield i + 1, None if owner_id == NONE_INDEX else owner_id, self.string(owners[i])
+
+    def to_dict(self):
+        return {
+            'map_size': self.map_size,
+            'squares': {str(pos): self.square(pos) for pos in self.positions()},
+        }
+
+
+def convert_map_to_board(map_file, board_file):
+    with open(map_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    write_board(data, board_file)
+
+
+def convert_board_to_map(board_file, map_file):
+    with BoardFile(board_file) as board:
+        data = board.to_dict()
+    with open(map_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between .map JSON and compiled boards.")
+    parser.add_argument('command', choices=('compile', 'decompile'))
+    parser.add_argument('source')
+    parser.add_argument('target')
+    args = parser.parse_args()
+    if args.command == 'compile':
+        convert_map_to_board(args.source, args.target)
+    else:
+        convert_board_to_map(args.source, args.target)
+    print(f"Wrote {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,32 @@
+import os
+
+
 class GameController:
-    def __init__(self, model, view):
+    def __init__(self, model, view, journal=None, rng=None, recorder=None):
         self.model = model
-        self.view = view
+        # optional game_record.GameRecorder; it sees every view decision
+        self.recorder = recorder
+        self.view = view if recorder is None else recorder.wrap(view)
+        # game_rng.GameRng handed to the views for dice and chance draws; with
+        # None each view falls back to its own
+        self.rng = rng
         self.debug_mode = False
+        # optional TurnJournal; every state mutation is appended to it
+        self.journal = journal
+        # every logged event changed the game, so the next save is not skipped
+        self.log = model.mark_changed if journal is None else self._journal_event
+
+    def _journal_event(self, *event):
+        self.model.mark_changed()
+        self.journal.append(event)
+
+    def take_snapshot(self):
+        snapshot_file = f"{self.journal.path}.round{self.model.round_num}.snapshot"
+        previous = self.journal.snapshot
+        self.model.write_snapshot(snapshot_file)
+        self.journal.mark_snapshot(snapshot_file)
+        if previous and previous != snapshot_file and os.path.exists(previous):
+            os.remove(previous)
 
     def toggle_debug_mode(self):
         self.debug_mode = not self.debug_mode
@@ -30,13 +54,15 @@ class GameController:
 
     def game_loop(self):
         game_saved_and_exited = False
+        if self.journal is not None and self.journal.snapshot is None:
+            self.take_snapshot()
+        if self.recorder is not None:
+            self.recorder.begin(self)
         while not self.model.is_game_over():
             self.view.GameView.show_round_start(self.model.round_num)
-            for player_id in range(1, self.model.players_num + 1):
-                player = self.model.players[str(player_id)]
-                if player['bankrupt']:
-                    continue
+            for player_id in self.model.turn_order():
                 self.player_turn(player_id)
+                self.log('turn', player_id)
 
                 if self.model.is_game_over():
                     break
@@ -46,27 +72,46 @@ class GameController:
 
             self.view.GameView.show_round_end(self.model.round_num)
             self.model.update_round_num(self.model.round_num + 1)
+            self.log('round', self.model.round_num)
+            if self.journal is not None and (self.model.round_num - 1) % self.journal.snapshot_every == 0:
+                self.take_snapshot()
 
             if self.model.is_game_over():
                 break
 
             choice = self.view.GameView.choose_next_action()
-            if choice == 2:
-                self.model.save_game()
+            if choice == 2 and self.save_game():
                 game_saved_and_exited = True
                 break
 
+        if self.journal is not None:
+            self.journal.flush()
         if not game_saved_and_exited:
             self.end_game()
+        if self.recorder is not None:
+            self.recorder.finish(self)
+
+    def save_game(self):
+        # False when the save failed; the game then goes on
+        try:
+            save_file = self.model.save_game(durable=True)
+        except OSError as e:
+            self.view.GameView.save_failed(str(e))
+            return False
+        if save_file is None:
+            self.view.GameView.save_unchanged(self.model.save_path())
+        else:
+            self.view.GameView.game_saved(save_file)
+        return True
 
     def player_turn(self, player_id):
-        player = self.model.players[str(player_id)]
+        player = self.model.players[player_id]
         self.view.GameView.show_player_turn(
-            player['name'], player['cash'], player['position'],
-            player.get('properties', []), player['in_jail'], player['jail_turns']
+            player.name, player.cash, player.position,
+            player.properties, player.in_jail, player.jail_turns, player_id
         )
 
-        if player['in_jail']:
+        if player.in_jail:
             self.handle_jail(player_id)
             return
 
@@ -76,7 +121,7 @@ class GameController:
                 self.handle_dice_throw(player_id)
                 break
             elif action == 2:
-                self.view.GameView.show_map(self.model.squares)
+                self.view.GameView.show_map(self.model.squares, player.position)
             elif action == 3:
                 chosen_player_id = self.view.GameView.choose_player_to_view(self.model.players)
                 self.view.GameView.show_player_states(self.model.players[chosen_player_id])
@@ -84,132 +129,148 @@ class GameController:
                 self.view.GameView.show_all_players_states(self.model.players)
             elif action == 5:
                 next_player_id = (player_id % self.model.players_num) + 1
-                next_player = self.model.players[str(next_player_id)]
-                self.view.GameView.show_next_player(next_player['name'])
+                next_player = self.model.players[next_player_id]
+                self.view.GameView.show_next_player(next_player.name)
             elif action == 6 and self.debug_mode:
                 self.handle_debug_actions(player_id)
             else:
-                print("无效的选项，请重新选择。")
+                self.view.GameView.invalid_choice()
 
     def handle_dice_throw(self, player_id):
-        dice1, dice2 = self.view.GameView.throw_the_dice()
+        dice1, dice2 = self.view.GameView.throw_the_dice(self.rng)
         steps = dice1 + dice2
-        player = self.model.players[str(player_id)]
-        new_position = (player['position'] + steps - 1) % self.model.map_size + 1
-        
-        if player['position'] + steps > self.model.map_size and new_position != 1:
-            player['cash'] += 1500
+        player = self.model.players[player_id]
+        new_position, passed_go = self.model.board_index.move(player.position, steps)
+
+        if passed_go:
+            player.cash += 1500
+            self.log('cash', player_id, 1500)
             self.view.GameView.pass_go()
 
-        self.model.update_player_position(str(player_id), new_position)
+        self.model.update_player_position(player_id, new_position)
+        self.log('move', player_id, new_position)
         self.handle_square(player_id, new_position)
 
     def handle_square(self, player_id, position):
-        square = self.model.squares[str(position)]
-        player = self.model.players[str(player_id)]
-
+        square = self.model.squares[position]
+        player = self.model.players[player_id]
 
-        def check_bankruptcy():
-            if player['cash'] < 0:
-                self.view.GameView.player_bankrupt(player['name'])
-                player['bankrupt'] = True
-
-                for prop in player.get('properties', []):
-                    for sq in self.model.squares.values():
-                        if sq['name'] == prop:
-                            sq['owner'] = ''
-                player['properties'] = []
-                return True
-            return False
-
-        if square['square_type'] == 'Property':
-            owner = square.get('owner')
-            if owner is None or owner == '':
+        if square.square_type == 'Property':
+            owner_id = self.model.ownership.owner_of(position)
+            if owner_id is None:
                 want_to_buy = self.view.GameView.reach_a_property(
-                    square['name'], square['price'], ''
+                    square.name, square.price, ''
                 )
                 if want_to_buy:
-                    if player['cash'] >= square['price']:
-                        player['cash'] -= square['price']
-                        square['owner'] = player['name']
-                        player.setdefault('properties', []).append(square['name'])
-                        self.view.GameView.buy_success(square['name'])
+                    if player.cash >= square.price:
+                        player.cash -= square.price
+                        self.model.ownership.acquire(position, player_id)
+                        owned = self.model.squares.writable(position)
+                        owned.owner = player.name
+                        owned.owner_id = player_id
+                        player.properties.append(square.name)
+                        self.log('cash', player_id, -square.price)
+                        self.log('buy', player_id, position)
+                        self.view.GameView.buy_success(square.name)
                     else:
-                        self.view.GameView.buy_fail(square['name'])
+                        self.view.GameView.buy_fail(square.name)
                 else:
                     self.view.GameView.not_buy_property()
             else:
-                if owner != player['name']:
-                    rent = square['rent']
-                    player['cash'] -= rent
-                    if not check_bankruptcy():
-                        for pid, p in self.model.players.items():
-                            if p['name'] == owner:
-                                p['cash'] += rent
-                                break
-                        self.view.GameView.pay_rent(player['name'], owner, rent)
+                if owner_id != player_id:
+                    rent = square.rent
+                    owner = self.model.players[owner_id]
+                    player.cash -= rent
+                    self.log('cash', player_id, -rent)
+                    if not self.check_bankruptcy(player_id, player):
+                        owner.cash += rent
+                        self.log('cash', owner_id, rent)
+                        self.view.GameView.pay_rent(player.name, owner.name, rent)
                 else:
-                    self.view.GameView.reach_own_property(square['name'])
-        elif square['square_type'] == 'Chance':
-            amount = self.view.GameView.reach_a_chance()
-            player['cash'] += amount
-            check_bankruptcy()
-        elif square['square_type'] == 'Income Tax':
-            tax = int(player['cash'] * 0.1 // 10 * 10)
-            player['cash'] -= tax
+                    self.view.GameView.reach_own_property(square.name)
+        elif square.square_type == 'Chance':
+            amount = self.view.GameView.reach_a_chance(self.rng)
+            player.cash += amount
+            self.log('cash', player_id, amount)
+            self.check_bankruptcy(player_id, player)
+        elif square.square_type == 'Income Tax':
+            tax = int(player.cash * 0.1 // 10 * 10)
+            player.cash -= tax
+            self.log('cash', player_id, -tax)
             self.view.GameView.pay_income_tax(tax)
-            check_bankruptcy()
-        elif square['square_type'] == 'Go to Jail':
-            jail_position = None
-            for pos_str, sq in self.model.squares.items():
-                if sq['square_type'] == 'In Jail/Just Visiting':
-                    jail_position = int(pos_str)
-                    break
+            self.check_bankruptcy(player_id, player)
+        elif square.square_type == 'Go to Jail':
+            jail_position = self.model.board_index.jail_position
             if jail_position is not None:
-                player['in_jail'] = True
-                player['position'] = jail_position
+                player.in_jail = True
+                player.position = jail_position
+                self.log('jail', player_id, True, player.jail_turns)
+                self.log('move', player_id, jail_position)
                 self.view.GameView.reach_a_jail()
             else:
-                print("未找到监狱方格，无法入狱。")
-        elif square['square_type'] == 'Go':
-            player['cash'] += 1500
+                self.view.GameView.jail_not_found()
+        elif square.square_type == 'Go':
+            player.cash += 1500
+            self.log('cash', player_id, 1500)
             self.view.GameView.pass_go()
         else:
-            self.view.GameView.no_effect_square(square['name'])
+            self.view.GameView.no_effect_square(square.name)
+
+    def check_bankruptcy(self, player_id, player):
+        if player.cash < 0:
+            self.view.GameView.player_bankrupt(player.name)
+            self.model.declare_bankrupt(player_id)
+            self.release_properties(player_id)
+            self.log('bankrupt', player_id, True)
+            return True
+        return False
+
+    def release_properties(self, player_id):
+        for position in self.model.ownership.release_all(player_id):
+            square = self.model.squares.writable(position)
+            square.owner = ''
+            square.owner_id = None
+        self.model.players[player_id].properties = []
 
     def handle_jail(self, player_id):
-        player = self.model.players[str(player_id)]
-        if player['jail_turns'] < 2:
+        player = self.model.players[player_id]
+        if player.jail_turns < 2:
             choice = self.view.GameView.in_jail_options()
             if choice == 1:
-                dice1, dice2 = self.view.GameView.throw_the_dice()
+                dice1, dice2 = self.view.GameView.throw_the_dice(self.rng)
                 if dice1 == dice2:
-                    player['in_jail'] = False
-                    player['jail_turns'] = 0
+                    player.in_jail = False
+                    player.jail_turns = 0
+                    self.log('jail', player_id, False, 0)
                     self.view.GameView.release_from_jail()
                     self.handle_dice_throw(player_id)
                 else:
-                    player['jail_turns'] += 1
+                    player.jail_turns += 1
+                    self.log('jail', player_id, True, player.jail_turns)
                     self.view.GameView.fail_to_release()
             elif choice == 2:
-                if player['cash'] >= 150:
-                    player['cash'] -= 150
-                    player['in_jail'] = False
-                    player['jail_turns'] = 0
-                    self.handle_dice_throw(player_id)
+                if player.cash >= 150:
+                    self.pay_fine(player_id)
                 else:
                     self.view.GameView.no_money_to_pay_fine()
             else:
                 self.view.GameView.invalid_choice()
         else:
-            if player['cash'] >= 150:
-                player['cash'] -= 150
-                player['in_jail'] = False
-                player['jail_turns'] = 0
-                self.handle_dice_throw(player_id)
+            if player.cash >= 150:
+                self.pay_fine(player_id)
             else:
-                self.view.GameView.player_bankrupt(player['name'])
-                player['bankrupt'] = True
+                self.view.GameView.player_bankrupt(player.name)
+                self.model.declare_bankrupt(player_id)
+                self.log('bankrupt', player_id, False)
+
+    def pay_fine(self, player_id):
+        player = self.model.players[player_id]
+        player.cash -= 150
+        player.in_jail = False
+        player.jail_turns = 0
+        self.log('cash', player_id, -150)
+        self.log('jail', player_id, False, 0)
+        self.handle_dice_throw(player_id)
 
     def end_game(self):
         winners = self.model.get_winners()
@@ -217,23 +278,22 @@ class GameController:
 
     def handle_debug_actions(self, player_id):
         action = self.view.GameView.debug_action_menu()
-        player = self.model.players[str(player_id)]
+        player = self.model.players[player_id]
         
         if action == 1:
             amount = self.view.GameView.debug_modify_cash()
-            self.model.update_player_cash(str(player_id), amount)
-            if player['cash'] < 0:
-                self.view.GameView.player_bankrupt(player['name'])
-                player['bankrupt'] = True
-                for prop in player.get('properties', []):
-                    for sq in self.model.squares.values():
-                        if sq['name'] == prop:
-                            sq['owner'] = ''
-                player['properties'] = []
-            
+            self.model.update_player_cash(player_id, amount)
+            self.log('cash', player_id, amount)
+            if player.cash < 0:
+                self.view.GameView.player_bankrupt(player.name)
+                self.model.declare_bankrupt(player_id)
+                self.release_properties(player_id)
+                self.log('bankrupt', player_id, True)
+
         elif action == 2:
             position = self.view.GameView.debug_choose_position(self.model.map_size)
             if position:
-                self.model.update_player_position(str(player_id), position)
+                self.model.update_player_position(player_id, position)
+                self.log('move', player_id, position)
                 self.handle_square(player_id, position)
                 
\ No newline at end of file
@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from model import GameState
+from controller import GameController
+from simulator import Simulator, HeadlessGameView, POLICIES
+
+# A record is one JSON object:
+#   {"version": 1, "seed": ..., "debug_mode": false, "start": <save data>,
+#    "played": [seats], "events": [[hook, value], ...], "final_hash": "<sha256 hex>"}
+# start is the game as it stood when GameController.game_loop began, played
+# the seats that already had their turn in a round resumed from a journal,
+# events the answers of the GameView hooks below in the order the controller
+# asked for them, and final_hash is state_hash() of the game when it ended.
+RECORD_VERSION = 1
+# every view hook whose answer changes the game: random outcomes and decisions
+DECISIONS = ('throw_the_dice', 'reach_a_chance', 'reach_a_property', 'in_jail_options', 'choose_next_action',
+             'player_action_menu', 'choose_player_to_view', 'debug_action_menu', 'debug_modify_cash',
+             'debug_choose_position')
+
+
+class ReplayError(Exception):
+    pass
+
+
+def state_hash(model):
+    data = json.dumps(model.save_data(), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class _RecordingGameView:
+    # passes every call on to the real GameView and notes the decision answers
+    def __init__(self, game_view, events):
+        self.game_view = game_view
+        self.events = events
+        for name in DECISIONS:
+            setattr(self, name, self._recorded(name, getattr(game_view, name)))
+
+    def _recorded(self, name, hook):
+        def call(*args):
+            value = hook(*args)
+            self.events.append([name, list(value) if isinstance(value, tuple) else value])
+            return value
+        return call
+
+    def __getattr__(self, name):
+        return getattr(self.game_view, name)
+
+
+class GameRecorder:
+    # Given to GameController(recorder=...): the controller talks to the view
+    # through wrap(), and game_loop calls begin() and finish().
+    def __init__(self):
+        self.events = []
+        self.record = None
+
+    def wrap(self, view):
+        return type('RecordedView', (), {
+            'MainmenuView': getattr(view, 'MainmenuView', None),
+            'GameView': _RecordingGameView(view.GameView, self.events),
+        })
+
+    def begin(self, controller):
+        # the starting state is copied now; the game changes it from here on
+        self.events.clear()
+        self.record = {
+            'version': RECORD_VERSION,
+            'seed': getattr(controller.rng, 'seed', None),
+            'debug_mode': controller.debug_mode,
+            'start': json.loads(json.dumps(controller.model.save_data())),
+            'played': sorted(controller.model._played_this_round),
+            'events': self.events,
+            'final_hash': None,
+        }
+
+    def finish(self, controller):
+        self.record['final_hash'] = state_hash(controller.model)
+
+    def save(self, record_file):
+        temp_file = record_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.record, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temp_file, record_file)
+
+
+class ReplayGameView(HeadlessGameView):
+    # HeadlessGameView whose decisions are the recorded answers, in order
+    def __init__(self, model, events):
+        self.model = model
+        self.events = events
+        self.index = 0
+        self.winners = None
+        for name in DECISIONS:
+            setattr(self, name, self._replayed(name))
+
+    def _replayed(self, name):
+        def call(*args):
+            try:
+                hook, value = self.events[self.index]
+            except IndexError:
+                raise ReplayError(f"The game asked {name} after the last recorded event.") from None
+            if hook != name:
+                raise ReplayError(f"Event {self.index}: the game asked {name}, the record has {hook}.")
+            self.index += 1
+            return tuple(value) if name == 'throw_the_dice' else value
+        return call
+
+    def show_player_turn(self, player_name, money, position, properties, in_jail, jail_turns, player_id=None):
+        pass
+
+
+class ReplayState(GameState):
+    # a replayed save-and-quit must not write a save file
+    def save_game(self, durable=False):
+        return None
+
+
+def load_record(record_file):
+    with open(record_file, 'r', encoding='utf-8') as f:
+        record = json.load(f)
+    if record.get('version') != RECORD_VERSION:
+        raise ReplayError(f"Unsupported record version {record.get('version')!r}.")
+    return record
+
+
+def replay(record):
+    # plays the record again without output; returns the final GameState and
+    # raises ReplayError if the game does not follow the record or ends elsewhere
+    model = ReplayState()
+    model.load_data(record['start'])
+    model._played_this_round = set(record['played'])
+    game_view = ReplayGameView(model, record['events'])
+    controller = GameController(model, type('ReplayView', (), {'GameView': game_view}))
+    controller.debug_mode = record['debug_mode']
+    controller.game_loop()
+    if game_view.index != len(record['events']):
+        raise ReplayError(f"The game ended after {game_view.index} of {len(record['events'])} events.")
+    if state_hash(model) != record['final_hash']:
+        raise ReplayError("The replayed game ended in a different state.")
+    return model
+
+
+def record_games(map_file, output_dir, games, players, seed, policy):
+    # headless games as a corpus of records, one file per game
+    os.makedirs(output_dir, exist_ok=True)
+    simulator = Simulator(map_file)
+    names = [f"bot_{i}" for i in range(1, players + 1)]
+    for game in range(games):
+        recorder = GameRecorder()
+        simulator.run_game(names, [POLICIES[policy]() for _ in names], seed=seed + game, recorder=recorder)
+        recorder.save(os.path.join(output_dir, f"game_{seed + game}.record"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record headless games, or replay records and check them.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="play headless games and record them")
+    record_parser.add_argument('map_file')
+    record_parser.add_argument('output_dir')
+    record_parser.add_argument('--games', type=int, default=10)
+    record_parser.add_argument('--players', type=int, default=4)
+    record_parser.add_argument('--seed', type=int, default=0)
+    record_parser.add_argument('--policy', choices=sorted(POLICIES), default='always')
+    replay_parser = commands.add_parser('replay', help="replay records and check their final state")
+    replay_parser.add_argument('records', nargs='+')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'record':
+        record_games(args.map_file, args.output_dir, args.games, args.players, args.seed, args.policy)
+        print(f"Recorded {args.games} games in {time.perf_counter() - start:.2f}s")
+        return
+    failed = 0
+    events = 0
+    for record_file in args.records:
+        try:
+            record = load_record(record_file)
+            replay(record)
+            events += len(record['events'])
+        except (OSError, ValueError, KeyError, ReplayError) as e:
+            failed += 1
+            print(f"{record_file}: {e}")
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(args.records) - failed} of {len(args.records)} records in {elapsed:.2f}s "
+          f"({events / elapsed:.0f} events/sec)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
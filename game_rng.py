@@ -0,0 +1,67 @@
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# what a chance square pays (negative: what it costs), all equally likely
+CHANCE_AMOUNTS = tuple(i * 10 for i in range(-30, 21) if i != 0)
+# two 4-sided dice; a draw of 0-15 picks one of the 16 throws
+DICE_THROWS = tuple((dice1, dice2) for dice1 in range(1, 5) for dice2 in range(1, 5))
+# draws made at a time
+BLOCK_SIZE = 1024
+
+
+class GameRng:
+    # All the randomness of one game. Dice throws and chance amounts are drawn
+    # a block at a time and handed out one by one, so a game is set by its
+    # seed alone and a draw costs little more than a list pop. With numpy=True
+    # the blocks come from a numpy Generator instead; the same seed then gives
+    # a different (but equally fixed) game.
+    def __init__(self, seed=None, numpy=False, block_size=BLOCK_SIZE, source=None):
+        if numpy and np is None:
+            raise ImportError("GameRng(numpy=True) requires numpy (pip install numpy).")
+        self.seed = seed
+        self.block_size = block_size
+        # source: an existing random.Random to draw from instead of a new one;
+        # what is left of it after the streams are seeded is for policies and spawn()
+        self.random = source if source is not None else random.Random(seed)
+        # dice and chance have a stream each, so one is never shifted by the other
+        self.dice_stream = self._stream(numpy)
+        self.chance_stream = self._stream(numpy)
+        self.throws = []
+        self.chances = []
+
+    def _stream(self, numpy):
+        seed = self.random.getrandbits(64)
+        return np.random.default_rng(seed) if numpy else random.Random(seed)
+
+    def _block(self, stream, values):
+        # a block of values, in reverse so that pop() hands them out in order
+        if isinstance(stream, random.Random):
+            drawn = stream.choices(values, k=self.block_size)
+        else:
+            drawn = [values[i] for i in stream.integers(0, len(values), self.block_size).tolist()]
+        drawn.reverse()
+        return drawn
+
+    def roll(self):
+        # (dice1, dice2)
+        try:
+            return self.throws.pop()
+        except IndexError:
+            self.throws = self._block(self.dice_stream, DICE_THROWS)
+            return self.throws.pop()
+
+    def chance(self):
+        try:
+            return self.chances.pop()
+        except IndexError:
+            self.chances = self._block(self.chance_stream, CHANCE_AMOUNTS)
+            return self.chances.pop()
+
+    def spawn(self):
+        # an independent rng for another game, set by this one's seed
+        numpy = not isinstance(self.dice_stream, random.Random)
+        return GameRng(self.random.getrandbits(64), numpy, self.block_size)
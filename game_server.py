@@ -0,0 +1,575 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import threading
+
+from model import GameState
+from controller import GameController
+from board_file import is_board_file
+from game_rng import GameRng
+from map_window import MapWindow
+
+# Line protocol, UTF-8, one message per line.
+#   client -> server   JOIN <game> <name>   join (or open) a game table
+#                      START                start the table's game (2+ players)
+#                      <anything else>      the answer to this player's ASK
+#   server -> client   MSG <text>           game output, shown to the whole table
+#                      ASK <prompt>         this player must answer
+#                      ERR <text>           the last line was rejected
+#                      END                  the game is over; the server closes
+# One event loop serves every connection. Each game's GameController is plain
+# blocking code, so it still runs on its own OS thread and waits on the loop
+# for answers. A waiting thread uses no CPU, but it keeps its stack
+# (GAME_THREAD_STACK_SIZE, set by main) and an OS thread for the whole game,
+# so the server plays at most max_games games at once and a START beyond that
+# is answered with ERR. Running games on the loop itself would need the
+# controller rewritten as coroutines.
+MAX_PLAYERS = 6
+MIN_PLAYERS = 2
+# seconds a player has for all of their prompts in one turn
+DEFAULT_TURN_TIMEOUT = 60.0
+# a client that stops reading is dropped once this much output is queued for it
+MAX_WRITE_BUFFER = 1 << 20
+GAME_THREAD_STACK_SIZE = 512 * 1024
+# games (and so game threads) running at once
+DEFAULT_MAX_GAMES = 256
+
+
+class SessionClosed(Exception):
+    pass
+
+
+class PlayerConnection:
+    def __init__(self, name, writer):
+        self.name = name
+        self.writer = writer
+        self.connected = True
+        # future for the answer while an ASK is outstanding
+        self.pending = None
+
+    def send(self, line):
+        if not self.connected:
+            return
+        self.writer.write(line.encode('utf-8') + b'\n')
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.disconnect()
+
+    def disconnect(self):
+        if self.connected:
+            self.connected = False
+            self.writer.close()
+        if self.pending is not None and not self.pending.done():
+            self.pending.set_result(None)
+
+
+class GameSession:
+    # One table: its players' connections on the loop side, and the game
+    # thread that runs the controller once the table starts.
+    def __init__(self, server, game_id):
+        self.server = server
+        self.game_id = game_id
+        self.loop = server.loop
+        self.players = []
+        self.started = False
+        self.closed = False
+        self.thread = None
+
+    def broadcast(self, text):
+        for line in text.split('\n'):
+            for player in self.players:
+                player.send(f"MSG {line}")
+
+    def join(self, name, writer):
+        if self.started:
+            raise ValueError("This game has already started.")
+        if len(self.players) >= MAX_PLAYERS:
+            raise ValueError(f"This game already has {MAX_PLAYERS} players.")
+        if any(player.name == name for player in self.players):
+            raise ValueError("This name is taken at this table.")
+        player = PlayerConnection(name, writer)
+        self.players.append(player)
+        self.broadcast(f"{name} joined game {self.game_id} ({len(self.players)} players).")
+        return player
+
+    def start(self):
+        if self.started:
+            raise ValueError("This game has already started.")
+        if len(self.players) < MIN_PLAYERS:
+            raise ValueError(f"A game needs at least {MIN_PLAYERS} players.")
+        # given back by the game thread when it ends
+        if not self.server.game_slots.acquire(blocking=False):
+            raise ValueError("The server is already running as many games as it can "
+                             f"({self.server.max_games}); try again later.")
+        self.started = True
+        self.server.open_tables.pop(self.game_id, None)
+        self.thread = threading.Thread(target=self.run, args=([p.name for p in self.players],),
+                                       name=f"game-{self.game_id}", daemon=True)
+        self.thread.start()
+
+    async def ask(self, seat, prompt, deadline, messages=None):
+        # the seat's answer, or None once the turn's deadline has passed
+        if messages:
+            self.broadcast(messages)
+        player = self.players[seat - 1]
+        remaining = deadline - self.loop.time()
+        if self.closed or not player.connected or remaining <= 0:
+            return None
+        player.pending = self.loop.create_future()
+        player.send(f"ASK {prompt}")
+        try:
+            return await asyncio.wait_for(player.pending, remaining)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            player.pending = None
+
+    def answer(self, player, line):
+        if player.pending is None or player.pending.done():
+            player.send("ERR It is not your turn to answer.")
+        else:
+            player.pending.set_result(line)
+
+    def call(self, callback, *args):
+        # from the game thread: run callback on the loop
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            raise SessionClosed() from None
+
+    def run(self, names):
+        try:
+            self.play(names)
+        finally:
+            self.server.game_slots.release()
+
+    def play(self, names):
+        try:
+            model = self.server.new_game(names)
+            rng = GameRng()
+            game_view = RemoteGameView(self, model, rng, self.server.turn_timeout)
+            GameController(model, type('RemoteView', (), {'GameView': game_view}), rng=rng).game_loop()
+            game_view.flush()
+            model.flush_saves()
+        except SessionClosed:
+            return
+        except Exception as e:
+            self.call(self.broadcast, f"The game stopped on an error: {e}")
+        try:
+            self.call(self.finish)
+        except SessionClosed:
+            pass
+
+    def finish(self):
+        for player in self.players:
+            player.send("END")
+            player.disconnect()
+        self.close()
+
+    def close(self):
+        self.closed = True
+        self.server.sessions.discard(self)
+        for player in self.players:
+            if player.pending is not None and not player.pending.done():
+                player.pending.set_result(None)
+
+
+class RemoteGameView:
+    # view.GameView for a networked table: output goes to every player at the
+    # table, and prompts go to the player whose turn it is. Used from the game
+    # thread only; all socket work is handed to the loop.
+    def __init__(self, session, model, rng, turn_timeout):
+        self.session = session
+        self.model = model
+        self.rng = rng
+        self.turn_timeout = turn_timeout
+        # the seat (player id) whose turn it is, as the controller reports it
+        self.current_seat = 1
+        self.deadline = 0
+        # output is handed to the loop with the next prompt, not line by line:
+        # every hand-off between the threads costs a loop wake-up
+        self.outbox = []
+        self.map_window = None
+
+    def _say(self, text):
+        self.outbox.append(text)
+
+    def flush(self):
+        if self.session.closed:
+            raise SessionClosed()
+        if self.outbox:
+            self.session.call(self.session.broadcast, '\n'.join(self.outbox))
+            self.outbox = []
+
+    def _start_turn(self, seat):
+        self.current_seat = seat
+        self.deadline = self.session.loop.time() + self.turn_timeout
+
+    def _ask(self, prompt):
+        if self.session.closed:
+            raise SessionClosed()
+        messages = '\n'.join(self.outbox)
+        self.outbox = []
+        future = asyncio.run_coroutine_threadsafe(
+            self.session.ask(self.current_seat, prompt, self.deadline, messages), self.session.loop)
+        try:
+            answer = future.result()
+        except concurrent.futures.CancelledError:
+            raise SessionClosed() from None
+        if self.session.closed:
+            raise SessionClosed()
+        return answer
+
+    def _choose(self, prompt, choices, default):
+        # choices maps accepted answers to results; idle players get the default
+        while True:
+            answer = self._ask(prompt)
+            if answer is None:
+                name = self.model.players[self.current_seat]['name']
+                self._say(f"{name} did not answer in time.")
+                return default
+            answer = answer.strip().lower()
+            if answer in choices:
+                return choices[answer]
+            self.flush()
+            self.session.call(self.session.players[self.current_seat - 1].send,
+                              f"ERR Please answer one of: {', '.join(choices)}.")
+
+    def show_round_start(self, round_num):
+        self._say(f"\n----------Round {round_num} Start!----------")
+
+    def show_round_end(self, round_num):
+        self._say(f"\n----------Round {round_num} End!----------")
+
+    def choose_next_action(self):
+        # the round-end save/continue prompt belongs to the host seat
+        self._start_turn(1)
+        return self._choose("Choose your next action: 1. Start next round 2. Save and quit",
+                            {'1': 1, '2': 2}, 1)
+
+    def game_saved(self, save_file):
+        self._say(f"Game saved to {save_file}")
+
+    def save_unchanged(self, save_file):
+        self._say(f"No changes since the last save to {save_file}")
+
+    def save_failed(self, error):
+        self._say(f"The game could not be saved: {error}")
+
+    def is_100_round(self):
+        self._say("Game Over! Round 100 has been reached!")
+
+    def show_player_turn(self, player_name, money, position, properties, in_jail, jail_turns, player_id=None):
+        self._start_turn(player_id)
+        lines = [f"\n{player_name}'s turn!", f"Money: ${money}", f"Position: Square {position}",
+                 f"Properties owned: {', '.join(properties) if properties else 'None'}"]
+        if in_jail:
+            lines.append(f"In jail for {jail_turns} turns!")
+        self._say('\n'.join(lines))
+
+    def player_action_menu(self, debug_mode=False):
+        return self._choose("1. Roll dice 2. View map 3. View player status 4. View all players' status "
+                            "5. View next player", {str(i): i for i in range(1, 6)}, 1)
+
+    def throw_the_dice(self, rng=None):
+        dice1, dice2 = (rng or self.rng).roll()
+        self._say(f"You rolled {dice1} and {dice2}!")
+        return dice1, dice2
+
+    def reach_a_property(self, property_name, property_price, property_owner):
+        self._say(f"You reached {property_name}!")
+        if property_owner:
+            self._say(f"This property is already owned by {property_owner}! You need to pay rent ${property_price}.")
+            return False
+        return self._choose(f"This property is unowned, priced at ${property_price}. Do you want to buy it? (y/n)",
+                            {'y': True, 'n': False}, False)
+
+    def buy_success(self, property_name):
+        self._say(f"You successfully bought {property_name}!")
+
+    def buy_fail(self, property_name):
+        self._say(f"Your funds are insufficient to buy {property_name}!")
+
+    def not_buy_property(self):
+        self._say("You chose not to buy this property.")
+
+    def pay_rent(self, player_name, owner_name, rent):
+        self._say(f"{player_name} paid rent ${rent} to {owner_name}.")
+
+    def reach_own_property(self, property_name):
+        self._say(f"You reached your property {property_name}.")
+
+    def player_bankrupt(self, player_name):
+        self._say(f"{player_name} is bankrupt! All properties have been confiscated.")
+
+    def reach_a_chance(self, rng=None):
+        amount = (rng or self.rng).chance()
+        if amount > 0:
+            self._say(f"You reached a chance square!\nGood luck! You received ${amount}!")
+        else:
+            self._say(f"You reached a chance square!\nUnlucky! You lost ${-amount}!")
+        return amount
+
+    def reach_a_jail(self):
+        self._say("You were sent to jail!")
+
+    def jail_not_found(self):
+        self._say("There is no jail on this map.")
+
+    def pass_go(self):
+        self._say("You passed the starting point and received $1500 salary!")
+
+    def pay_income_tax(self, tax):
+        self._say(f"You need to pay income tax ${tax}.")
+
+    def no_effect_square(self, square_name):
+        self._say(f"You reached {square_name}, nothing happens here.")
+
+    def in_jail_options(self):
+        return self._choose("You are in jail: 1. Roll dice to try to get double points 2. Pay a $150 fine",
+                            {'1': 1, '2': 2}, 1)
+
+    def release_from_jail(self):
+        self._say("Congratulations! You rolled double points and were immediately released from jail!")
+
+    def fail_to_release(self):
+        self._say("You did not roll double points, so you remain in jail.")
+
+    def no_money_to_pay_fine(self):
+        self._say("Your funds are insufficient to pay the fine, so you cannot get out of jail.")
+
+    def invalid_choice(self):
+        self._say("Invalid choice.")
+
+    def _player_states(self, player):
+        lines = [f"Player {player['name']} status:", f"Money: ${player['cash']}",
+                 f"Position: Square {player['position']}",
+                 f"Properties: {', '.join(player['properties']) if player['properties'] else 'None'}",
+                 f"In jail: {'Yes' if player['in_jail'] else 'No'}"]
+        return '\n'.join(lines)
+
+    def show_player_states(self, player):
+        self._say(self._player_states(player))
+
+    def show_all_players_states(self, players):
+        self._say('\n'.join(self._player_states(player) for player in players.values()))
+
+    def show_next_player(self, player_name):
+        self._say(f"Next player is {player_name}.")
+
+    def show_map(self, squares, position=None):
+        # the page around the player; there is no paging over the network
+        if self.map_window is None or self.map_window.squares is not squares:
+            self.map_window = MapWindow(squares)
+        window = self.map_window
+        start = window.page_start(window.positions, position or 1)
+        lines, _ = window.page(window.positions, start)
+        if len(window.positions) > len(lines):
+            title = f"Current map, {start + 1}-{start + len(lines)} of {len(window.positions)} squares:"
+        else:
+            title = "Current map:"
+        self._say('\n'.join([title] + lines))
+
+    def show_game_over(self, winners):
+        if len(winners) > 1:
+            self._say(f"\nGame Over!\nDraw! Winners: {', '.join(winners)}")
+        else:
+            self._say(f"\nGame Over!\nCongratulations {winners[0]}!")
+
+    def choose_player_to_view(self, players):
+        return self._choose("Enter player number: ", {str(pid): pid for pid in players},
+                            next(iter(players)))
+
+    # debug mode is never enabled for networked games
+    def debug_action_menu(self):
+        return None
+
+    def debug_modify_cash(self):
+        return 0
+
+    def debug_choose_position(self, map_size):
+        return None
+
+    def show_debug_mode_status(self, enabled):
+        pass
+
+    def show_debug_bankrupt_status(self, player_name, is_bankrupt):
+        pass
+
+    def show_debug_jail_status(self, player_name, in_jail):
+        pass
+
+
+class GameServer:
+    def __init__(self, map_file, host='127.0.0.1', port=0, turn_timeout=DEFAULT_TURN_TIMEOUT,
+                 max_games=DEFAULT_MAX_GAMES):
+        self.map_file = map_file
+        self.host = host
+        self.port = port
+        self.turn_timeout = turn_timeout
+        self.max_games = max_games
+        self.game_slots = threading.BoundedSemaphore(max_games)
+        self.loop = None
+        self.server = None
+        # tables still taking players, by game id; every live session
+        self.open_tables = {}
+        self.sessions = set()
+        self.map_data = None
+        if not is_board_file(map_file):
+            # parsed once; every game gets fresh squares from it
+            with open(map_file, 'r') as f:
+                self.map_data = json.load(f)
+
+    def new_game(self, names):
+        model = GameState()
+        if self.map_data is None:
+            model.setup_new_game(self.map_file, names)
+        else:
+            model.setup_from_map_data(self.map_data, names)
+        return model
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        for session in list(self.sessions):
+            for player in session.players:
+                player.disconnect()
+            session.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        session = player = None
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+                if player is None:
+                    session, player = self._join(line, writer)
+                elif line.strip().upper() == 'START' and not session.started:
+                    try:
+                        session.start()
+                    except ValueError as e:
+                        player.send(f"ERR {e}")
+                elif session.started:
+                    session.answer(player, line)
+                else:
+                    player.send("ERR The game has not started yet.")
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if player is not None:
+                player.disconnect()
+                if not session.started:
+                    session.players.remove(player)
+                    if not session.players:
+                        self.open_tables.pop(session.game_id, None)
+                        session.close()
+            else:
+                writer.close()
+
+    def _join(self, line, writer):
+        parts = line.split()
+        if len(parts) != 3 or parts[0].upper() != 'JOIN':
+            writer.write(b"ERR Expected JOIN <game> <name>.\n")
+            return None, None
+        game_id, name = parts[1], parts[2]
+        session = self.open_tables.get(game_id)
+        if session is None:
+            session = self.open_tables[game_id] = GameSession(self, game_id)
+            self.sessions.add(session)
+        try:
+            player = session.join(name, writer)
+        except ValueError as e:
+            writer.write(f"ERR {e}\n".encode('utf-8'))
+            return None, None
+        if len(session.players) == MAX_PLAYERS:
+            try:
+                session.start()
+            except ValueError as e:
+                # the table stays open; any player may START it later
+                player.send(f"ERR {e}")
+        return session, player
+
+
+class GameClient:
+    # Minimal client for tests and load runs: speaks the line protocol and
+    # collects what the server sends.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.messages = []
+        self.errors = []
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    def send(self, line):
+        self.writer.write(line.encode('utf-8') + b'\n')
+
+    async def receive(self):
+        # (kind, text) of the next server line, or (None, None) once closed
+        raw = await self.reader.readline()
+        if not raw:
+            return None, None
+        kind, _, text = raw.decode('utf-8').rstrip('\n').partition(' ')
+        return kind, text
+
+    async def play(self, answer=lambda prompt: '1'):
+        # answers every ASK with answer(prompt) until the game ends
+        while True:
+            kind, text = await self.receive()
+            if kind is None or kind == 'END':
+                break
+            if kind == 'ASK':
+                reply = answer(text)
+                if reply is not None:
+                    self.send(reply)
+            elif kind == 'MSG':
+                self.messages.append(text)
+            elif kind == 'ERR':
+                self.errors.append(text)
+        self.writer.close()
+        return kind == 'END'
+
+
+def bot_answer(prompt):
+    # rolls, buys whatever it can, and tries the dice in jail
+    return 'y' if prompt.endswith('(y/n)') else '1'
+
+
+async def serve(map_file, host, port, turn_timeout, max_games):
+    server = GameServer(map_file, host, port, turn_timeout, max_games)
+    await server.start()
+    print(f"Serving {map_file} on {host}:{server.port}")
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Monopoly games over a local TCP line protocol.")
+    parser.add_argument('map_file')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--turn-timeout', type=float, default=DEFAULT_TURN_TIMEOUT)
+    parser.add_argument('--max-games', type=int, default=DEFAULT_MAX_GAMES,
+                        help="games played at once, one thread each")
+    args = parser.parse_args()
+    threading.stack_size(GAME_THREAD_STACK_SIZE)
+    try:
+        asyncio.run(serve(args.map_file, args.host, args.port, args.turn_timeout, args.max_games))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import os
+
+# Journal lines are JSON arrays: [kind, *fields]. Event kinds emitted by
+# GameController and replayed by GameState.apply_event:
+#   ["move", player_id, position]
+#   ["cash", player_id, delta]
+#   ["buy", player_id, position]
+#   ["jail", player_id, in_jail, jail_turns]
+#   ["bankrupt", player_id, properties_released]
+#   ["turn", player_id]              the player's turn is complete
+#   ["round", round_num]             a new round has started
+#   ["snapshot", save_file]          state up to here is in save_file
+SNAPSHOT = 'snapshot'
+
+
+# events after which the journal describes a consistent game state
+BOUNDARIES = ('turn', 'round', SNAPSHOT)
+
+
+class TurnJournal:
+    def __init__(self, path, fsync_every=64, snapshot_every=10):
+        # fsync_every: events per fsync (1 = every event is durable)
+        # snapshot_every: rounds between full snapshots written by the controller
+        self.path = path
+        self.fsync_every = fsync_every
+        self.snapshot_every = snapshot_every
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.snapshot = None
+        length = 0
+        if os.path.exists(path):
+            events, length = _scan(path)
+            self.snapshot = _last_snapshot(events)
+        self.file = open(path, 'a+b')
+        # drop a turn cut short by a crash; the resumed game plays it again
+        self.file.truncate(length)
+        self.pending = 0
+
+    def append(self, event):
+        self.file.write(json.dumps(event, separators=(',', ':')).encode('utf-8') + b'\n')
+        self.pending += 1
+        if self.pending >= self.fsync_every:
+            self.flush()
+
+    def mark_snapshot(self, save_file):
+        self.append([SNAPSHOT, save_file])
+        self.flush()
+        self.snapshot = save_file
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def _scan(journal_file):
+    # complete events and the byte length they occupy; a crash can leave a half
+    # written line or the middle of a turn at the end, and neither is replayed
+    events = []
+    complete = 0
+    length = 0
+    with open(journal_file, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break
+            events.append(event)
+            length += len(line)
+            if event[0] in BOUNDARIES:
+                complete = len(events)
+                complete_length = length
+    if not complete:
+        return [], 0
+    return events[:complete], complete_length
+
+
+def _last_snapshot(events):
+    snapshot = None
+    for event in events:
+        if event[0] == SNAPSHOT and os.path.exists(event[1]):
+            snapshot = event[1]
+    return snapshot
+
+
+def read_journal(journal_file):
+    return _scan(journal_file)[0]
+
+
+def last_snapshot(journal_file):
+    return _last_snapshot(read_journal(journal_file))
+
+
+def journal_tail(journal_file, save_file):
+    # events recorded after the last snapshot marker that names save_file
+    events = read_journal(journal_file)
+    start = None
+    for i, event in enumerate(events):
+        if event[0] == SNAPSHOT and event[1] == save_file:
+            start = i + 1
+    if start is None:
+        raise ValueError(f"{journal_file} has no snapshot marker for {save_file}.")
+    return [event for event in events[start:] if event[0] != SNAPSHOT]
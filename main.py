@@ -1,9 +1,11 @@
 from model import GameState
 from view import MainmenuView, GameView
 from controller import GameController
+from game_rng import GameRng
 
 if __name__ == "__main__":
     model = GameState()
     view = type('View', (), {'MainmenuView': MainmenuView, 'GameView': GameView})
-    controller = GameController(model, view)
-    controller.start_game() 
\ No newline at end of file
+    controller = GameController(model, view, rng=GameRng())
+    controller.start_game() 
+    model.flush_saves()
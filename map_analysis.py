@@ -0,0 +1,132 @@
+try:
+    import numpy as np
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+except ImportError:
+    np = None
+
+# Two 4-sided dice, as thrown by GameView.throw_the_dice
+DICE_FACES = 4
+DOUBLES_PROBABILITY = 1 / DICE_FACES
+# Extra chain states for a player sitting in jail with 0, 1 or 2 failed turns
+JAIL_STATES = 3
+
+
+def dice_sum_distribution():
+    counts = {}
+    for dice1 in range(1, DICE_FACES + 1):
+        for dice2 in range(1, DICE_FACES + 1):
+            counts[dice1 + dice2] = counts.get(dice1 + dice2, 0) + 1
+    total = DICE_FACES * DICE_FACES
+    return {steps: count / total for steps, count in sorted(counts.items())}
+
+
+def _board_layout(map_data):
+    size = map_data.map_size
+    types = [None] * size
+    jail_position = None
+    for pos in sorted(map_data.squares):
+        square = map_data.squares[pos]
+        types[pos - 1] = square.square_type
+        if square.square_type == 'In Jail/Just Visiting' and jail_position is None:
+            jail_position = pos - 1
+    return size, types, jail_position
+
+
+def _build_chain(size, types, jail_position, jail_policy):
+    # States 0..size-1: standing free on that square after a turn.
+    # States size..size+2: in jail with jail_turns 0, 1, 2 (handle_jail).
+    # Each turn contributes one row to the transition matrix (rows -> next state)
+    # and one row to the landing matrix (rows -> square the piece landed on).
+    distribution = dice_sum_distribution()
+    go_to_jail = np.array([t == 'Go to Jail' for t in types]) & (jail_position is not None)
+    jail_entry = size
+
+    rows, cols, probs = [], [], []
+    land_rows, land_cols, land_probs = [], [], []
+
+    def add_throw(state, origins, weight):
+        # the state throws the dice from `origins` (array of square indices) with the given weight
+        for steps, probability in distribution.items():
+            landing = (origins + steps) % size
+            next_state = np.where(go_to_jail[landing], jail_entry, landing)
+            rows.append(state)
+            cols.append(next_state)
+            probs.append(np.full(landing.size, probability * weight))
+            land_rows.append(state)
+            land_cols.append(landing)
+            land_probs.append(np.full(landing.size, probability * weight))
+
+    free = np.arange(size)
+    add_throw(free, free, 1.0)
+
+    if jail_position is not None:
+        jail = np.array([jail_position])
+        for turns in range(JAIL_STATES):
+            state = np.array([size + turns])
+            if jail_policy == 'pay' or turns == JAIL_STATES - 1:
+                # pay the $150 fine (assumed affordable) and throw normally
+                add_throw(state, jail, 1.0)
+            else:
+                add_throw(state, jail, DOUBLES_PROBABILITY)
+                rows.append(state)
+                cols.append(np.array([size + turns + 1]))
+                probs.append(np.array([1 - DOUBLES_PROBABILITY]))
+
+    states = size + (JAIL_STATES if jail_position is not None else 0)
+    transition = sparse.csr_matrix(
+        (np.concatenate(probs), (np.concatenate(rows), np.concatenate(cols))), shape=(states, states))
+    landing = sparse.csr_matrix(
+        (np.concatenate(land_probs), (np.concatenate(land_rows), np.concatenate(land_cols))),
+        shape=(states, size))
+    return transition, landing
+
+
+def stationary_distribution(transition, anchor=0):
+    # Solve pi (P - I) = 0 with sum(pi) = 1. The balance equation replaced by the
+    # normalisation must belong to a recurrent state (anchor).
+    states = transition.shape[0]
+    system = (transition.T - sparse.identity(states, format='csr')).tolil()
+    system[anchor, :] = np.ones(states)
+    rhs = np.zeros(states)
+    rhs[anchor] = 1.0
+    return spsolve(system.tocsc(), rhs)
+
+
+def landing_probabilities(map_data, jail_policy='roll'):
+    if np is None:
+        raise ImportError("Map analysis requires numpy and scipy (pip install numpy scipy).")
+    if jail_policy not in ('roll', 'pay'):
+        raise ValueError("jail_policy must be 'roll' or 'pay'.")
+    size, types, jail_position = _board_layout(map_data)
+    transition, landing = _build_chain(size, types, jail_position, jail_policy)
+    # a player can end a turn on any square except a Go to Jail that sends them away
+    anchor = next(i for i, t in enumerate(types) if t != 'Go to Jail' or jail_position is None)
+    pi = stationary_distribution(transition, anchor)
+    # probability that a given player's turn ends with a landing on each square
+    return np.asarray(landing.T @ pi).ravel()
+
+
+def analyze_map(map_data, jail_policy='roll', opponents=1):
+    landing = landing_probabilities(map_data, jail_policy)
+    properties = []
+    for pos in sorted(map_data.squares):
+        square = map_data.squares[pos]
+        if square.square_type != 'Property':
+            continue
+        probability = float(landing[pos - 1])
+        expected_rent = probability * square.rent * opponents
+        payback = square.price / expected_rent if expected_rent > 0 else float('inf')
+        properties.append({
+            'position': pos,
+            'name': square.name,
+            'price': square.price,
+            'rent': square.rent,
+            'landing_probability': probability,
+            'expected_rent': expected_rent,
+            'payback_rounds': payback,
+        })
+    return {
+        'landing_probabilities': {pos: float(landing[pos - 1]) for pos in range(1, map_data.map_size + 1)},
+        'properties': properties,
+    }
@@ -1,8 +1,24 @@
 import json
 import os
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+
+from board_file import BoardFile, is_board_file, write_board
+from map_analysis import analyze_map
+from map_stream import MapStream, MapStreamError, read_square, write_map_json
 
 # Model 部分
 
+# maps saved under this extension are written in the compiled board format
+BOARD_EXTENSION = '.board'
+# JSON maps larger than this are parsed incrementally instead of all at once
+STREAMING_MIN_BYTES = 1 << 20
+# squares read from a map file that are kept as objects at any one time
+SQUARE_CACHE_SIZE = 4096
+# squares shown by display_map_summary before asking to continue
+SUMMARY_PAGE_SIZE = 50
+
 class Square:
     def __init__(self, square_type, name=None):
         self.square_type = square_type
@@ -39,25 +55,268 @@ class InJailSquare(Square):
     def __init__(self):
         super().__init__('In Jail/Just Visiting', 'In Jail/Just Visiting')
 
+def square_from_dict(sq_data):
+    square_type = sq_data['square_type']
+    name = sq_data.get('name')
+    if square_type == 'Go':
+        square = GoSquare()
+    elif square_type == 'Property':
+        price = sq_data.get('price')
+        rent = sq_data.get('rent')
+        square = PropertySquare(name, price, rent)
+        square.owner = sq_data.get('owner')
+    elif square_type == 'Income Tax':
+        square = IncomeTaxSquare()
+    elif square_type == 'Chance':
+        square = ChanceSquare()
+    elif square_type == 'Free Parking':
+        square = FreeParkingSquare()
+    elif square_type == 'Go to Jail':
+        square = GoToJailSquare()
+    elif square_type == 'In Jail/Just Visiting':
+        square = InJailSquare()
+    else:
+        square = Square(square_type, name)
+    return square
+
+def square_to_dict(square):
+    square_data = {
+        'square_type': square.square_type,
+        'name': square.name
+    }
+    if isinstance(square, PropertySquare):
+        square_data['price'] = square.price
+        square_data['rent'] = square.rent
+        square_data['owner'] = square.owner
+    return square_data
+
+class LazySquares(MutableMapping):
+    # MapData.squares backed by a map file that is read by position. Squares
+    # read from the file sit in a bounded cache; edited squares are kept until
+    # the map is saved. Subclasses supply _read(position) -> square dict or
+    # None, and _source_positions().
+    def __init__(self, cache_size=SQUARE_CACHE_SIZE):
+        self.edited = {}
+        self.removed = set()
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def __getitem__(self, position):
+        square = self.edited.get(position)
+        if square is not None:
+            return square
+        square = self.cache.get(position)
+        if square is not None:
+            self.cache.move_to_end(position)
+            return square
+        if position in self.removed or not isinstance(position, int):
+            raise KeyError(position)
+        sq_data = self._read(position)
+        if sq_data is None:
+            raise KeyError(position)
+        square = self.cache[position] = square_from_dict(sq_data)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return square
+
+    def __setitem__(self, position, square):
+        self.removed.discard(position)
+        self.cache.pop(position, None)
+        self.edited[position] = square
+
+    def __delitem__(self, position):
+        if position not in self:
+            raise KeyError(position)
+        self.edited.pop(position, None)
+        self.cache.pop(position, None)
+        self.removed.add(position)
+
+    def positions(self):
+        positions = set(self._source_positions()) - self.removed
+        positions.update(self.edited)
+        return sorted(positions)
+
+    def __iter__(self):
+        return iter(self.positions())
+
+    def __len__(self):
+        return len(self.positions())
+
+    def __contains__(self, position):
+        if position in self.edited:
+            return True
+        return isinstance(position, int) and position not in self.removed and self._defined(position)
+
+    def _defined(self, position):
+        return self._read(position) is not None
+
+    def iter_dicts(self):
+        # (position, square dict); squares that were never edited are copied
+        # from the file as they are
+        for pos in self.positions():
+            square = self.edited.get(pos)
+            yield pos, square_to_dict(square) if square is not None else self._read(pos)
+
+    def iter_squares(self):
+        # every square in one pass over the file, rather than a read per position
+        for pos, sq_data in self.iter_dicts():
+            square = self.edited.get(pos)
+            yield square if square is not None else square_from_dict(sq_data)
+
+    def to_dict(self):
+        return {str(pos): sq_data for pos, sq_data in self.iter_dicts()}
+
+class BoardFileSquares(LazySquares):
+    # squares of a compiled board, read from its memory-mapped columns
+    def __init__(self, board, cache_size=SQUARE_CACHE_SIZE):
+        super().__init__(cache_size)
+        self.board = board
+
+    def _read(self, position):
+        return self.board.square(position)
+
+    def _defined(self, position):
+        return self.board.defined(position)
+
+    def _source_positions(self):
+        return self.board.positions()
+
+    def close(self):
+        self.board.close()
+
+class _SharedReader:
+    # sequential reads from a handle that read_square() seeks on as well
+    def __init__(self, f):
+        self.f = f
+        self.position = 0
+
+    def read(self, size):
+        self.f.seek(self.position)
+        data = self.f.read(size)
+        self.position += len(data)
+        return data
+
+class StreamedSquares(LazySquares):
+    # squares of a .map JSON file, parsed incrementally: the file is only read
+    # as far as the positions asked for so far, and only the byte offset of
+    # each square is remembered, so squares can be re-read after eviction
+    def __init__(self, map_file, cache_size=SQUARE_CACHE_SIZE):
+        super().__init__(cache_size)
+        self.stream_file = open(map_file, 'rb')
+        self.read_file = open(map_file, 'rb')
+        self.stream = MapStream(self.stream_file)
+        self.pending = self.stream.squares()
+        self.offsets = array('q')
+        self.complete = False
+
+    def _advance(self, position=None):
+        # indexes further squares until position is found (None: to the end)
+        for pos, sq_data, offset in self.pending:
+            if pos > len(self.offsets):
+                self.offsets.extend([-1] * (pos - len(self.offsets)))
+            self.offsets[pos - 1] = offset
+            if pos == position:
+                return sq_data
+        self.complete = True
+        self.stream_file.close()
+        return None
+
+    def load_all(self):
+        if not self.complete:
+            self._advance()
+
+    def _read(self, position):
+        if 1 <= position <= len(self.offsets) and self.offsets[position - 1] != -1:
+            return read_square(self.read_file, self.offsets[position - 1])
+        if not self.complete and position >= 1:
+            return self._advance(position)
+        return None
+
+    def _source_positions(self):
+        self.load_all()
+        return [i + 1 for i, offset in enumerate(self.offsets) if offset != -1]
+
+    def iter_dicts(self):
+        # one sequential pass over the file rather than a seek per square. The
+        # handle opened at load time is read, not the path: once the map has
+        # been saved over itself the path names a different file, and only
+        # the loaded one matches the recorded offsets.
+        self.load_all()
+        for pos, sq_data, offset in MapStream(_SharedReader(self.read_file)).squares():
+            if pos in self.removed or pos in self.edited or self.offsets[pos - 1] != offset:
+                continue
+            yield pos, sq_data
+        for pos in sorted(self.edited):
+            yield pos, square_to_dict(self.edited[pos])
+
+    def close(self):
+        self.stream_file.close()
+        self.read_file.close()
+
 class MapData:
     def __init__(self, map_size):
         self.map_size = map_size
         self.squares = {}
+        # square type and property name counts kept current by add_square and
+        # edit_square, so validating after an edit does not rescan the map;
+        # None for a loaded map until it is first counted
+        self.type_counts = Counter()
+        self.property_names = Counter()
+        self.duplicate_names = 0
 
-    def add_square(self, position, square):
+    def _count(self, square, change):
+        self.type_counts[square.square_type] += change
+        if square.square_type == 'Property':
+            count = self.property_names[square.name]
+            self.duplicate_names += (count + change > 1) - (count > 1)
+            if count + change:
+                self.property_names[square.name] = count + change
+            else:
+                del self.property_names[square.name]
+
+    def _place(self, position, square):
+        if self.type_counts is not None:
+            old = self.squares.get(position)
+            if old is not None:
+                self._count(old, -1)
+            self._count(square, 1)
         self.squares[position] = square
 
+    def add_square(self, position, square):
+        self._place(position, square)
+
     def edit_square(self, position, square):
-        self.squares[position] = square
+        self._place(position, square)
 
     def get_square(self, position):
         return self.squares.get(position)
 
-    def validate_map(self):
+    def recount(self):
+        # full pass over the squares; the fallback when the counts are unknown
+        self.type_counts = Counter()
+        self.property_names = Counter()
+        self.duplicate_names = 0
+        squares = self.squares.iter_squares() if isinstance(self.squares, LazySquares) else self.squares.values()
+        for square in squares:
+            self._count(square, 1)
+
+    def count(self, square_type):
+        if self.type_counts is None:
+            self.recount()
+        return self.type_counts[square_type]
+
+    def has_property_name(self, name):
+        if self.type_counts is None:
+            self.recount()
+        return name in self.property_names
+
+    def validate_map(self, full=False):
+        if full or self.type_counts is None:
+            self.recount()
         errors = []
-        go_count = sum(1 for sq in self.squares.values() if sq.square_type == 'Go')
-        in_jail_count = sum(1 for sq in self.squares.values() if sq.square_type == 'In Jail/Just Visiting')
-        go_to_jail_exists = any(sq.square_type == 'Go to Jail' for sq in self.squares.values())
+        go_count = self.type_counts['Go']
+        in_jail_count = self.type_counts['In Jail/Just Visiting']
+        go_to_jail_exists = self.type_counts['Go to Jail'] > 0
 
         if go_count != 1:
             errors.append(f"Map must have exactly one 'Go' square, but has {go_count}.")
@@ -65,23 +324,15 @@ class MapData:
             errors.append(f"Map can only have one 'In Jail/Just Visiting' square, but has {in_jail_count}.")
         if go_to_jail_exists and in_jail_count == 0:
             errors.append(f"Map has a 'Go to Jail' square but no 'In Jail/Just Visiting' square. Please add one.")
-        property_names = [sq.name for sq in self.squares.values() if sq.square_type == 'Property']
-        if len(property_names) != len(set(property_names)):
+        if self.duplicate_names:
             errors.append("Duplicate property names found. Each property must have a unique name.")
         return errors
 
     def to_dict(self):
-        squares_dict = {}
-        for pos, square in self.squares.items():
-            square_data = {
-                'square_type': square.square_type,
-                'name': square.name
-            }
-            if isinstance(square, PropertySquare):
-                square_data['price'] = square.price
-                square_data['rent'] = square.rent
-                square_data['owner'] = square.owner
-            squares_dict[str(pos)] = square_data
+        if isinstance(self.squares, LazySquares):
+            squares_dict = self.squares.to_dict()
+        else:
+            squares_dict = {str(pos): square_to_dict(square) for pos, square in self.squares.items()}
         return {
             'map_size': self.map_size,
             'squares': squares_dict
@@ -92,29 +343,25 @@ class MapData:
         map_data = MapData(data['map_size'])
         squares_data = data['squares']
         for pos_str, sq_data in squares_data.items():
-            pos = int(pos_str)
-            square_type = sq_data['square_type']
-            name = sq_data.get('name')
-            if square_type == 'Go':
-                square = GoSquare()
-            elif square_type == 'Property':
-                price = sq_data.get('price')
-                rent = sq_data.get('rent')
-                square = PropertySquare(name, price, rent)
-                square.owner = sq_data.get('owner')
-            elif square_type == 'Income Tax':
-                square = IncomeTaxSquare()
-            elif square_type == 'Chance':
-                square = ChanceSquare()
-            elif square_type == 'Free Parking':
-                square = FreeParkingSquare()
-            elif square_type == 'Go to Jail':
-                square = GoToJailSquare()
-            elif square_type == 'In Jail/Just Visiting':
-                square = InJailSquare()
-            else:
-                square = Square(square_type, name)
-            map_data.add_square(pos, square)
+            map_data.add_square(int(pos_str), square_from_dict(sq_data))
+        return map_data
+
+    @staticmethod
+    def from_board(board):
+        map_data = MapData(board.map_size)
+        map_data.squares = BoardFileSquares(board)
+        map_data.type_counts = None
+        return map_data
+
+    @staticmethod
+    def from_stream(map_file):
+        squares = StreamedSquares(map_file)
+        if 'map_size' not in squares.stream.header:
+            # map_size written after the squares: index them all to reach it
+            squares.load_all()
+        map_data = MapData(squares.stream.header['map_size'])
+        map_data.squares = squares
+        map_data.type_counts = None
         return map_data
 
 # View 部分
@@ -129,7 +376,7 @@ def display_options(options):
     for idx, option in enumerate(options, 1):
         print(f"{idx}. {option}")
 
-def display_map_summary(map_data):
+def display_map_summary(map_data, page_size=SUMMARY_PAGE_SIZE):
     display("Map Summary:")
     for pos in range(1, map_data.map_size+1):
         sq = map_data.get_square(pos)
@@ -142,11 +389,20 @@ def display_map_summary(map_data):
                 display(f"Square {pos}: {stype}, {name}")
         else:
             display(f"Square {pos}: Undefined")
+        if pos % page_size == 0 and pos < map_data.map_size:
+            if prompt("Press Enter for the next page, or 'q' to stop: ").strip().lower() == 'q':
+                break
 
 def display_errors(errors):
     for error in errors:
         display(error)
 
+def display_map_analysis(analysis):
+    display("Map Analysis (per opponent turn):")
+    for prop in sorted(analysis['properties'], key=lambda p: p['payback_rounds']):
+        display(f"Square {prop['position']}: {prop['name']} - landed {prop['landing_probability']:.2%}, "
+                f"expected rent ${prop['expected_rent']:.2f}/round, payback {prop['payback_rounds']:.1f} rounds")
+
 # Controller 部分
 
 def create_new_map():
@@ -187,8 +443,7 @@ def define_square(pos, map_data):
                 selected_type = square_types[choice-1]
                 square = None
                 if selected_type == "Go":
-                    go_count = sum(1 for sq in map_data.squares.values() if sq.square_type == 'Go')
-                    if go_count >= 1:
+                    if map_data.count('Go') >= 1:
                         display("Already exists a 'Go' square, cannot have multiple 'Go' squares.")
                         continue
                     square = GoSquare()
@@ -198,8 +453,7 @@ def define_square(pos, map_data):
                         name = prompt("Enter property name: ").strip()
                         if name == '':
                             display("Property name cannot be empty.")
-                    property_names = [sq.name for sq in map_data.squares.values() if sq.square_type == 'Property']
-                    if name in property_names:
+                    if map_data.has_property_name(name):
                         display("Duplicate property name found. Please use a different name.")
                         continue
                     while True:
@@ -232,8 +486,7 @@ def define_square(pos, map_data):
                 elif selected_type == "Go to Jail":
                     square = GoToJailSquare()
                 elif selected_type == "In Jail/Just Visiting":
-                    in_jail_count = sum(1 for sq in map_data.squares.values() if sq.square_type == 'In Jail/Just Visiting')
-                    if in_jail_count >= 1:
+                    if map_data.count('In Jail/Just Visiting') >= 1:
                         display("Already exists an 'In Jail/Just Visiting' square, cannot have multiple.")
                         continue
                     square = InJailSquare()
@@ -282,17 +535,37 @@ def edit_map(map_data):
 
 def save_map(map_data, map_file):
     display(f"Saving map to {map_file}")
-    map_data_dict = map_data.to_dict()
     try:
-        with open(map_file, 'w', encoding='utf-8') as f:
-            json.dump(map_data_dict, f, indent=4, ensure_ascii=False)
+        if map_file.endswith(BOARD_EXTENSION):
+            write_board(map_data.to_dict(), map_file)
+        else:
+            # written square by square, one per line, and beside the target:
+            # a streamed map may still be reading from the file it replaces
+            if isinstance(map_data.squares, LazySquares):
+                squares = map_data.squares.iter_dicts()
+            else:
+                squares = ((pos, square_to_dict(square)) for pos, square in sorted(map_data.squares.items()))
+            temp_file = map_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                write_map_json(map_data.map_size, squares, f)
+            os.replace(temp_file, map_file)
         display("Map saved successfully.")
     except Exception as e:
         display(f"Failed to save map: {e}")
 
-def load_map(map_file):
+def load_map(map_file, streaming=None):
     display(f"Loading map from {map_file}")
     try:
+        if is_board_file(map_file):
+            map_data = MapData.from_board(BoardFile(map_file))
+            display(f"Map loaded successfully. Map size: {map_data.map_size} squares.")
+            return map_data
+        if streaming is None:
+            streaming = os.path.getsize(map_file) >= STREAMING_MIN_BYTES
+        if streaming:
+            map_data = MapData.from_stream(map_file)
+            display(f"Map opened for streaming. Map size: {map_data.map_size} squares.")
+            return map_data
         with open(map_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
             map_data = MapData.from_dict(data)
@@ -301,67 +574,41 @@ def load_map(map_file):
     except FileNotFoundError:
         display(f"Map file {map_file} not found.")
         return None
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, MapStreamError):
         display(f"Error parsing {map_file}. Is it a valid map file?")
         return None
     except Exception as e:
         display(f"An error occurred: {e}")
         return None
 
+def close_map(map_data):
+    # streamed maps and compiled boards keep their file open until closed
+    if map_data is not None and isinstance(map_data.squares, LazySquares):
+        map_data.squares.close()
+
 def main_menu():
     display("Welcome to Monopoly Map Editor.")
-    while True:
-        display("Please select an option:")
-        options = ["Create a new map", "Load an existing map", "Exit"]
-        display_options(options)
-        choice = prompt("Enter your choice: ")
-        if choice == '1':
-            map_data = create_new_map()
-            while True:
-                display("Would you like to edit the map?")
-                edit_options = ["Yes", "No"]
-                display_options(edit_options)
-                edit_choice = prompt("Enter your choice: ")
-                if edit_choice == '1':
-                    edit_map(map_data)
-                    break
-                elif edit_choice == '2':
-                    break
-                else:
-                    display("Invalid choice.")
-            while True:
-                errors = map_data.validate_map()
-                if not errors:
-                    while True:
-                        map_file = prompt("Enter the name of the map file to save (e.g., 'custom.map'): ").strip()
-                        if map_file:
-                            save_map(map_data, map_file)
-                            break
-                        else:
-                            display("File name cannot be empty.")
-                    break  
-                else:
-                    display("Map has validation errors:")
-                    display_errors(errors)
-                    fix_options = ["Continue editing", "Discard changes"]
-                    display_options(fix_options)
-                    fix_choice = prompt("Select: ")
-                    if fix_choice == '1':
+    map_data = None
+    try:
+        while True:
+            display("Please select an option:")
+            options = ["Create a new map", "Load an existing map", "Analyze a map", "Exit"]
+            display_options(options)
+            choice = prompt("Enter your choice: ")
+            if choice == '1':
+                map_data = create_new_map()
+                while True:
+                    display("Would you like to edit the map?")
+                    edit_options = ["Yes", "No"]
+                    display_options(edit_options)
+                    edit_choice = prompt("Enter your choice: ")
+                    if edit_choice == '1':
                         edit_map(map_data)
-                    else:
-                        display("Discarding changes.")
                         break
-        elif choice == '2':
-            while True:
-                map_file = prompt("Enter the name of the map file to load: ").strip()
-                if os.path.exists(map_file):
-                    map_data = load_map(map_file)
-                    if map_data:
+                    elif edit_choice == '2':
                         break
-                else:
-                    display(f"File {map_file} does not exist.")
-            if map_data:
-                edit_map(map_data)
+                    else:
+                        display("Invalid choice.")
                 while True:
                     errors = map_data.validate_map()
                     if not errors:
@@ -372,7 +619,7 @@ def main_menu():
                                 break
                             else:
                                 display("File name cannot be empty.")
-                        break
+                        break  
                     else:
                         display("Map has validation errors:")
                         display_errors(errors)
@@ -384,11 +631,57 @@ def main_menu():
                         else:
                             display("Discarding changes.")
                             break
-        elif choice == '3':
-            display("Exiting map editor.")
-            break
-        else:
-            display("Invalid choice.")
+            elif choice == '2':
+                while True:
+                    map_file = prompt("Enter the name of the map file to load: ").strip()
+                    if os.path.exists(map_file):
+                        map_data = load_map(map_file)
+                        if map_data:
+                            break
+                    else:
+                        display(f"File {map_file} does not exist.")
+                if map_data:
+                    edit_map(map_data)
+                    while True:
+                        errors = map_data.validate_map()
+                        if not errors:
+                            while True:
+                                map_file = prompt("Enter the name of the map file to save (e.g., 'custom.map'): ").strip()
+                                if map_file:
+                                    save_map(map_data, map_file)
+                                    break
+                                else:
+                                    display("File name cannot be empty.")
+                            break
+                        else:
+                            display("Map has validation errors:")
+                            display_errors(errors)
+                            fix_options = ["Continue editing", "Discard changes"]
+                            display_options(fix_options)
+                            fix_choice = prompt("Select: ")
+                            if fix_choice == '1':
+                                edit_map(map_data)
+                            else:
+                                display("Discarding changes.")
+                                break
+                    close_map(map_data)
+            elif choice == '3':
+                map_file = prompt("Enter the name of the map file to analyze: ").strip()
+                map_data = load_map(map_file)
+                if map_data:
+                    try:
+                        display_map_analysis(analyze_map(map_data))
+                    except ImportError as e:
+                        display(f"Map analysis unavailable: {e}")
+                    close_map(map_data)
+            elif choice == '4':
+                display("Exiting map editor.")
+                break
+            else:
+                display("Invalid choice.")
+    finally:
+        close_map(map_data)
+
 
 if __name__ == "__main__":
     main_menu()
\ No newline at end of file
@@ -0,0 +1,148 @@
+import argparse
+import os
+import random
+import time
+
+from board_file import write_board
+from map_editor import BOARD_EXTENSION, MapData, square_from_dict
+from map_stream import write_map_json
+
+MIN_MAP_SIZE = 8
+# share of each square type among the squares after Go and the jail
+DEFAULT_MIX = {'Property': 0.7, 'Chance': 0.1, 'Income Tax': 0.06, 'Free Parking': 0.06, 'Go to Jail': 0.08}
+# Go and the jail are placed by the generator so there is never more than one
+PLACED_TYPES = ('Go', 'In Jail/Just Visiting')
+NAME_STEMS = ('Central', 'Wan Chai', 'Stanley', 'Shek O', 'Mong Kok', 'Tsing Yi', 'Shatin', 'Tuen Mun',
+              'Tai Po', 'Sai Kung', 'Yuen Long', 'Tai O')
+# square types drawn from the rng at a time
+BATCH_SIZE = 4096
+
+
+class MapSpec:
+    def __init__(self, size, mix=None, price_range=(100, 1000), price_step=10, rent_ratio=(0.02, 0.15),
+                 seed=0, jail=None):
+        self.size = size
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        self.price_range = price_range
+        self.price_step = price_step
+        self.rent_ratio = rent_ratio
+        self.seed = seed
+        # None: a jail exactly when Go to Jail squares can be drawn
+        self.jail = self.mix.get('Go to Jail', 0) > 0 if jail is None else jail
+        self.check()
+
+    def check(self):
+        if self.size < MIN_MAP_SIZE:
+            raise ValueError(f"Map size must be at least {MIN_MAP_SIZE}.")
+        for square_type, weight in self.mix.items():
+            if square_type in PLACED_TYPES:
+                raise ValueError(f"'{square_type}' is placed by the generator and cannot be in the mix.")
+            if weight < 0:
+                raise ValueError(f"Weight of '{square_type}' cannot be negative.")
+        if sum(self.mix.values()) <= 0:
+            raise ValueError("The square type mix needs at least one positive weight.")
+        if self.mix.get('Go to Jail', 0) > 0 and not self.jail:
+            raise ValueError("A map with 'Go to Jail' squares needs an 'In Jail/Just Visiting' square.")
+        low, high = self.price_range
+        if not 0 <= low <= high:
+            raise ValueError("Price range must be two non-negative numbers, lowest first.")
+        if self.price_step <= 0:
+            raise ValueError("Price step must be positive.")
+        if not 0 <= self.rent_ratio[0] <= self.rent_ratio[1]:
+            raise ValueError("Rent ratio must be two non-negative numbers, lowest first.")
+
+    def jail_position(self):
+        # a quarter of the way round, as on the classic board
+        return self.size // 4 + 1 if self.jail else None
+
+
+def property_name(index):
+    # unique for every index: the stem cycles and the number counts the cycles
+    return f"{NAME_STEMS[index % len(NAME_STEMS)]} {index // len(NAME_STEMS) + 1}"
+
+
+def generate_squares(spec):
+    # (position, square dict) for positions 1..size, produced one at a time
+    rng = random.Random(spec.seed)
+    types = [square_type for square_type, weight in spec.mix.items() if weight > 0]
+    weights = [spec.mix[square_type] for square_type in types]
+    low, high = spec.price_range
+    steps = (high - low) // spec.price_step + 1
+    min_ratio, max_ratio = spec.rent_ratio
+    ratio_span = max_ratio - min_ratio
+    random_ = rng.random
+    jail_position = spec.jail_position()
+    properties = 0
+    drawn = []
+    yield 1, {'square_type': 'Go', 'name': 'Go'}
+    for pos in range(2, spec.size + 1):
+        if pos == jail_position:
+            yield pos, {'square_type': 'In Jail/Just Visiting', 'name': 'In Jail/Just Visiting'}
+            continue
+        if not drawn:
+            drawn = rng.choices(types, weights, k=BATCH_SIZE)
+        square_type = drawn.pop()
+        if square_type == 'Property':
+            price = low + int(random_() * steps) * spec.price_step
+            rent = round(price * (min_ratio + random_() * ratio_span))
+            yield pos, {'square_type': 'Property', 'name': property_name(properties),
+                        'price': price, 'rent': rent, 'owner': None}
+            properties += 1
+        else:
+            yield pos, {'square_type': square_type, 'name': square_type}
+
+
+def generate_map(spec):
+    map_data = MapData(spec.size)
+    for pos, sq_data in generate_squares(spec):
+        map_data.add_square(pos, square_from_dict(sq_data))
+    return map_data
+
+
+def write_map(spec, map_file):
+    # .map files are written square by square; compiled boards are built in memory
+    if map_file.endswith(BOARD_EXTENSION):
+        squares = {str(pos): sq_data for pos, sq_data in generate_squares(spec)}
+        write_board({'map_size': spec.size, 'squares': squares}, map_file)
+        return
+    temp_file = map_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        write_map_json(spec.size, generate_squares(spec), f)
+    os.replace(temp_file, map_file)
+
+
+def parse_mix(items):
+    mix = {}
+    for item in items:
+        square_type, _, weight = item.rpartition('=')
+        if not square_type:
+            raise argparse.ArgumentTypeError(f"Expected TYPE=WEIGHT, got {item!r}.")
+        mix[square_type] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a valid Monopoly map of any size.")
+    parser.add_argument('map_file', help="output .map file, or .board for a compiled board")
+    parser.add_argument('--size', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mix', nargs='*', default=None, metavar='TYPE=WEIGHT',
+                        help="square type weights, e.g. Property=0.7 Chance=0.3")
+    parser.add_argument('--price', type=int, nargs=2, default=(100, 1000), metavar=('LOW', 'HIGH'))
+    parser.add_argument('--price-step', type=int, default=10)
+    parser.add_argument('--rent-ratio', type=float, nargs=2, default=(0.02, 0.15), metavar=('LOW', 'HIGH'))
+    parser.add_argument('--no-jail', action='store_true', help="leave out the jail (needs no Go to Jail in the mix)")
+    args = parser.parse_args()
+
+    try:
+        spec = MapSpec(args.size, None if args.mix is None else parse_mix(args.mix), tuple(args.price),
+                       args.price_step, tuple(args.rent_ratio), args.seed, False if args.no_jail else None)
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    write_map(spec, args.map_file)
+    print(f"Wrote {args.size} squares to {args.map_file} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
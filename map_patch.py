@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from map_editor import BOARD_EXTENSION, LazySquares, load_map, save_map, square_from_dict, square_to_dict
+
+# A patch file is a JSON list of operations, applied in order:
+#   {"op": "set", "positions": "100-200", "square": {"square_type": "Chance"}}
+#       replace squares; a property name may contain {position}
+#   {"op": "reprice", "price": 1.1, "rent": 1.1}
+#       scale property prices and/or rents, rounded to whole dollars
+#   {"op": "rename", "names": {"Central": "Admiralty"}}
+#   {"op": "rename", "replace": ["Street", "Road"]}
+#       rename properties by exact name or by substring
+# Every operation may carry "positions": a position, "first-last", or a list
+# of those; without it the operation applies to the whole map.
+MAP_EXTENSIONS = ('.map', BOARD_EXTENSION)
+# nobody waits on the first page in a batch, so .map files are only streamed
+# when reading them whole would take too much memory
+BATCH_STREAMING_MIN_BYTES = 256 << 20
+
+
+class PatchError(ValueError):
+    pass
+
+
+def parse_positions(positions):
+    # list of (first, last) ranges, inclusive
+    if isinstance(positions, list):
+        return [r for item in positions for r in parse_positions(item)]
+    try:
+        if isinstance(positions, int):
+            return [(positions, positions)]
+        first, _, last = str(positions).partition('-')
+        return [(int(first), int(last or first))]
+    except ValueError:
+        raise PatchError(f"Invalid positions {positions!r}.") from None
+
+
+def _set_square(operation):
+    square = operation.get('square')
+    if not isinstance(square, dict) or 'square_type' not in square:
+        raise PatchError("'set' needs a square with a square_type.")
+    if square['square_type'] == 'Property':
+        for key in ('name', 'price', 'rent'):
+            if key not in square:
+                raise PatchError(f"A property square needs a {key}.")
+    square = dict(square)
+    square.setdefault('name', square['square_type'])
+    name = square['name']
+    try:
+        name.format(position=0)
+    except (KeyError, IndexError, ValueError):
+        raise PatchError(f"Invalid name template {name!r}.") from None
+
+    def apply(pos, sq_data):
+        return dict(square, name=name.format(position=pos))
+    return apply
+
+
+def _reprice(operation):
+    price = operation.get('price', 1)
+    rent = operation.get('rent', 1)
+    if not isinstance(price, (int, float)) or not isinstance(rent, (int, float)):
+        raise PatchError("'reprice' factors must be numbers.")
+
+    def apply(pos, sq_data):
+        if sq_data is None or sq_data['square_type'] != 'Property':
+            return None
+        return dict(sq_data, price=round(sq_data['price'] * price), rent=round(sq_data['rent'] * rent))
+    return apply
+
+
+def _rename(operation):
+    names = operation.get('names', {})
+    replace = operation.get('replace')
+    if replace is not None and (not isinstance(replace, list) or len(replace) != 2):
+        raise PatchError("'replace' must be [old, new].")
+
+    def apply(pos, sq_data):
+        if sq_data is None or sq_data['square_type'] != 'Property':
+            return None
+        name = names.get(sq_data['name'], sq_data['name'])
+        if replace is not None:
+            name = name.replace(*replace)
+        return dict(sq_data, name=name) if name != sq_data['name'] else None
+    return apply
+
+
+OPERATIONS = {'set': _set_square, 'reprice': _reprice, 'rename': _rename}
+
+
+def compile_patch(operations):
+    # [(ranges or None, apply(pos, square dict or None) -> new dict or None)]
+    if not isinstance(operations, list):
+        raise PatchError("A patch must be a list of operations.")
+    compiled = []
+    for index, operation in enumerate(operations, 1):
+        try:
+            if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+                raise PatchError(f"Unknown operation, expected one of {', '.join(OPERATIONS)}.")
+            ranges = parse_positions(operation['positions']) if 'positions' in operation else None
+            compiled.append((ranges, OPERATIONS[operation['op']](operation)))
+        except PatchError as e:
+            raise PatchError(f"Operation {index}: {e}") from None
+    return compiled
+
+
+def read_patch(patch_file):
+    with open(patch_file, 'r', encoding='utf-8') as f:
+        return compile_patch(json.load(f))
+
+
+def _positions(map_data, compiled):
+    # every position a patch can touch, in order
+    if any(ranges is None for ranges, _ in compiled):
+        return range(1, map_data.map_size + 1)
+    positions = set()
+    for ranges, _ in compiled:
+        for first, last in ranges:
+            positions.update(range(max(first, 1), min(last, map_data.map_size) + 1))
+    return sorted(positions)
+
+
+def apply_patch(map_data, compiled):
+    # One pass over the map: every operation only looks at the square it
+    # changes, so each square goes through the whole list before the next.
+    # Returns the number of squares changed.
+    changed = 0
+    for pos in _positions(map_data, compiled):
+        square = map_data.get_square(pos)
+        sq_data = original = None if square is None else square_to_dict(square)
+        for ranges, apply in compiled:
+            if ranges is not None and not any(first <= pos <= last for first, last in ranges):
+                continue
+            result = apply(pos, sq_data)
+            if result is not None:
+                sq_data = result
+        if sq_data != original:
+            map_data.edit_square(pos, square_from_dict(sq_data))
+            changed += 1
+    return changed
+
+
+def patch_map(map_file, compiled, output_file=None, dry_run=False):
+    # (squares changed, validation errors); the map is saved only when valid
+    try:
+        streaming = os.path.getsize(map_file) >= BATCH_STREAMING_MIN_BYTES
+    except OSError:
+        streaming = False
+    map_data = load_map(map_file, streaming)
+    if map_data is None:
+        return 0, [f"Could not load {map_file}."]
+    changed = apply_patch(map_data, compiled)
+    errors = map_data.validate_map()
+    if (changed or output_file) and not errors and not dry_run:
+        save_map(map_data, output_file or map_file)
+    if isinstance(map_data.squares, LazySquares):
+        map_data.squares.close()
+    return changed, errors
+
+
+def map_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(MAP_EXTENSIONS):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a patch file to Monopoly maps without prompts.")
+    parser.add_argument('patch_file')
+    parser.add_argument('maps', nargs='+', help="map files, or directories of .map/.board files")
+    parser.add_argument('--output-dir', help="write patched maps here instead of over the originals")
+    parser.add_argument('--dry-run', action='store_true', help="apply and validate, but do not save")
+    args = parser.parse_args()
+
+    try:
+        compiled = read_patch(args.patch_file)
+    except (OSError, json.JSONDecodeError, PatchError) as e:
+        parser.error(f"{args.patch_file}: {e}")
+    failed = 0
+    start = time.perf_counter()
+    files = list(map_files(args.maps))
+    for map_file in files:
+        output_file = None
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            output_file = os.path.join(args.output_dir, os.path.basename(map_file))
+        changed, errors = patch_map(map_file, compiled, output_file, args.dry_run)
+        if errors:
+            failed += 1
+            print(f"{map_file}: not saved, {changed} squares changed")
+            for error in errors:
+                print(f"    {error}")
+        else:
+            print(f"{map_file}: {changed} squares changed")
+    print(f"Patched {len(files) - failed} of {len(files)} maps in {time.perf_counter() - start:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+# a single square is a few hundred bytes; random reads start with this much
+SQUARE_CHUNK_SIZE = 1 << 10
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*').match
+_key = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*').match
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+class MapStreamError(ValueError):
+    pass
+
+
+class _Buffer:
+    # Text window over a binary file that can tell the byte offset of the
+    # current position, so a square's place in the file can be recorded.
+    def __init__(self, f, offset=0, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.index = 0
+        # byte offset of text[mark]; ASCII text needs no encoding to count bytes
+        self.base = offset
+        self.mark = 0
+        self.ascii = True
+        self.eof = False
+
+    @property
+    def offset(self):
+        if self.ascii:
+            return self.base + self.index - self.mark
+        self.base += len(self.text[self.mark:self.index].encode('utf-8'))
+        self.mark = self.index
+        return self.base
+
+    def fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.base = self.offset
+        self.text = self.text[self.index:] + self.decoder.decode(chunk, final=not chunk)
+        self.index = self.mark = 0
+        self.ascii = self.text.isascii()
+
+    def consume(self, end):
+        self.index = end
+
+    def skip_whitespace(self):
+        while True:
+            self.index = _whitespace(self.text, self.index).end()
+            if self.index < len(self.text) or self.eof:
+                return
+            self.fill()
+
+    def peek(self):
+        self.skip_whitespace()
+        return self.text[self.index] if self.index < len(self.text) else ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise MapStreamError(f"Expected {char!r} at byte {self.offset}.")
+        self.index += 1
+
+    def value(self):
+        # one complete JSON value; refills until it is not cut off by the buffer end
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.index)
+                if end < len(self.text) or self.eof:
+                    self.index = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise MapStreamError(f"Invalid JSON at byte {self.offset}: {e.msg}") from None
+            self.fill()
+
+    def key(self):
+        # the next "key": of an object, matched directly when it has no escapes
+        match = _key(self.text, self.index)
+        if match and match.end() < len(self.text):
+            self.index = match.end()
+            return match.group(1)
+        key = self.value()
+        self.expect(':')
+        self.skip_whitespace()
+        return key
+
+
+def read_square(f, offset):
+    # the square whose JSON value starts at offset
+    f.seek(offset)
+    buffer = _Buffer(f, offset, SQUARE_CHUNK_SIZE)
+    buffer.fill()
+    return buffer.value()
+
+
+class MapStream:
+    # Incremental reader of a .map JSON file. The top-level fields before
+    # "squares" are read up front; squares() then yields
+    # (position, square, byte offset) one entry at a time.
+    def __init__(self, f):
+        self.f = f
+        self.header = {}
+        self.buffer = _Buffer(f)
+        self.buffer.fill()
+        self.buffer.expect('{')
+        self.in_squares = False
+        self.done = False
+        self._read_fields()
+
+    def _read_fields(self):
+        # top-level "key": value pairs up to the squares object (or the end)
+        buffer = self.buffer
+        while True:
+            if buffer.peek() == '}':
+                buffer.consume(buffer.index + 1)
+                self.done = True
+                return
+            key = buffer.key()
+            if key == 'squares':
+                buffer.expect('{')
+                self.in_squares = True
+                if buffer.peek() == '}':
+                    buffer.consume(buffer.index + 1)
+                    self._after_squares()
+                return
+            self.header[key] = buffer.value()
+            self._separator()
+
+    def _separator(self):
+        if self.buffer.peek() == ',':
+            self.buffer.consume(self.buffer.index + 1)
+
+    def _after_squares(self):
+        self.in_squares = False
+        self._separator()
+        self._read_fields()
+
+    def squares(self):
+        buffer = self.buffer
+        while self.in_squares:
+            key = buffer.key()
+            offset = buffer.offset
+            square = buffer.value()
+            try:
+                position = int(key)
+            except ValueError:
+                raise MapStreamError(f"Square key {key!r} is not a position.") from None
+            if buffer.peek() == ',':
+                buffer.consume(buffer.index + 1)
+            else:
+                buffer.expect('}')
+                self._after_squares()
+            yield position, square, offset
+
+
+def iter_squares(map_file):
+    # (position, square dict) for every square of a .map file, parsed incrementally
+    with open(map_file, 'rb') as f:
+        stream = MapStream(f)
+        for position, square, _ in stream.squares():
+            yield position, square
+
+
+def write_map_json(map_size, squares, f):
+    # writes a .map document from an iterable of (position, square dict)
+    # without building it in memory, one square per line
+    f.write(f'{{\n    "map_size": {map_size},\n    "squares": {{')
+    separator = '\n'
+    lines = []
+    for position, square in squares:
+        lines.append(f'{separator}        "{position}": {_encode(square)}')
+        separator = ',\n'
+        if len(lines) == 1024:
+            f.write(''.join(lines))
+            lines = []
+    f.write(''.join(lines))
+    f.write('\n    }\n}\n')
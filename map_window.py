@@ -0,0 +1,84 @@
+from bisect import bisect_left
+
+from model import BoardSquares, ForkedSquares
+
+# squares shown at a time; the default board fits on one page
+MAP_PAGE_SIZE = 20
+
+
+def square_line(pos, square):
+    owner = square.get('owner')
+    if owner:
+        return f"Position {pos}: {square['name']} ({square['square_type']}, owned by {owner})"
+    return f"Position {pos}: {square['name']} ({square['square_type']})"
+
+
+class MapWindow:
+    # The board a page at a time. Formatted lines are cached by position along
+    # with the owner they show, so showing a page again only formats the
+    # squares whose owner changed since they were last shown.
+    def __init__(self, squares, page_size=MAP_PAGE_SIZE):
+        self.squares = squares
+        self.page_size = page_size
+        # squares are never added or removed during a game
+        self.positions = sorted(int(pos) for pos in squares.keys())
+        self.by_type = {}
+        self.lines = {}
+        self.formatted = 0
+
+    def square(self, pos):
+        try:
+            return self.squares[pos]
+        except KeyError:
+            # plain dicts keyed like the JSON map
+            return self.squares[str(pos)]
+
+    def line(self, pos):
+        # (line, entry) for one square, formatted again only if its owner changed
+        square = self.square(pos)
+        owner = square.get('owner') or None
+        cached = self.lines.get(pos)
+        if cached is not None and cached[0] == owner:
+            return cached[1], cached[2]
+        line = square_line(pos, square)
+        entry = {'position': pos, 'name': square['name'], 'square_type': square['square_type'], 'owner': owner}
+        self.lines[pos] = (owner, line, entry)
+        self.formatted += 1
+        return line, entry
+
+    def of_type(self, square_type):
+        # positions of every square of a type, ignoring case; types never change
+        # in play, so each type is looked up once
+        key = square_type.lower()
+        positions = self.by_type.get(key)
+        if positions is None:
+            squares = self.squares.base() if isinstance(self.squares, ForkedSquares) else self.squares
+            if isinstance(squares, BoardSquares):
+                board = squares.board
+                names = [name for name in board.type_names if name.lower() == key]
+                positions = list(board.positions_of(names[0])) if names else []
+            else:
+                positions = [pos for pos in self.positions if self.square(pos)['square_type'].lower() == key]
+            self.by_type[key] = positions
+        return positions
+
+    def owned_by(self, owner):
+        key = owner.lower()
+        if isinstance(self.squares, (BoardSquares, ForkedSquares)):
+            return sorted(pos for pos, _, name in self.squares.owned() if name and name.lower() == key)
+        return [pos for pos in self.positions if (self.square(pos).get('owner') or '').lower() == key]
+
+    def page_start(self, positions, position):
+        # index of the first square of the page that has position in its middle
+        index = bisect_left(positions, position)
+        return max(0, min(index - self.page_size // 2, len(positions) - self.page_size))
+
+    def page(self, positions, start):
+        # (lines, entries) of the page starting at index start
+        lines = []
+        entries = []
+        for pos in positions[start:start + self.page_size]:
+            line, entry = self.line(pos)
+            lines.append(line)
+            entries.append(entry)
+        return lines, entries
@@ -1,75 +1,930 @@
 import json
 import os
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from board_file import BoardFile, is_board_file
+from journal import last_snapshot, journal_tail
+from save_catalog import record_save, find_entry
+from save_format import decode_binary, is_binary
+from save_writer import SaveWriter, write_atomic
+
+# Two 4-sided dice move a player at most 8 squares per throw
+MAX_STEPS = 8
+# frozen layers a forked board may stack before they are merged (see ForkedSquares)
+MAX_FORK_DEPTH = 16
+
+
+# marks a slot that was never assigned, i.e. a key the JSON square did not have
+_UNSET = object()
+
+
+class Record:
+    # Base for compact __slots__ records that still answer dict-style access
+    # (record['cash'], record.get('owner')), so views, policies and saves that
+    # expect the JSON dicts keep working.
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def to_dict(self):
+        data = {}
+        for key in self.__slots__:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                data[key] = value
+        return data
+
+    def copy(self):
+        record = object.__new__(type(self))
+        for key in self.__slots__:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                setattr(record, key, value)
+        return record
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls.__new__(cls)
+        for key, value in data.items():
+            if key in cls.__slots__:
+                setattr(record, key, value)
+        return record
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Player(Record):
+    __slots__ = ('name', 'cash', 'position', 'in_jail', 'jail_turns', 'bankrupt', 'properties')
+
+    def __init__(self, name, cash=1500, position=1, in_jail=False, jail_turns=0, bankrupt=False,
+                 properties=None):
+        self.name = name
+        self.cash = cash
+        self.position = position
+        self.in_jail = in_jail
+        self.jail_turns = jail_turns
+        self.bankrupt = bankrupt
+        self.properties = properties if properties is not None else []
+
+    @classmethod
+    def from_dict(cls, data):
+        # every player field is always present, older saves may omit properties
+        player = cls(data.get('name'))
+        for key, value in data.items():
+            if key in cls.__slots__:
+                setattr(player, key, value)
+        if player.properties is None:
+            player.properties = []
+        return player
+
+    def copy(self):
+        player = super().copy()
+        player.properties = list(self.properties)
+        return player
+
+
+class Square(Record):
+    # Only the fields present in the map are set, so to_dict() reproduces the
+    # original JSON (non-property squares have no price, rent or owner).
+    __slots__ = ('square_type', 'name', 'price', 'rent', 'owner', 'owner_id')
+
+
+class RecordTable:
+    # List-backed replacement for the {"1": {...}, "2": {...}} dicts of the save
+    # format. Records are looked up by integer id or position; the string keys
+    # of the JSON layout are still accepted and are what keys()/items() return.
+    __slots__ = ('record_type', 'records')
+
+    def __init__(self, record_type, records=None):
+        self.record_type = record_type
+        self.records = records if records is not None else []
+
+    @classmethod
+    def from_dict(cls, data, record_type):
+        keyed = [(cls._int_key(key), value) for key, value in data.items()]
+        records = [None] * max((key for key, _ in keyed), default=0)
+        make = record_type.from_dict
+        for key, value in keyed:
+            if key < 1:
+                raise KeyError(key)
+            records[key - 1] = value if isinstance(value, record_type) else make(value)
+        return cls(record_type, records)
+
+    def __getitem__(self, key):
+        try:
+            if key > 0:
+                record = self.records[key - 1]
+                if record is not None:
+                    return record
+        except TypeError:
+            return self[self._int_key(key)]
+        except IndexError:
+            pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        index = self._int_key(key) - 1
+        if index < 0:
+            raise KeyError(key)
+        if not isinstance(value, self.record_type):
+            value = self.record_type.from_dict(value)
+        if index >= len(self.records):
+            self.records.extend([None] * (index + 1 - len(self.records)))
+        self.records[index] = value
+
+    def writable(self, key):
+        # the record to change in place (see ForkedSquares.writable)
+        return self[key]
+
+    @staticmethod
+    def _int_key(key):
+        try:
+            return int(key)
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return sum(1 for record in self.records if record is not None)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return [str(i) for i, record in enumerate(self.records, 1) if record is not None]
+
+    def values(self):
+        return [record for record in self.records if record is not None]
+
+    def items(self):
+        return [(str(i), record) for i, record in enumerate(self.records, 1) if record is not None]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {key: record.to_dict() for key, record in self.items()}
+
+    def __eq__(self, other):
+        if isinstance(other, RecordTable):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+
+class BoardSquares:
+    # RecordTable-compatible squares of a compiled board (board_file.BoardFile).
+    # A Square record is built the first time its position is read and kept,
+    # so the game's ownership changes live in those records; the rest of the
+    # board stays in the memory map.
+    __slots__ = ('board', 'loaded')
+
+    def __init__(self, board):
+        self.board = board
+        self.loaded = {}
+
+    def __getitem__(self, key):
+        try:
+            return self.loaded[key]
+        except KeyError:
+            pass
+        position = RecordTable._int_key(key)
+        record = self.loaded.get(position)
+        if record is None:
+            sq = self.board.square(position)
+            if sq is None:
+                raise KeyError(key)
+            record = self.loaded[position] = Square.from_dict(sq)
+        return record
+
+    def __setitem__(self, key, value):
+        position = RecordTable._int_key(key)
+        self.loaded[position] = value if isinstance(value, Square) else Square.from_dict(value)
+
+    def writable(self, key):
+        return self[key]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def _positions(self):
+        positions = set(self.board.positions())
+        positions.update(self.loaded)
+        return sorted(positions)
+
+    def __len__(self):
+        return len(self._positions())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return [str(pos) for pos in self._positions()]
+
+    def values(self):
+        return [self[pos] for pos in self._positions()]
+
+    def items(self):
+        return [(str(pos), self[pos]) for pos in self._positions()]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def owned(self):
+        # (position, owner_id, owner name) of squares that record an owner
+        seen = set()
+        for pos, owner_id, owner in self.board.owned():
+            seen.add(pos)
+            record = self.loaded.get(pos)
+            if record is not None:
+                owner_id, owner = record.get('owner_id'), record.get('owner')
+            yield pos, owner_id, owner
+        for pos, record in self.loaded.items():
+            if pos not in seen and (record.get('owner_id') is not None or record.get('owner')):
+                yield pos, record.get('owner_id'), record.get('owner')
+
+    def to_dict(self):
+        # squares never read are converted straight from the columns
+        squares = {}
+        for pos in self._positions():
+            record = self.loaded.get(pos)
+            squares[str(pos)] = record.to_dict() if record is not None else self.board.square(pos)
+        return squares
+
+    def __eq__(self, other):
+        if isinstance(other, (RecordTable, BoardSquares)):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+
+class ForkedSquares:
+    # Squares of a GameState that has been forked (see GameState.fork): a chain
+    # of layers, each holding only the records written in it. parent is the
+    # frozen layer below (or the table the first fork was made from) and is
+    # never written to again; reads walk down the chain without copying, and
+    # writable() copies a record into own the first time this state changes it.
+    __slots__ = ('parent', 'own', 'depth')
+
+    def __init__(self, parent, own=None):
+        self.parent = parent
+        self.own = own if own is not None else {}
+        self.depth = parent.depth + 1 if isinstance(parent, ForkedSquares) else 1
+
+    def fork(self):
+        # freezes this state's records into a new layer below it, so a fork
+        # costs the same however much of the board either side has changed
+        if self.own:
+            self.parent = ForkedSquares(self.parent, self.own)
+            self.own = {}
+            self.depth = self.parent.depth + 1
+            if self.depth > MAX_FORK_DEPTH:
+                self._flatten()
+        return ForkedSquares(self.parent)
+
+    def _frozen(self):
+        # (base table, the records written in the frozen layers with the newest
+        # of each position); costs only the records ever written
+        layers = []
+        table = self.parent
+        while isinstance(table, ForkedSquares):
+            layers.append(table.own)
+            table = table.parent
+        merged = {}
+        for own in reversed(layers):
+            merged.update(own)
+        return table, merged
+
+    def _flatten(self):
+        # merges the frozen layers into one, keeping reads short on a state
+        # that is forked every turn
+        table, merged = self._frozen()
+        self.parent = ForkedSquares(table, merged)
+        self.depth = 2
+
+    def base(self):
+        # the table the first fork was made from, so a compiled board's column
+        # lookups still serve layout questions (types never change in play)
+        table = self.parent
+        while isinstance(table, ForkedSquares):
+            table = table.parent
+        return table
+
+    def owned(self):
+        # (position, owner_id, owner name) of squares that record an owner: the
+        # base table's own lookup, corrected by the records written since
+        table, changed = self._frozen()
+        changed.update(self.own)
+        for pos, owner_id, owner in _square_owners(table):
+            if pos not in changed and (owner_id is not None or owner):
+                yield pos, owner_id, owner
+        for pos, record in changed.items():
+            owner_id, owner = record.get('owner_id'), record.get('owner')
+            if owner_id is not None or owner:
+                yield pos, owner_id, owner
+
+    def _record(self, position):
+        # the current record at position, without copying it
+        table = self
+        while True:
+            record = table.own.get(position)
+            if record is not None:
+                return record
+            table = table.parent
+            if not isinstance(table, ForkedSquares):
+                return table[position]
+
+    def __getitem__(self, key):
+        return self._record(key if type(key) is int else RecordTable._int_key(key))
+
+    def writable(self, key):
+        # the record to change in place, copied into this state on first write
+        position = RecordTable._int_key(key)
+        record = self.own.get(position)
+        if record is None:
+            record = self.own[position] = self._record(position).copy()
+        return record
+
+    def __setitem__(self, key, value):
+        position = RecordTable._int_key(key)
+        self.own[position] = value if isinstance(value, Square) else Square.from_dict(value)
+
+    def __contains__(self, key):
+        try:
+            self._record(RecordTable._int_key(key))
+        except KeyError:
+            return False
+        return True
+
+    def _positions(self):
+        positions = set()
+        table = self
+        while isinstance(table, ForkedSquares):
+            positions.update(table.own)
+            table = table.parent
+        positions.update(int(pos) for pos in table.keys())
+        return sorted(positions)
+
+    def __len__(self):
+        return len(self._positions())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return [str(pos) for pos in self._positions()]
+
+    def values(self):
+        return [self._record(pos) for pos in self._positions()]
+
+    def items(self):
+        return [(str(pos), self._record(pos)) for pos in self._positions()]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {str(pos): self._record(pos).to_dict() for pos in self._positions()}
+
+    def __eq__(self, other):
+        if isinstance(other, (RecordTable, BoardSquares, ForkedSquares)):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+
+class _LazyMapping(Mapping):
+    # read-only mapping built on first use
+    def __init__(self, build):
+        self.build = build
+        self.data = None
+
+    def _mapping(self):
+        if self.data is None:
+            self.data = self.build()
+        return self.data
+
+    def __getitem__(self, key):
+        return self._mapping()[key]
+
+    def __iter__(self):
+        return iter(self._mapping())
+
+    def __len__(self):
+        return len(self._mapping())
+
+
+def _square_owners(squares):
+    # (position, owner_id, owner name) of every square
+    if isinstance(squares, (BoardSquares, ForkedSquares)):
+        return squares.owned()
+    return ((int(pos), sq.get('owner_id'), sq.get('owner')) for pos, sq in squares.items())
+
+
+def to_plain(table):
+    # JSON-ready form of a squares/players table, whether compact or plain dicts
+    return table.to_dict() if isinstance(table, (RecordTable, BoardSquares, ForkedSquares)) else table
+
+
+class BoardIndex:
+    # Read-only lookups over a board's layout, built once per game so the turn
+    # loop never scans every square. Only squares' layout is indexed, not owners.
+    __slots__ = ('map_size', 'jail_position', 'go_position', 'property_positions',
+                 'positions_by_type', 'wrap_moves')
+
+    def __init__(self, squares, map_size, max_steps=MAX_STEPS):
+        if isinstance(squares, BoardSquares):
+            # a compiled board's layout is fixed and can be huge: the two squares
+            # the game needs are found in its type column, the rest waits for first use
+            board = squares.board
+            jail_position = board.first_position('In Jail/Just Visiting')
+            go_position = board.first_position('Go')
+            property_positions = _LazyMapping(board.property_positions)
+            positions_by_type = _LazyMapping(
+                lambda: {square_type: board.positions_of(square_type) for square_type in board.type_names})
+        else:
+            jail_position, go_position, property_positions, positions_by_type = self._scan(squares)
+
+        # Only throws that cross the end of the board need more than an addition,
+        # so the move table covers the last max_steps squares and stays tiny.
+        wrap_moves = {}
+        for pos in range(max(1, map_size - max_steps + 1), map_size + 1):
+            for steps in range(1, max_steps + 1):
+                wrap_moves[(pos, steps)] = self._compute_move(map_size, pos, steps)
+
+        set_field = object.__setattr__
+        set_field(self, 'map_size', map_size)
+        set_field(self, 'jail_position', jail_position)
+        set_field(self, 'go_position', go_position)
+        set_field(self, 'property_positions', MappingProxyType(property_positions))
+        set_field(self, 'positions_by_type', MappingProxyType(positions_by_type))
+        set_field(self, 'wrap_moves', MappingProxyType(wrap_moves))
+
+    @staticmethod
+    def _scan(squares):
+        jail_position = None
+        go_position = None
+        property_positions = {}
+        positions_by_type = {}
+        for pos_str, sq in squares.items():
+            pos = int(pos_str)
+            square_type = sq.get('square_type')
+            positions_by_type.setdefault(square_type, []).append(pos)
+            if square_type == 'In Jail/Just Visiting' and jail_position is None:
+                jail_position = pos
+            elif square_type == 'Go' and go_position is None:
+                go_position = pos
+            elif square_type == 'Property':
+                property_positions.setdefault(sq['name'], pos)
+        positions_by_type = {square_type: tuple(positions) for square_type, positions in positions_by_type.items()}
+        return jail_position, go_position, property_positions, positions_by_type
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardIndex is read-only")
+
+    @staticmethod
+    def _compute_move(map_size, position, steps):
+        new_position = (position + steps - 1) % map_size + 1
+        return new_position, position + steps > map_size and new_position != 1
+
+    def move(self, position, steps):
+        # (new_position, passed_go) exactly as handle_dice_throw has always computed it
+        if position + steps <= self.map_size:
+            return position + steps, False
+        move = self.wrap_moves.get((position, steps))
+        if move is None:
+            move = self._compute_move(self.map_size, position, steps)
+        return move
+
+    def positions_of(self, square_type):
+        return self.positions_by_type.get(square_type, ())
+
+
+class OwnershipLedger:
+    # Property ownership keyed by player id in both directions. Squares keep
+    # their 'owner' name (and 'owner_id') so saves and views stay readable.
+    # Like ForkedSquares, a forked ledger is a chain of layers: parent is the
+    # frozen layer below and owners holds only the positions changed in this
+    # one (None once released), so a change after a fork costs the same
+    # however many properties are owned. holdings is kept by the bottom layer.
+    def __init__(self, parent=None, owners=None):
+        self.parent = parent
+        self.owners = owners if owners is not None else {}
+        self.holdings = {}
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    @staticmethod
+    def from_squares(squares, players):
+        ledger = OwnershipLedger()
+        ids_by_name = {}
+        for pid, player in players.items():
+            ids_by_name.setdefault(player['name'], int(pid))
+        for pos, owner_id, owner in _square_owners(squares):
+            if owner_id is None and owner:
+                # older saves only recorded the owner's name
+                owner_id = ids_by_name.get(owner)
+            if owner_id is not None:
+                ledger.acquire(pos, int(owner_id))
+        return ledger
+
+    def owner_of(self, position):
+        ledger = self
+        while ledger.parent is not None:
+            if position in ledger.owners:
+                return ledger.owners[position]
+            ledger = ledger.parent
+        return ledger.owners.get(position)
+
+    def _layers(self):
+        # (bottom layer, changes of the layers above it, oldest first)
+        layers = []
+        ledger = self
+        while ledger.parent is not None:
+            layers.append(ledger.owners)
+            ledger = ledger.parent
+        layers.reverse()
+        return ledger, layers
+
+    def positions_of(self, owner_id):
+        if self.parent is None:
+            return self.holdings.get(owner_id, set())
+        bottom, layers = self._layers()
+        positions = set(bottom.holdings.get(owner_id, ()))
+        for owners in layers:
+            for position, owner in owners.items():
+                if owner == owner_id:
+                    positions.add(position)
+                else:
+                    positions.discard(position)
+        return positions
+
+    def fork(self):
+        # freezes this ledger into a layer below it and returns a child on the
+        # same layer; costs only the positions changed since the last fork
+        if self.parent is None:
+            bottom = OwnershipLedger(owners=self.owners)
+            bottom.holdings = self.holdings
+            self.parent, self.owners, self.holdings = bottom, {}, {}
+        elif self.owners:
+            self.parent = OwnershipLedger(self.parent, self.owners)
+            self.owners = {}
+        self.depth = self.parent.depth + 1
+        if self.depth > MAX_FORK_DEPTH:
+            self._flatten()
+        return OwnershipLedger(self.parent)
+
+    def _flatten(self):
+        # as ForkedSquares._flatten: one layer over the bottom one
+        bottom, layers = self.parent._layers()
+        merged = {}
+        for owners in layers:
+            merged.update(owners)
+        self.parent = OwnershipLedger(bottom, merged)
+        self.depth = 2
+
+    def acquire(self, position, owner_id):
+        if self.parent is not None:
+            self.owners[position] = owner_id
+            return
+        previous = self.owners.get(position)
+        if previous is not None:
+            self.holdings[previous].discard(position)
+        self.owners[position] = owner_id
+        self.holdings.setdefault(owner_id, set()).add(position)
+
+    def release_all(self, owner_id):
+        if self.parent is not None:
+            positions = self.positions_of(owner_id)
+            for position in positions:
+                self.owners[position] = None
+            return sorted(positions)
+        positions = self.holdings.pop(owner_id, set())
+        for position in positions:
+            del self.owners[position]
+        return sorted(positions)
+
+
+def _detached(plain, table):
+    # to_plain already built fresh dicts for a record table; only the lists inside
+    # are still shared with the live game
+    if not isinstance(table, (RecordTable, BoardSquares, ForkedSquares)):
+        plain = {key: dict(record) for key, record in plain.items()}
+    for record in plain.values():
+        if 'properties' in record:
+            record['properties'] = list(record['properties'])
+    return plain
+
 
 class GameState:
     def __init__(self):
-        self.squares = {}
+        self.squares = RecordTable(Square)
         self.map_size = 0
-        self.players = {}
+        self.players = RecordTable(Player)
         self.players_num = 0
         self.round_num = 1
+        # file name of the map the game was set up from, kept in the save catalog
+        self.map_id = None
+        self.board_index = None
+        self.ownership = OwnershipLedger()
+        self.active_seats = set()
+        self._turn_order = None
+        # 'json' or 'binary'; load_game detects either format by itself
+        self.save_format = 'json'
+        # seats that already finished their turn in the current round; set only
+        # while replaying a journal so a recovered game resumes mid-round
+        self._played_this_round = set()
+        # background writer, created by the first save_game
+        self.save_writer = None
+        # bumped by every change to the game (see mark_changed); save_game
+        # skips the save when it is the same as at the last written save
+        self.changes = 0
+        self._saved = None
 
-    def load_game(self, save_file):
-        with open(save_file, 'r') as f:
-            data = json.load(f)
-            self.map_size = data['map_size']
-            self.squares = data['squares']
-            self.players = data['players']
-            self.players_num = len(self.players)
-            self.round_num = data.get('round_num', 1)
-
-    def save_game(self):
-        data = {
+    def load_game(self, save_file, journal_file=None):
+        # With a journal, save_file=None recovers from the journal's last snapshot
+        if save_file is None:
+            save_file = last_snapshot(journal_file)
+            if save_file is None:
+                raise FileNotFoundError(f"No snapshot recorded in {journal_file}.")
+        with open(save_file, 'rb') as f:
+            raw = f.read()
+        data = decode_binary(raw) if is_binary(raw) else json.loads(raw)
+        self.load_data(data)
+        entry = find_entry(save_file)
+        self.map_id = entry.get('map_id') if entry else None
+        if journal_file is not None:
+            for event in journal_tail(journal_file, save_file):
+                self.apply_event(event)
+
+    def load_data(self, data):
+        # the game described by save_data() output
+        self.map_size = data['map_size']
+        self.squares = RecordTable.from_dict(data['squares'], Square)
+        self.players = RecordTable.from_dict(data['players'], Player)
+        self.players_num = len(self.players)
+        self.round_num = data.get('round_num', 1)
+        self.board_index = BoardIndex(self.squares, self.map_size)
+        self.ownership = OwnershipLedger.from_squares(self.squares, self.players)
+        self.reset_active_seats()
+        self._played_this_round = set()
+        self._saved = None
+
+    def save_data(self):
+        return {
             'map_size': self.map_size,
-            'squares': self.squares,
-            'players': self.players,
+            'squares': to_plain(self.squares),
+            'players': to_plain(self.players),
             'round_num': self.round_num
         }
+
+    def save_path(self):
+        return f"save/save_round_{self.round_num}.save"
+
+    def save_game(self, durable=False):
+        # Queues the save on the background writer and returns its file, or None
+        # when nothing changed since the last save. durable=True also waits
+        # until the file is on disk and raises OSError if it could not be written.
+        save_file = self.save_path()
+        marker = (save_file, self.save_format, self.changes)
+        if self._saved == marker and os.path.exists(save_file):
+            return None
+        data = self.save_data()
+        # the writer serializes later, so it gets copies the game cannot mutate
+        data['squares'] = _detached(data['squares'], self.squares)
+        data['players'] = _detached(data['players'], self.players)
         if not os.path.exists('save'):
             os.makedirs('save')
-        save_file = f"save/save_round_{self.round_num}.save"
-        with open(save_file, 'w') as f:
-            json.dump(data, f)
-        print(f"Game saved to {save_file}")
+        if self.save_writer is None:
+            self.save_writer = SaveWriter()
+        metadata = {
+            'round_num': self.round_num,
+            'players': [p['name'] for p in data['players'].values()],
+            'map_id': self.map_id,
+            'timestamp': time.time(),
+        }
+
+        def written(path, size):
+            record_save(path, dict(metadata, size=size))
+            # only a save that reached the disk counts as the last one
+            self._saved = marker
+
+        self.save_writer.submit(os.path.abspath(save_file), data, self.save_format, written)
+        if durable:
+            self.save_writer.flush()
+        return save_file
+
+    def flush_saves(self, timeout=None):
+        if self.save_writer is not None:
+            self.save_writer.flush(timeout)
+
+    def write_snapshot(self, snapshot_file):
+        write_atomic(snapshot_file, self.save_data(), self.save_format)
+
+    def mark_changed(self, *event):
+        # for changes made to the records directly rather than through the
+        # update methods; GameController logs every event it makes through it
+        self.changes += 1
+
+    def apply_event(self, event):
+        # replays one journal event (see journal.py) on top of a loaded snapshot
+        self.changes += 1
+        kind = event[0]
+        if kind == 'move':
+            self.players[event[1]]['position'] = event[2]
+        elif kind == 'cash':
+            self.players[event[1]]['cash'] += event[2]
+        elif kind == 'buy':
+            player_id, position = event[1], event[2]
+            player = self.players[player_id]
+            square = self.squares.writable(position)
+            self.ownership.acquire(position, player_id)
+            square['owner'] = player['name']
+            square['owner_id'] = player_id
+            player['properties'].append(square['name'])
+        elif kind == 'jail':
+            player = self.players[event[1]]
+            player['in_jail'] = event[2]
+            player['jail_turns'] = event[3]
+        elif kind == 'bankrupt':
+            self.declare_bankrupt(event[1])
+            if event[2]:
+                for position in self.ownership.release_all(event[1]):
+                    square = self.squares.writable(position)
+                    square['owner'] = ''
+                    square['owner_id'] = None
+                self.players[event[1]]['properties'] = []
+        elif kind == 'turn':
+            self._played_this_round.add(event[1])
+        elif kind == 'round':
+            self.round_num = event[1]
+            self._played_this_round = set()
+        else:
+            raise ValueError(f"Unknown journal event {kind!r}.")
 
     def setup_new_game(self, map_file, player_names):
+        if is_board_file(map_file):
+            self.setup_from_board(BoardFile(map_file), player_names, os.path.basename(map_file))
+            return
         with open(map_file, 'r') as f:
             data = json.load(f)
-            self.map_size = data['map_size']
-            self.squares = data['squares']
+        self.setup_from_map_data(data, player_names, os.path.basename(map_file))
+
+    def setup_from_board(self, board, player_names, map_id=None):
+        # a compiled board stays memory-mapped; squares are read as players reach them
+        self.setup_from_map_data({'map_size': board.map_size, 'squares': {}}, player_names, map_id)
+        self.squares = BoardSquares(board)
+        self.board_index = BoardIndex(self.squares, self.map_size)
+        self.ownership = OwnershipLedger.from_squares(self.squares, self.players)
+
+    def setup_from_map_data(self, data, player_names, map_id=None):
+        # squares are fresh records so one parsed map can seed many games
+        self.map_id = map_id
+        self.map_size = data['map_size']
+        self.squares = RecordTable.from_dict(data['squares'], Square)
+        self.board_index = BoardIndex(self.squares, self.map_size)
+        self.round_num = 1
         self.players_num = len(player_names)
-        self.players = {}
-        for i, name in enumerate(player_names, 1):
-            self.players[str(i)] = {
-                'name': name if name else f"玩家{i}",
-                'cash': 1500,
-                'position': 1,
-                'in_jail': False,
-                'jail_turns': 0,
-                'bankrupt': False,
-                'properties': []
-            }
+        self.players = RecordTable(Player, [
+            Player(name if name else f"玩家{i}") for i, name in enumerate(player_names, 1)
+        ])
+        self.ownership = OwnershipLedger.from_squares(self.squares, self.players)
+        self.reset_active_seats()
+        self._saved = None
+
+    def fork(self):
+        # A child state for lookahead and what-if play. Board records are
+        # shared and copied only when the child (or this state) writes them,
+        # players are copied (there are only a few) and the ownership ledger
+        # is layered the same way, so a fork costs the same on any board.
+        # Squares are changed through squares.writable(position); this state's
+        # squares become a ForkedSquares too, whose base() and owned() keep a
+        # compiled board's column lookups.
+        if not isinstance(self.squares, ForkedSquares):
+            self.squares = ForkedSquares(self.squares)
+        child = GameState()
+        child.squares = self.squares.fork()
+        child.map_size = self.map_size
+        child.players = RecordTable(Player, [None if p is None else p.copy() for p in self.players.records])
+        child.players_num = self.players_num
+        child.round_num = self.round_num
+        child.map_id = self.map_id
+        child.board_index = self.board_index
+        child.ownership = self.ownership.fork()
+        child.active_seats = set(self.active_seats)
+        child._turn_order = self._turn_order
+        child.save_format = self.save_format
+        child._played_this_round = set(self._played_this_round)
+        return child
 
     def update_player_position(self, player_id, new_position):
+        self.changes += 1
         self.players[player_id]['position'] = new_position
 
     def update_player_cash(self, player_id, amount):
+        self.changes += 1
         self.players[player_id]['cash'] += amount
 
     def update_player_in_jail(self, player_id, in_jail):
+        self.changes += 1
         self.players[player_id]['in_jail'] = in_jail
 
     def update_player_jail_turns(self, player_id, turns):
+        self.changes += 1
         self.players[player_id]['jail_turns'] = turns
 
     def update_round_num(self, new_round_num):
+        self.changes += 1
         self.round_num = new_round_num
 
+    def reset_active_seats(self):
+        self.active_seats = {int(pid) for pid, p in self.players.items() if not p['bankrupt']}
+        self._turn_order = None
+
+    def declare_bankrupt(self, player_id):
+        self.changes += 1
+        self.players[player_id]['bankrupt'] = True
+        self.active_seats.discard(int(player_id))
+        self._turn_order = None
+
+    def turn_order(self):
+        # seats still playing, in seat order; rebuilt only after a bankruptcy
+        if self._played_this_round:
+            # first round after a journal recovery: skip the turns already replayed
+            played, self._played_this_round = self._played_this_round, set()
+            return [seat for seat in sorted(self.active_seats) if seat not in played]
+        if self._turn_order is None:
+            self._turn_order = sorted(self.active_seats)
+        return self._turn_order
+
     def is_game_over(self):
-        active_players = [p for p in self.players.values() if not p['bankrupt']]
-        return len(active_players) <= 1 or self.round_num > 100
+        return len(self.active_seats) <= 1 or self.round_num > 100
+
+    def _winners(self):
+        # (seat, name) of the players with the most cash
+        max_cash = None
+        winners = []
+        for pid, p in self.players.items():
+            cash = p['cash']
+            if max_cash is None or cash > max_cash:
+                max_cash = cash
+                winners = [(int(pid), p['name'])]
+            elif cash == max_cash:
+                winners.append((int(pid), p['name']))
+        return winners
+
+    def get_winner_seats(self):
+        # names may repeat between players, seats do not
+        return [seat for seat, _ in self._winners()]
 
     def get_winners(self):
-        max_cash = max([p['cash'] for p in self.players.values()])
-        winners = [p['name'] for p in self.players.values() if p['cash'] == max_cash]
-        return winners
\ No newline at end of file
+        return [name for _, name in self._winners()]
\ No newline at end of file
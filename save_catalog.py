@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+
+# One JSON object per line, appended after every save is written:
+#   {"file": "save_round_3.save", "round_num": 3, "players": ["Alan", "Ben"],
+#    "map_id": "default_board.map", "timestamp": 1760000000.0, "size": 3072}
+# A later line for the same file replaces the earlier one. Listing saves reads
+# only this file and the directory, never the saves themselves.
+CATALOG_FILE = 'catalog.jsonl'
+
+SORT_KEYS = ('timestamp', 'round_num', 'file', 'size')
+
+# held while appending and while compacting, so a save recorded from the
+# SaveWriter thread is never lost to a compaction running in the game thread
+_catalog_lock = threading.Lock()
+
+
+def catalog_path(save_dir):
+    return os.path.join(save_dir, CATALOG_FILE)
+
+
+def record_save(save_file, metadata):
+    entry = dict(metadata, file=os.path.basename(save_file))
+    with _catalog_lock:
+        with open(catalog_path(os.path.dirname(save_file)), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def read_catalog(save_dir):
+    entries = {}
+    lines = 0
+    try:
+        with open(catalog_path(save_dir), 'r', encoding='utf-8') as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and 'file' in entry:
+                    entries[entry['file']] = entry
+    except FileNotFoundError:
+        pass
+    return entries, lines
+
+
+def find_entry(save_file):
+    entries, _ = read_catalog(os.path.dirname(save_file))
+    return entries.get(os.path.basename(save_file))
+
+
+def _save_names(save_dir):
+    return [name for name in os.listdir(save_dir)
+            if name != CATALOG_FILE and not name.endswith('.tmp')]
+
+
+def compact_catalog(save_dir):
+    # Rewrites the catalog with one line per existing save. The catalog is
+    # read again under the lock, so nothing appended since the caller last
+    # read it is dropped.
+    with _catalog_lock:
+        catalog, _ = read_catalog(save_dir)
+        names = set(_save_names(save_dir))
+        temp_file = catalog_path(save_dir) + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for name, entry in catalog.items():
+                if name in names:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(temp_file, catalog_path(save_dir))
+
+
+def _entry(save_dir, name, catalog):
+    entry = {'file': name, 'round_num': None, 'players': [], 'map_id': None,
+             'timestamp': None, 'size': None}
+    if name in catalog:
+        entry.update(catalog[name])
+        return entry
+    # a save written before the catalog existed: what the directory knows, nothing parsed
+    try:
+        stat = os.stat(os.path.join(save_dir, name))
+        entry['timestamp'] = stat.st_mtime
+        entry['size'] = stat.st_size
+    except OSError:
+        pass
+    return entry
+
+
+def save_matches(entry, text):
+    text = text.lower()
+    fields = [entry['file'], entry['map_id'] or ''] + list(entry['players'])
+    return any(text in field.lower() for field in fields)
+
+
+def list_saves(save_dir='save', sort_by='timestamp', reverse=None, text=None, player=None,
+               map_id=None):
+    # Saves in save_dir with their catalog metadata. Newest first by default;
+    # entries missing the sort field come last, in file name order.
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}.")
+    if reverse is None:
+        reverse = sort_by in ('timestamp', 'round_num', 'size')
+    names = _save_names(save_dir)
+    catalog, lines = read_catalog(save_dir)
+    entries = [_entry(save_dir, name, catalog) for name in names]
+    if lines > 2 * sum(1 for name in names if name in catalog) + 64:
+        # drop superseded lines and entries for deleted saves
+        compact_catalog(save_dir)
+
+    if text:
+        entries = [entry for entry in entries if save_matches(entry, text)]
+    if player is not None:
+        entries = [entry for entry in entries if player in entry['players']]
+    if map_id is not None:
+        entries = [entry for entry in entries if entry['map_id'] == map_id]
+
+    entries.sort(key=lambda entry: entry['file'])
+    if sort_by == 'file':
+        if reverse:
+            entries.reverse()
+        return entries
+    known = [entry for entry in entries if entry[sort_by] is not None]
+    unknown = [entry for entry in entries if entry[sort_by] is None]
+    known.sort(key=lambda entry: entry[sort_by], reverse=reverse)
+    return known + unknown
@@ -0,0 +1,250 @@
+import struct
+import sys
+from array import array
+from itertools import accumulate, chain, repeat
+from operator import itemgetter
+
+# Binary save layout (little-endian), version 2:
+#   header    magic, version, map_size, round_num, square count, player count,
+#             string count, property-name count
+#   strings   string table: u32 byte lengths, then the UTF-8 bytes back to back
+#   squares   one packed column per field: position, flags, type, name, price,
+#             rent, owner name (string indexes, -1 = None); a price or rent of
+#             None is stored as 0 with its *_NONE flag set
+#   ownership packed owner id per square (-1 = no owner_id)
+#   players   fixed-width records: id, name, cash, position, jail_turns, flags,
+#             first property slot, property count
+#   props     packed string indexes of every player's property names
+BINARY_MAGIC = b'MNPLSAVE'
+BINARY_VERSION = 2
+# version 1 is version 2 without the *_NONE flags
+READABLE_VERSIONS = (1, 2)
+
+HEADER = struct.Struct('<8sHIIIIII')
+PLAYER = struct.Struct('<IiqIIBII')
+# array typecodes of the square columns, in file order
+SQUARE_COLUMNS = ('I', 'B', 'i', 'i', 'q', 'q', 'i')
+OWNER_COLUMN = 'i'
+LENGTH_COLUMN = 'I'
+PROPERTY_COLUMN = 'i'
+
+NONE_INDEX = -1
+
+# (lowest, highest) value of each integer typecode used above
+RANGES = {'I': (0, 2 ** 32 - 1), 'i': (-2 ** 31, 2 ** 31 - 1), 'q': (-2 ** 63, 2 ** 63 - 1)}
+
+# square flags: which optional JSON keys the square had
+HAS_NAME = 1
+HAS_PRICE = 2
+HAS_RENT = 4
+HAS_OWNER = 8
+HAS_OWNER_ID = 16
+PRICE_NONE = 32
+RENT_NONE = 64
+PROPERTY_FLAGS = HAS_NAME | HAS_PRICE | HAS_RENT | HAS_OWNER
+OWNED_PROPERTY_FLAGS = PROPERTY_FLAGS | HAS_OWNER_ID
+SQUARE_KEYS = (('name', HAS_NAME), ('price', HAS_PRICE), ('rent', HAS_RENT),
+               ('owner', HAS_OWNER), ('owner_id', HAS_OWNER_ID))
+
+# player flags
+IN_JAIL = 1
+BANKRUPT = 2
+
+
+class SaveFormatError(ValueError):
+    pass
+
+
+def is_binary(raw):
+    return isinstance(raw, bytes) and raw.startswith(BINARY_MAGIC)
+
+
+def _packed(typecode, values, field=None):
+    # one whole column at a time; array() rejects whatever the fixed width
+    # cannot hold, and only then is the offending value looked for
+    try:
+        column = array(typecode, values)
+    except (TypeError, OverflowError):
+        low, high = RANGES[typecode]
+        bad = next(value for value in values if not isinstance(value, int) or not low <= value <= high)
+        raise SaveFormatError(f"Cannot store {field} {bad!r} in a binary save: "
+                              f"it must be an integer from {low} to {high}.") from None
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpacked(typecode, view, offset, count):
+    column = array(typecode)
+    end = offset + column.itemsize * count
+    if end > len(view):
+        raise SaveFormatError("Truncated binary save.")
+    column.frombytes(view[offset:end])
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column, end
+
+
+def _square_flags(keys):
+    flags = 0
+    for key, flag in SQUARE_KEYS:
+        if key in keys:
+            flags |= flag
+    return flags
+
+
+def _nones_to_zero(values, flags, flag):
+    # an explicit None (rare) is stored as 0 with its flag set
+    if None in values:
+        for i, value in enumerate(values):
+            if value is None:
+                values[i] = 0
+                flags[i] |= flag
+
+
+def encode_binary(data):
+    # Every column is pulled out of the square dicts with map() and packed
+    # with one array() call, so no Python code runs per square.
+    squares = data['squares']
+    records = list(squares.values())
+    shapes = list(map(tuple, records))
+    shape_flags = {shape: _square_flags(shape) for shape in set(shapes)}
+    flags = list(map(shape_flags.__getitem__, shapes))
+    positions = list(map(int, squares))
+    types = list(map(itemgetter('square_type'), records))
+    names = list(map(dict.get, records, repeat('name')))
+    owners = list(map(dict.get, records, repeat('owner')))
+    prices = list(map(dict.get, records, repeat('price'), repeat(0)))
+    rents = list(map(dict.get, records, repeat('rent'), repeat(0)))
+    _nones_to_zero(prices, flags, PRICE_NONE)
+    _nones_to_zero(rents, flags, RENT_NONE)
+    owner_ids = list(map(dict.get, records, repeat('owner_id'), repeat(NONE_INDEX)))
+    if None in owner_ids:
+        owner_ids = [NONE_INDEX if owner_id is None else owner_id for owner_id in owner_ids]
+
+    players = data['players']
+    player_list = list(players.values())
+    player_names = [player['name'] for player in player_list]
+    properties = [player.get('properties') or [] for player in player_list]
+    property_names = list(chain.from_iterable(properties))
+
+    # string table: every distinct string once, in order of first use
+    table = dict.fromkeys(chain(types, names, owners, player_names, property_names))
+    table.pop(None, None)
+    strings = list(table)
+    index = dict(zip(strings, range(len(strings))))
+    index[None] = NONE_INDEX
+    string_index = index.__getitem__
+
+    columns = ((positions, 'square position'), (flags, 'flags'), (list(map(string_index, types)), 'type'),
+               (list(map(string_index, names)), 'name'), (prices, 'price'), (rents, 'rent'),
+               (list(map(string_index, owners)), 'owner'))
+    square_chunks = [_packed(typecode, values, field) for typecode, (values, field) in zip(SQUARE_COLUMNS, columns)]
+    square_chunks.append(_packed(OWNER_COLUMN, owner_ids, 'owner_id'))
+    _packed('I', list(map(int, players)), 'player id')
+    _packed('q', [player['cash'] for player in player_list], 'cash')
+    _packed('I', [player['position'] for player in player_list], 'player position')
+    _packed('I', [player['jail_turns'] for player in player_list], 'jail_turns')
+    _packed('I', [data['map_size'], data.get('round_num', 1)], 'map_size or round_num')
+
+    player_records = []
+    first = 0
+    for pid, player, name, owned in zip(players, player_list, player_names, properties):
+        player_flags = (IN_JAIL if player['in_jail'] else 0) | (BANKRUPT if player['bankrupt'] else 0)
+        player_records.append(PLAYER.pack(
+            int(pid), string_index(name), player['cash'], player['position'], player['jail_turns'],
+            player_flags, first, len(owned)
+        ))
+        first += len(owned)
+
+    encoded = list(map(str.encode, strings))
+    header = HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, data['map_size'], data.get('round_num', 1),
+        len(positions), len(player_records), len(encoded), len(property_names)
+    )
+    chunks = [header, _packed(LENGTH_COLUMN, list(map(len, encoded)))]
+    chunks.extend(encoded)
+    chunks.extend(square_chunks)
+    chunks.extend(player_records)
+    chunks.append(_packed(PROPERTY_COLUMN, list(map(string_index, property_names))))
+    return b''.join(chunks)
+
+
+def decode_binary(raw):
+    if not is_binary(raw):
+        raise SaveFormatError("Not a binary save file.")
+    try:
+        return _decode(memoryview(raw))
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SaveFormatError(f"Corrupt binary save: {e}") from None
+
+
+def _decode(view):
+    (_, version, map_size, round_num, square_count, player_count,
+     string_count, property_count) = HEADER.unpack_from(view, 0)
+    if version not in READABLE_VERSIONS:
+        raise SaveFormatError(f"Unsupported binary save version {version}.")
+
+    lengths, offset = _unpacked(LENGTH_COLUMN, view, HEADER.size, string_count)
+    ends = list(accumulate(lengths, initial=offset))
+    if ends[-1] > len(view):
+        raise SaveFormatError("Truncated binary save.")
+    text = str(view[offset:ends[-1]], 'utf-8')
+    if len(text) == ends[-1] - offset:
+        # all ASCII, so byte offsets are character offsets: one decode for the whole table
+        strings = list(map(text.__getitem__, map(slice, accumulate(lengths, initial=0), accumulate(lengths))))
+    else:
+        strings = [str(view[start:end], 'utf-8') for start, end in zip(ends, ends[1:])]
+    offset = ends[-1]
+    # index -1 (None) resolves to the sentinel appended at the end
+    lookup = strings + [None]
+
+    columns = []
+    for typecode in SQUARE_COLUMNS:
+        column, offset = _unpacked(typecode, view, offset, square_count)
+        columns.append(column)
+    owner_ids, offset = _unpacked(OWNER_COLUMN, view, offset, square_count)
+    player_end = offset + PLAYER.size * player_count
+    if player_end > len(view):
+        raise SaveFormatError("Truncated binary save.")
+    player_records = list(PLAYER.iter_unpack(view[offset:player_end]))
+    property_indexes, _ = _unpacked(PROPERTY_COLUMN, view, player_end, property_count)
+    property_names = [lookup[index] for index in property_indexes]
+
+    squares = {}
+    for pos, flags, type_index, name_index, price, rent, owner_index, owner_id in zip(*columns, owner_ids):
+        # properties are most of any board: built in one go
+        if flags == PROPERTY_FLAGS:
+            squares[str(pos)] = {'square_type': lookup[type_index], 'name': lookup[name_index],
+                                 'price': price, 'rent': rent, 'owner': lookup[owner_index]}
+            continue
+        if flags == OWNED_PROPERTY_FLAGS and owner_id != NONE_INDEX:
+            squares[str(pos)] = {'square_type': lookup[type_index], 'name': lookup[name_index],
+                                 'price': price, 'rent': rent, 'owner': lookup[owner_index], 'owner_id': owner_id}
+            continue
+        sq = {'square_type': lookup[type_index]}
+        if flags & HAS_NAME:
+            sq['name'] = lookup[name_index]
+        if flags & HAS_PRICE:
+            sq['price'] = None if flags & PRICE_NONE else price
+        if flags & HAS_RENT:
+            sq['rent'] = None if flags & RENT_NONE else rent
+        if flags & HAS_OWNER:
+            sq['owner'] = lookup[owner_index]
+        if flags & HAS_OWNER_ID:
+            sq['owner_id'] = None if owner_id == NONE_INDEX else owner_id
+        squares[str(pos)] = sq
+
+    players = {}
+    for pid, name_index, cash, position, jail_turns, flags, first, count in player_records:
+        players[str(pid)] = {
+            'name': lookup[name_index],
+            'cash': cash,
+            'position': position,
+            'in_jail': bool(flags & IN_JAIL),
+            'jail_turns': jail_turns,
+            'bankrupt': bool(flags & BANKRUPT),
+            'properties': property_names[first:first + count],
+        }
+
+    return {'map_size': map_size, 'squares': squares, 'players': players, 'round_num': round_num}
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from save_format import encode_binary
+
+
+def write_atomic(save_file, data, save_format='json', durable=True):
+    # written beside the target and renamed, so a crash leaves either the old
+    # file or the new one, never half of one
+    directory = os.path.dirname(save_file)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    if save_format == 'binary':
+        raw = encode_binary(data)
+    else:
+        raw = json.dumps(data).encode('utf-8')
+    temp_file = save_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(raw)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_file, save_file)
+    return len(raw)
+
+
+class SaveWriter:
+    # Serializes and writes saves on a background thread. Pending saves are
+    # keyed by file: a newer save of the same file replaces the queued one,
+    # since every save holds the complete game state. When max_pending other
+    # files are already queued, submit() waits for the writer to take one
+    # rather than drop a save.
+    def __init__(self, max_pending=4, durable=True):
+        self.max_pending = max_pending
+        self.durable = durable
+        self.pending = OrderedDict()
+        self.errors = []
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.room = threading.Condition(self.lock)
+        self.thread = None
+
+    def submit(self, save_file, data, save_format='json', on_written=None):
+        # on_written(save_file, size) runs on the writer thread once the file is in place
+        with self.lock:
+            if save_file not in self.pending and len(self.pending) >= self.max_pending:
+                self._start()
+                self.room.wait_for(lambda: len(self.pending) < self.max_pending)
+            self.pending.pop(save_file, None)
+            self.pending[save_file] = (data, save_format, on_written)
+            self._start()
+
+    def _start(self):
+        # called with the lock held
+        if self.thread is None:
+            # not a daemon, so the interpreter finishes queued saves before exiting
+            self.thread = threading.Thread(target=self._run, name='save-writer')
+            self.thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                with self.lock:
+                    if not self.pending:
+                        return
+                    save_file, (data, save_format, on_written) = self.pending.popitem(last=False)
+                    self.room.notify()
+                try:
+                    size = write_atomic(save_file, data, save_format, self.durable)
+                    if on_written is not None:
+                        on_written(save_file, size)
+                except Exception as e:
+                    # reported by flush(); one bad save must not stop the others
+                    with self.lock:
+                        self.errors.append((save_file, e))
+        finally:
+            # however the worker stops, flush() must not wait on it and the
+            # next submit() must start a new one
+            with self.lock:
+                self.thread = None
+                self.idle.notify_all()
+
+    def flush(self, timeout=None):
+        # blocks until every queued save is on disk; raises OSError naming every
+        # save that failed since the last flush
+        with self.lock:
+            if not self.idle.wait_for(lambda: self.thread is None, timeout):
+                raise TimeoutError("Background saves did not finish in time.")
+            errors, self.errors = self.errors, []
+        if errors:
+            failed = '; '.join(f"{save_file}: {error!r}" for save_file, error in errors)
+            raise OSError(f"Failed to write {len(errors)} save(s): {failed}") from errors[0][1]
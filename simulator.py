@@ -0,0 +1,374 @@
+import argparse
+import json
+import random
+import time
+
+from model import GameState
+from controller import GameController
+from game_rng import GameRng
+
+JAIL_FINE = 150
+# table policies decide by cash in steps of CASH_BUCKET; everything from
+# CASH_BUCKET * (CASH_BUCKETS - 1) up shares the last bucket
+CASH_BUCKET = 100
+CASH_BUCKETS = 40
+CASH_LIMIT = CASH_BUCKET * CASH_BUCKETS
+
+
+class Policy:
+    def reset(self, seed):
+        pass
+
+    def prepare(self, map_data):
+        # called with the map before every game; the same map_data object
+        # comes back for every game of a simulator
+        pass
+
+    def want_to_buy(self, player, property_name, property_price):
+        return True
+
+    def jail_option(self, player):
+        return 1
+
+    def next_action(self, round_num):
+        return 1
+
+
+class AlwaysBuyPolicy(Policy):
+    pass
+
+
+class NeverBuyPolicy(Policy):
+    def want_to_buy(self, player, property_name, property_price):
+        return False
+
+
+class CautiousPolicy(Policy):
+    def __init__(self, reserve=500):
+        self.reserve = reserve
+
+    def want_to_buy(self, player, property_name, property_price):
+        return player['cash'] - property_price >= self.reserve
+
+    def jail_option(self, player):
+        return 2 if player['cash'] - 150 >= self.reserve else 1
+
+
+class RandomPolicy(Policy):
+    def __init__(self, rng=None, buy_chance=0.5):
+        self.rng = rng or random.Random()
+        self.buy_chance = buy_chance
+
+    def reset(self, seed):
+        self.rng.seed(seed)
+
+    def want_to_buy(self, player, property_name, property_price):
+        return self.rng.random() < self.buy_chance
+
+    def jail_option(self, player):
+        return self.rng.choice((1, 2))
+
+
+def cash_bucket(cash):
+    return min(max(cash, 0) // CASH_BUCKET, CASH_BUCKETS - 1)
+
+
+class TablePolicy(Policy):
+    # Decisions are looked up, not worked out on every turn: prepare() fills a
+    # buy table per property name (one entry per cash bucket) and a jail table
+    # once per map, from should_buy() and should_pay_fine() evaluated at the
+    # lowest cash of each bucket.
+    def __init__(self):
+        self.map_data = None
+        self.buy_table = {}
+        self.jail_table = ()
+
+    def should_buy(self, square, cash):
+        return True
+
+    def should_pay_fine(self, cash):
+        return False
+
+    def prepare(self, map_data):
+        if map_data is self.map_data:
+            return
+        cash_levels = [bucket * CASH_BUCKET for bucket in range(CASH_BUCKETS)]
+        self.buy_table = {
+            sq['name']: tuple(self.should_buy(sq, cash) for cash in cash_levels)
+            for sq in map_data['squares'].values() if sq['square_type'] == 'Property'
+        }
+        self.jail_table = tuple(2 if self.should_pay_fine(cash) else 1 for cash in cash_levels)
+        self.map_data = map_data
+
+    def want_to_buy(self, player, property_name, property_price):
+        row = self.buy_table.get(property_name)
+        if row is None:
+            # a square the prepared map did not have
+            return self.should_buy({'name': property_name, 'price': property_price, 'rent': 0}, player['cash'])
+        cash = player['cash']
+        # cash_bucket() inlined: this runs on every property a bot lands on
+        return row[cash // CASH_BUCKET if 0 <= cash < CASH_LIMIT else (0 if cash < 0 else -1)]
+
+    def jail_option(self, player):
+        if not self.jail_table:
+            return 2 if self.should_pay_fine(player['cash']) else 1
+        return self.jail_table[cash_bucket(player['cash'])]
+
+    def __getstate__(self):
+        # tables are rebuilt where the policy is used, e.g. in a tournament worker
+        return dict(self.__dict__, map_data=None, buy_table={}, jail_table=())
+
+
+class ReserveBuyer(TablePolicy):
+    # buys and pays the jail fine whenever it keeps at least reserve in cash
+    def __init__(self, reserve=300):
+        super().__init__()
+        self.reserve = reserve
+
+    def should_buy(self, square, cash):
+        return cash - square['price'] >= self.reserve
+
+    def should_pay_fine(self, cash):
+        return cash - JAIL_FINE >= self.reserve
+
+
+class RentYieldBuyer(TablePolicy):
+    # only buys properties whose rent is at least min_yield of the price
+    def __init__(self, min_yield=0.08, reserve=0):
+        super().__init__()
+        self.min_yield = min_yield
+        self.reserve = reserve
+
+    def should_buy(self, square, cash):
+        price = square['price']
+        return cash - price >= self.reserve and (price == 0 or square['rent'] / price >= self.min_yield)
+
+    def should_pay_fine(self, cash):
+        return cash - JAIL_FINE >= self.reserve + 1000
+
+
+class BargainBuyer(TablePolicy):
+    # spends at most max_share of its cash on any one property
+    def __init__(self, max_share=0.3):
+        super().__init__()
+        self.max_share = max_share
+
+    def should_buy(self, square, cash):
+        return square['price'] <= cash * self.max_share
+
+    def should_pay_fine(self, cash):
+        return JAIL_FINE <= cash * self.max_share
+
+
+POLICIES = {
+    'always': AlwaysBuyPolicy,
+    'never': NeverBuyPolicy,
+    'cautious': CautiousPolicy,
+    'random': RandomPolicy,
+    'reserve': ReserveBuyer,
+    'yield': RentYieldBuyer,
+    'bargain': BargainBuyer,
+}
+
+
+class HeadlessGameView:
+    # Drop-in replacement for view.GameView: decisions come from policies,
+    # randomness from a per-game rng and nothing is printed or read.
+    def __init__(self, model, policies, rng):
+        self.model = model
+        self.policies = policies
+        # a GameRng, or a random.Random to draw the blocks from
+        self.rng = rng if isinstance(rng, GameRng) else GameRng(source=rng)
+        # the seat (player id) whose turn it is, as the controller reports it
+        self.current_seat = None
+        self.winners = None
+
+    def _player(self):
+        return self.model.players[self.current_seat]
+
+    def _policy(self):
+        return self.policies[self.current_seat - 1]
+
+    def show_round_start(self, round_num):
+        pass
+
+    def show_round_end(self, round_num):
+        pass
+
+    def choose_next_action(self):
+        # the round-end save/continue prompt belongs to the host seat
+        return self.policies[0].next_action(self.model.round_num)
+
+    def game_saved(self, save_file):
+        pass
+
+    def save_unchanged(self, save_file):
+        pass
+
+    def save_failed(self, error):
+        pass
+
+    def is_100_round(self):
+        pass
+
+    def show_player_turn(self, player_name, money, position, properties, in_jail, jail_turns, player_id=None):
+        self.current_seat = player_id
+
+    def player_action_menu(self, debug_mode=False):
+        return 1
+
+    def throw_the_dice(self, rng=None):
+        return (rng or self.rng).roll()
+
+    def reach_a_property(self, property_name, property_price, property_owner):
+        if property_owner:
+            return False
+        return self._policy().want_to_buy(self._player(), property_name, property_price)
+
+    def buy_success(self, property_name):
+        pass
+
+    def buy_fail(self, property_name):
+        pass
+
+    def not_buy_property(self):
+        pass
+
+    def pay_rent(self, player_name, owner_name, rent):
+        pass
+
+    def reach_own_property(self, property_name):
+        pass
+
+    def player_bankrupt(self, player_name):
+        pass
+
+    def reach_a_chance(self, rng=None):
+        return (rng or self.rng).chance()
+
+    def reach_a_jail(self):
+        pass
+
+    def jail_not_found(self):
+        pass
+
+    def pass_go(self):
+        pass
+
+    def pay_income_tax(self, tax):
+        pass
+
+    def no_effect_square(self, square_name):
+        pass
+
+    def in_jail_options(self):
+        return self._policy().jail_option(self._player())
+
+    def release_from_jail(self):
+        pass
+
+    def fail_to_release(self):
+        pass
+
+    def no_money_to_pay_fine(self):
+        pass
+
+    def invalid_choice(self):
+        pass
+
+    def show_player_states(self, player):
+        pass
+
+    def show_all_players_states(self, players):
+        pass
+
+    def show_next_player(self, player_name):
+        pass
+
+    def show_map(self, squares, position=None):
+        pass
+
+    def show_game_over(self, winners):
+        self.winners = winners
+
+    def choose_player_to_view(self, players):
+        return next(iter(players))
+
+    def debug_action_menu(self):
+        return None
+
+    def debug_modify_cash(self):
+        return 0
+
+    def debug_choose_position(self, map_size):
+        return None
+
+    def show_debug_mode_status(self, enabled):
+        pass
+
+    def show_debug_bankrupt_status(self, player_name, is_bankrupt):
+        pass
+
+    def show_debug_jail_status(self, player_name, in_jail):
+        pass
+
+
+class Simulator:
+    def __init__(self, map_file):
+        with open(map_file, 'r') as f:
+            self.map_data = json.load(f)
+
+    def run_game(self, player_names, policies, seed=None, recorder=None):
+        if len(player_names) != len(policies):
+            raise ValueError("Each player needs exactly one policy.")
+        model = GameState()
+        model.setup_from_map_data(self.map_data, player_names)
+        rng = GameRng(seed)
+        # policies with their own randomness are reseeded so a game is fully set by its seed
+        for policy in policies:
+            policy.reset(rng.random.getrandbits(64))
+            policy.prepare(self.map_data)
+        game_view = HeadlessGameView(model, policies, rng)
+        view = type('HeadlessView', (), {'GameView': game_view})
+        GameController(model, view, rng=rng, recorder=recorder).game_loop()
+        players = [model.players[i] for i in range(1, model.players_num + 1)]
+        return {
+            'seed': seed,
+            'winners': game_view.winners,
+            'winner_seats': model.get_winner_seats(),
+            'round_num': model.round_num,
+            'cash': [p['cash'] for p in players],
+            'bankrupt': [p['bankrupt'] for p in players],
+        }
+
+
+def run_game(map_file, player_names, policies, seed=None):
+    return Simulator(map_file).run_game(player_names, policies, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Monopoly games.")
+    parser.add_argument('map_file')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', nargs='+', choices=sorted(POLICIES), default=['always'],
+                        help="one policy for every seat, or one per seat")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes to share the games out over (default 1; 0 for every core)")
+    args = parser.parse_args()
+
+    if len(args.policy) not in (1, args.players):
+        parser.error("Give one policy, or one per player.")
+    # tournament imports this module, so it is imported here rather than at the top
+    from tournament import run_tournament
+    names = [f"bot_{i}" for i in range(1, args.players + 1)]
+    policies = [POLICIES[args.policy[i % len(args.policy)]]() for i in range(len(names))]
+    start = time.perf_counter()
+    run_tournament(args.map_file, names, policies, args.games, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from simulator import Simulator, AlwaysBuyPolicy
+
+# Per-process simulator, created once by the pool initializer so each worker
+# parses the map a single time rather than once per game.
+_worker_simulator = None
+
+
+def game_seed(base_seed, index):
+    # Stable across processes and Python runs (unlike hash()), and unrelated
+    # for neighbouring indices, so every game gets its own rng stream.
+    digest = hashlib.blake2b(f"{base_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def _init_worker(map_file):
+    global _worker_simulator
+    _worker_simulator = Simulator(map_file)
+
+
+def _play_games(player_names, policies, base_seed, indices):
+    records = []
+    for index in indices:
+        result = _worker_simulator.run_game(player_names, policies, seed=game_seed(base_seed, index))
+        records.append(_compact(player_names, index, result))
+    return records
+
+
+def _compact(player_names, index, result):
+    # Only a few small tuples travel back to the parent process
+    winner_seats = tuple(result['winner_seats'])
+    bankrupt_seats = tuple(seat for seat, broke in enumerate(result['bankrupt'], 1) if broke)
+    return index, winner_seats, result['round_num'], bankrupt_seats, tuple(result['cash'])
+
+
+def _chunks(games, chunk_size):
+    for start in range(0, games, chunk_size):
+        yield range(start, min(start + chunk_size, games))
+
+
+def run_tournament(map_file, player_names, policies, games, base_seed=0, workers=None, chunk_size=None):
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, games // (workers * 8))
+    records = []
+    if workers == 1:
+        _init_worker(map_file)
+        for indices in _chunks(games, chunk_size):
+            records.extend(_play_games(player_names, policies, base_seed, indices))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(map_file,)) as executor:
+            futures = [executor.submit(_play_games, player_names, policies, base_seed, indices)
+                       for indices in _chunks(games, chunk_size)]
+            for future in futures:
+                records.extend(future.result())
+    return merge_results(player_names, base_seed, records)
+
+
+def merge_results(player_names, base_seed, records):
+    seats = len(player_names)
+    wins = [0.0] * seats
+    bankruptcies = [0] * seats
+    total_cash = [0] * seats
+    total_rounds = 0
+    games = []
+    for index, winner_seats, round_num, bankrupt_seats, cash in sorted(records):
+        for seat in winner_seats:
+            wins[seat - 1] += 1 / len(winner_seats)
+        for seat in bankrupt_seats:
+            bankruptcies[seat - 1] += 1
+        for seat in range(seats):
+            total_cash[seat] += cash[seat]
+        total_rounds += round_num
+        games.append({
+            'index': index,
+            'seed': game_seed(base_seed, index),
+            'winner_seats': list(winner_seats),
+            'round_num': round_num,
+            'bankrupt_seats': list(bankrupt_seats),
+            'cash': list(cash),
+        })
+    count = len(games) or 1
+    return {
+        'players': list(player_names),
+        'base_seed': base_seed,
+        'games': games,
+        'wins': wins,
+        'bankruptcies': bankruptcies,
+        'mean_cash': [cash / count for cash in total_cash],
+        'mean_rounds': total_rounds / count,
+    }
+
+
+def rerun_game(map_file, player_names, policies, base_seed, index):
+    result = Simulator(map_file).run_game(player_names, policies, seed=game_seed(base_seed, index))
+    index, winner_seats, round_num, bankrupt_seats, cash = _compact(player_names, index, result)
+    return {
+        'index': index,
+        'seed': result['seed'],
+        'winner_seats': list(winner_seats),
+        'round_num': round_num,
+        'bankrupt_seats': list(bankrupt_seats),
+        'cash': list(cash),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Monopoly bot tournament on all cores.")
+    parser.add_argument('map_file')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rerun', type=int, default=None, help="replay a single game index")
+    args = parser.parse_args()
+
+    names = [f"bot_{i}" for i in range(1, args.players + 1)]
+    policies = [AlwaysBuyPolicy() for _ in names]
+    if args.rerun is not None:
+        print(rerun_game(args.map_file, names, policies, args.seed, args.rerun))
+        return
+    start = time.perf_counter()
+    summary = run_tournament(args.map_file, names, policies, args.games, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/sec)")
+    print(f"Mean rounds: {summary['mean_rounds']:.1f}")
+    for seat, name in enumerate(names):
+        print(f"{name}: wins {summary['wins'][seat]:.1f}, bankrupt {summary['bankruptcies'][seat]}, "
+              f"mean cash ${summary['mean_cash'][seat]:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import unittest
+from simulator import Simulator, AlwaysBuyPolicy, NeverBuyPolicy, CautiousPolicy, RandomPolicy
+from batch_engine import np, BatchEngine, policy_parameters, NO_OWNER
+
+MAP_FILE = 'map/default_board.map'
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchEngine(unittest.TestCase):
+    def setUp(self):
+        self.policies = [AlwaysBuyPolicy(), AlwaysBuyPolicy(), AlwaysBuyPolicy()]
+
+    def test_policy_parameters(self):
+        self.assertEqual(policy_parameters(AlwaysBuyPolicy()), (0, float('inf')))
+        self.assertEqual(policy_parameters(CautiousPolicy(300)), (300, 300))
+        with self.assertRaises(ValueError):
+            policy_parameters(RandomPolicy())
+
+    def test_board_arrays_match_map(self):
+        engine = BatchEngine.from_map_file(MAP_FILE, 1, self.policies)
+        self.assertEqual(engine.jail_position, 5)
+        self.assertEqual(engine.prices[1], 800)
+        self.assertEqual(engine.rents[1], 90)
+
+    def test_same_seed_same_results(self):
+        first = BatchEngine.from_map_file(MAP_FILE, 200, self.policies, seed=5).run()
+        second = BatchEngine.from_map_file(MAP_FILE, 200, self.policies, seed=5).run()
+        for key in first:
+            self.assertTrue(np.array_equal(first[key], second[key]), key)
+
+    def test_round_limit_and_bankruptcy_invariants(self):
+        engine = BatchEngine.from_map_file(MAP_FILE, 500, self.policies, seed=2)
+        results = engine.run()
+        self.assertTrue((results['round_num'] <= 101).all())
+        finished_early = results['round_num'] <= 100
+        self.assertTrue((engine.active[finished_early] <= 1).all())
+        self.assertTrue((engine.active == (~engine.bankrupt).sum(axis=1)).all())
+        solvent = ~engine.bankrupt
+        self.assertTrue((engine.cash[solvent] >= 0).all())
+
+    def test_never_buy_leaves_board_unowned(self):
+        engine = BatchEngine.from_map_file(MAP_FILE, 100, [NeverBuyPolicy()] * 2, seed=3)
+        engine.run()
+        self.assertTrue((engine.owner == NO_OWNER).all())
+
+    def test_matches_controller_distribution(self):
+        names = ["Alan", "Ben", "Cat"]
+        simulator = Simulator(MAP_FILE)
+        games = [simulator.run_game(names, self.policies, seed=i) for i in range(300)]
+        controller_cash = np.mean([game['cash'] for game in games])
+        batch_cash = BatchEngine.from_map_file(MAP_FILE, 20000, self.policies, seed=0).run()['cash'].mean()
+        self.assertLess(abs(controller_cash - batch_cash), 750)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from board_file import (
+    BoardFile, BoardFormatError, compile_board, write_board, convert_map_to_board, convert_board_to_map
+)
+from model import GameState, BoardIndex, BoardSquares, OwnershipLedger
+from map_window import MapWindow
+from controller import GameController
+from simulator import HeadlessGameView, AlwaysBuyPolicy
+import map_editor
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestBoardFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.board_file = os.path.join(self.directory, 'default.board')
+        convert_map_to_board(MAP_FILE, self.board_file)
+        with open(MAP_FILE) as f:
+            self.map_data = json.load(f)
+        self.board = BoardFile(self.board_file)
+
+    def tearDown(self):
+        self.board.close()
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        self.assertEqual(self.board.to_dict(), self.map_data)
+        map_file = os.path.join(self.directory, 'default.map')
+        convert_board_to_map(self.board_file, map_file)
+        with open(map_file) as f:
+            self.assertEqual(json.load(f), self.map_data)
+
+    def test_squares_read_by_position(self):
+        self.assertEqual(self.board.map_size, 20)
+        self.assertEqual(self.board.square(2), self.map_data['squares']['2'])
+        self.assertEqual(self.board.square(1), {'square_type': 'Go', 'name': 'Go'})
+        self.assertEqual(self.board.square_type(16), 'Go to Jail')
+        self.assertEqual(self.board.name(20), 'Tai O')
+        self.assertIsNone(self.board.square(21))
+        self.assertEqual(self.board.first_position('In Jail/Just Visiting'), 6)
+        self.assertEqual(self.board.positions_of('Chance'), (9, 13, 19))
+        self.assertIsNone(self.board.first_position('Unknown'))
+        self.assertEqual(list(self.board.owned()), [])
+
+    def test_undefined_and_owned_squares(self):
+        data = {'map_size': 4, 'squares': {
+            '1': {'square_type': 'Go', 'name': 'Go'},
+            '3': {'square_type': 'Property', 'name': 'Lane', 'price': 10, 'rent': 2, 'owner': 'Ann', 'owner_id': 2},
+        }}
+        path = os.path.join(self.directory, 'sparse.board')
+        write_board(data, path)
+        with BoardFile(path) as board:
+            self.assertEqual(board.positions(), [1, 3])
+            self.assertIsNone(board.square(2))
+            self.assertEqual(list(board.owned()), [(3, 2, 'Ann')])
+            self.assertEqual(board.to_dict(), data)
+
+    def test_missing_price_is_not_zero(self):
+        self.map_data['squares']['2']['price'] = None
+        self.map_data['squares']['3']['rent'] = None
+        self.map_data['squares']['4']['price'] = 0
+        path = os.path.join(self.directory, 'unpriced.board')
+        write_board(self.map_data, path)
+        with BoardFile(path) as board:
+            self.assertIsNone(board.square(2)['price'])
+            self.assertIsNone(board.square(3)['rent'])
+            self.assertEqual(board.square(4)['price'], 0)
+            self.assertEqual(board.to_dict(), self.map_data)
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(BoardFormatError):
+            BoardFile(MAP_FILE)
+        truncated = os.path.join(self.directory, 'truncated.board')
+        with open(truncated, 'wb') as f:
+            f.write(compile_board(self.map_data)[:100])
+        with self.assertRaises(BoardFormatError):
+            BoardFile(truncated)
+
+    def test_board_index_matches_json(self):
+        from_json = BoardIndex(self.map_data['squares'], 20)
+        from_board = BoardIndex(BoardSquares(self.board), 20)
+        for field in ('jail_position', 'go_position'):
+            self.assertEqual(getattr(from_board, field), getattr(from_json, field))
+        self.assertEqual(dict(from_board.property_positions), dict(from_json.property_positions))
+        self.assertEqual(dict(from_board.positions_by_type), dict(from_json.positions_by_type))
+        with self.assertRaises(TypeError):
+            from_board.property_positions['Central'] = 3
+
+
+class TestBoardGame(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.board_file = os.path.join(self.directory, 'default.board')
+        convert_map_to_board(MAP_FILE, self.board_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def play(self, map_file, seed=7):
+        model = GameState()
+        model.setup_new_game(map_file, ["Alan", "Ben", "Cat"])
+        game_view = HeadlessGameView(model, [AlwaysBuyPolicy()] * 3, random.Random(seed))
+        GameController(model, type('HeadlessView', (), {'GameView': game_view})).game_loop()
+        return model
+
+    def test_game_on_board_matches_json_map(self):
+        from_json = self.play(MAP_FILE)
+        from_board = self.play(self.board_file)
+        self.assertIsInstance(from_board.squares, BoardSquares)
+        self.assertEqual(from_board.save_data(), from_json.save_data())
+        self.assertEqual(from_board.map_id, 'default.board')
+
+    def test_squares_are_loaded_lazily(self):
+        model = GameState()
+        model.setup_new_game(self.board_file, ["Alan", "Ben"])
+        self.assertEqual(model.squares.loaded, {})
+        self.assertEqual(model.board_index.jail_position, 6)
+        model.squares[2].owner = 'Alan'
+        self.assertEqual(list(model.squares.loaded), [2])
+        self.assertEqual(model.save_data()['squares']['2']['owner'], 'Alan')
+        self.assertEqual(len(model.squares), 20)
+
+    def test_forked_game_keeps_the_board_lookups(self):
+        model = GameState()
+        model.setup_new_game(self.board_file, ["Alan", "Ben"])
+        child = model.fork()
+        square = model.squares.writable(2)
+        square['owner'], square['owner_id'] = 'Alan', 1
+        board = model.squares.base().board
+        with patch.object(board, 'positions_of', wraps=board.positions_of) as positions_of:
+            window = MapWindow(model.squares)
+            self.assertEqual(window.of_type('chance'), [9, 13, 19])
+            positions_of.assert_called_once_with('Chance')
+        self.assertEqual(window.owned_by('alan'), [2])
+        self.assertEqual(MapWindow(child.squares).owned_by('alan'), [])
+        self.assertEqual(OwnershipLedger.from_squares(model.squares, model.players).owner_of(2), 1)
+        self.assertIsNone(OwnershipLedger.from_squares(child.squares, child.players).owner_of(2))
+
+
+class TestBoardEditor(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.board_file = os.path.join(self.directory, 'default.board')
+        convert_map_to_board(MAP_FILE, self.board_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @patch('map_editor.display')
+    def test_edit_and_save_compiled_board(self, mock_display):
+        map_data = map_editor.load_map(self.board_file)
+        self.assertIsInstance(map_data.squares, map_editor.BoardFileSquares)
+        self.assertEqual(map_data.get_square(2).name, 'Central')
+        self.assertEqual(map_data.validate_map(), [])
+        map_data.edit_square(2, map_editor.PropertySquare('Admiralty', 900, 95))
+        map_editor.save_map(map_data, self.board_file)
+        json_file = os.path.join(self.directory, 'edited.map')
+        map_editor.save_map(map_data, json_file)
+
+        reloaded = map_editor.load_map(self.board_file)
+        self.assertEqual(reloaded.get_square(2).name, 'Admiralty')
+        self.assertEqual(reloaded.to_dict(), map_editor.load_map(json_file).to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, Mock
 from controller import GameController
+from model import BoardIndex, OwnershipLedger, RecordTable, Player, Square
 
 class TestGameController(unittest.TestCase):
 
@@ -12,7 +13,7 @@ class TestGameController(unittest.TestCase):
 
         # Set up basic mock player and game info
         self.player_id = 1
-        self.model.players = {
+        self.model.players = RecordTable.from_dict({
             "1": {
                 "name": "Alan",
                 "cash": 1000,
@@ -22,10 +23,21 @@ class TestGameController(unittest.TestCase):
                 "bankrupt": False,
                 "properties": []
             }
-        }
+        }, Player)
 
         #setup a map size
         self.model.map_size = 114514
+        self.model.ownership = OwnershipLedger()
+
+        # Simulate the model's active-seat bookkeeping on top of the players table
+        def mock_declare_bankrupt(player_id):
+            self.model.players[player_id]["bankrupt"] = True
+
+        def mock_turn_order():
+            return [int(pid) for pid, p in self.model.players.items() if not p["bankrupt"]]
+
+        self.model.declare_bankrupt.side_effect = mock_declare_bankrupt
+        self.model.turn_order.side_effect = mock_turn_order
 
     def test_toggle_debug_mode(self):
         # Ensure debug mode starts as False
@@ -47,7 +59,7 @@ class TestGameController(unittest.TestCase):
 
         self.controller.handle_debug_actions(self.player_id)
 
-        self.model.update_player_cash.assert_called_once_with("1", 500)
+        self.model.update_player_cash.assert_called_once_with(1, 500)
 
     def test_debug_change_position(self):
         # Mock debug action to change position
@@ -55,14 +67,14 @@ class TestGameController(unittest.TestCase):
         self.view.GameView.debug_choose_position.return_value = 10
 
         # Configure self.model.squares as a dictionary
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "10": {
                 "square_type": "Property",
                 "name": "Park Place",
                 "price": 200,
                 "owner": None
             }
-        }
+        }, Square)
 
         # Simulate the behavior of the update_player_position method
         def mock_update_player_position(player_id, new_position):
@@ -74,7 +86,7 @@ class TestGameController(unittest.TestCase):
         self.controller.handle_debug_actions(self.player_id)
 
         # Verify model method was called to update the player's position
-        self.model.update_player_position.assert_called_once_with("1", 10)
+        self.model.update_player_position.assert_called_once_with(1, 10)
 
         # Check if the player's position was actually updated
         self.assertEqual(self.model.players["1"]["position"], 10)
@@ -108,14 +120,14 @@ class TestGameController(unittest.TestCase):
 
     # Handle Square Tests
     def test_handle_square_property_available(self):
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "1": {
                 "square_type": "Property",
                 "name": "Park Place",
                 "price": 200,
                 "owner": None
             }
-        }
+        }, Square)
         # buy property
         self.view.GameView.reach_a_property.return_value = True
 
@@ -129,15 +141,16 @@ class TestGameController(unittest.TestCase):
 
     def test_handle_square_property_owned_by_other(self):
 
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "1": {
                 "square_type": "Property",
                 "name": "Park Place",
                 "rent": 50,
                 "owner": "Ben"
             }
-        }
+        }, Square)
         self.model.players["2"] = {"name": "Ben", "cash": 500}
+        self.model.ownership = OwnershipLedger.from_squares(self.model.squares, self.model.players)
 
         self.controller.handle_square(self.player_id, 1)
 
@@ -150,10 +163,36 @@ class TestGameController(unittest.TestCase):
 
 
 
+    def test_handle_square_rent_goes_to_owner_id_not_name(self):
+        self.model.squares = RecordTable.from_dict({
+            "1": {"square_type": "Property", "name": "Park Place", "rent": 50, "owner": "Alan", "owner_id": 3}
+        }, Square)
+        self.model.players["2"] = {"name": "Alan", "cash": 500}
+        self.model.players["3"] = {"name": "Alan", "cash": 500}
+        self.model.ownership = OwnershipLedger.from_squares(self.model.squares, self.model.players)
+
+        self.controller.handle_square(self.player_id, 1)
+
+        self.assertEqual(self.model.players["1"]["cash"], 950)
+        self.assertEqual(self.model.players["2"]["cash"], 500)
+        self.assertEqual(self.model.players["3"]["cash"], 550)
+
+    def test_handle_square_property_bought_records_owner_id(self):
+        self.model.squares = RecordTable.from_dict({
+            "1": {"square_type": "Property", "name": "Park Place", "price": 200, "owner": None}
+        }, Square)
+        self.view.GameView.reach_a_property.return_value = True
+
+        self.controller.handle_square(self.player_id, 1)
+
+        self.assertEqual(self.model.ownership.owner_of(1), self.player_id)
+        self.assertEqual(self.model.squares["1"]["owner_id"], self.player_id)
+        self.assertEqual(self.model.squares["1"]["owner"], "Alan")
+
     def test_handle_square_chance(self):
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "1": {"square_type": "Chance"}
-        }
+        }, Square)
 
         self.view.GameView.reach_a_chance.return_value = 100
 
@@ -162,9 +201,9 @@ class TestGameController(unittest.TestCase):
         self.assertEqual(self.model.players["1"]["cash"], 1100)
 
     def test_handle_square_income_tax(self):
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "1": {"square_type": "Income Tax"}
-        }
+        }, Square)
 
         self.controller.handle_square(self.player_id, 1)
 
@@ -173,10 +212,11 @@ class TestGameController(unittest.TestCase):
         self.view.GameView.pay_income_tax.assert_called_once_with(100)
 
     def test_handle_square_go_to_jail(self):
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "1": {"square_type": "Go to Jail"},
             "10": {"square_type": "In Jail/Just Visiting"}
-        }
+        }, Square)
+        self.model.board_index = BoardIndex(self.model.squares, self.model.map_size)
 
         # go to jail
         self.controller.handle_square(self.player_id, 1)
@@ -186,9 +226,9 @@ class TestGameController(unittest.TestCase):
         self.view.GameView.reach_a_jail.assert_called_once()
 
     def test_handle_square_go(self):
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "1": {"square_type": "Go"}
-        }
+        }, Square)
 
         self.controller.handle_square(self.player_id, 1)
 
@@ -312,20 +352,21 @@ class TestGameController(unittest.TestCase):
         self.model.map_size = 10
 
         # Define squares as a dictionary
-        self.model.squares = {
+        self.model.squares = RecordTable.from_dict({
             "8": {
                 "square_type": "Property",
                 "name": "Test Property",
                 "price": 200,
                 "owner": None
             }
-        }
+        }, Square)
+        self.model.board_index = BoardIndex(self.model.squares, self.model.map_size)
 
         # Call the method
         self.controller.handle_dice_throw(self.player_id)
 
         # Assert the position was updated correctly
-        self.model.update_player_position.assert_called_once_with("1", 8)
+        self.model.update_player_position.assert_called_once_with(1, 8)
 
 
 
@@ -374,8 +415,10 @@ class TestGameController(unittest.TestCase):
         self.view.GameView.debug_modify_cash.return_value = -500  # Negative cash
 
         # Set up a property owned by the player
-        self.model.squares = {"1": {"name": "Test Property", "owner": "Alan"}}
+        self.model.squares = RecordTable.from_dict({"1": {"square_type": "Property", "name": "Test Property", "owner": "Alan"}}, Square)
+        self.model.board_index = BoardIndex(self.model.squares, self.model.map_size)
         self.model.players["1"]["properties"] = ["Test Property"]
+        self.model.ownership = OwnershipLedger.from_squares(self.model.squares, self.model.players)
 
         # Mock `update_player_cash` to update the player's cash directly
         def mock_update_player_cash(player_id, amount):
@@ -410,7 +453,7 @@ class TestGameController(unittest.TestCase):
             self.model.is_game_over.side_effect = [False, False, False, False, True]
             self.model.round_num = 1
             self.model.players_num = 2
-            self.model.players = {"1": {"name": "Alan", "bankrupt": False}, "2": {"name": "Ben", "bankrupt": False}}
+            self.model.players = RecordTable.from_dict({"1": {"name": "Alan", "bankrupt": False}, "2": {"name": "Ben", "bankrupt": False}}, Player)
 
             # Mock view and model calls
             self.view.GameView.show_round_start = Mock()
@@ -471,5 +514,40 @@ class TestGameController(unittest.TestCase):
             # Ensure the player is declared bankrupt
             self.assertTrue(self.model.players["1"]["bankrupt"])
             self.view.GameView.player_bankrupt.assert_called_once_with("Alan")
+
+    @patch.object(GameController, 'handle_dice_throw')
+    def test_invalid_action_goes_through_the_view(self, mock_handle_dice_throw):
+        self.model.players["1"]["in_jail"] = False
+        self.view.GameView.player_action_menu.side_effect = [6, 1]
+        with patch('builtins.print') as mock_print:
+            self.controller.player_turn(self.player_id)
+        self.view.GameView.invalid_choice.assert_called_once_with()
+        mock_print.assert_not_called()
+        mock_handle_dice_throw.assert_called_once_with(self.player_id)
+
+    def test_logged_events_mark_the_game_changed(self):
+        self.controller.log('cash', 1, 100)
+        self.model.mark_changed.assert_called_once_with('cash', 1, 100)
+
+    def test_save_is_reported_once_written(self):
+        self.model.save_game.return_value = "save/save_round_3.save"
+        self.assertTrue(self.controller.save_game())
+        self.model.save_game.assert_called_once_with(durable=True)
+        self.view.GameView.game_saved.assert_called_once_with("save/save_round_3.save")
+
+    def test_unchanged_save_is_reported(self):
+        self.model.save_game.return_value = None
+        self.model.save_path.return_value = "save/save_round_3.save"
+        self.assertTrue(self.controller.save_game())
+        self.view.GameView.save_unchanged.assert_called_once_with("save/save_round_3.save")
+        self.view.GameView.game_saved.assert_not_called()
+
+    def test_failed_save_keeps_the_game_going(self):
+        self.model.save_game.side_effect = OSError("disk full")
+        self.assertFalse(self.controller.save_game())
+        self.view.GameView.save_failed.assert_called_once_with("disk full")
+        self.view.GameView.game_saved.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
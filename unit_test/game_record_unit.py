@@ -0,0 +1,114 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import view
+from view import GameView
+from view_sink import NullSink
+from controller import GameController
+from game_record import GameRecorder, ReplayError, load_record, replay, record_games, state_hash
+from game_rng import GameRng
+from model import GameState
+from simulator import Simulator, ReserveBuyer, RandomPolicy
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestGameRecord(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Simulator(MAP_FILE)
+        self.names = ["Alan", "Ben", "Cat"]
+
+    def recorded(self, seed=1):
+        recorder = GameRecorder()
+        self.simulator.run_game(self.names, [ReserveBuyer(), RandomPolicy(), ReserveBuyer()], seed=seed,
+                                recorder=recorder)
+        return recorder.record
+
+    def test_replay_reaches_the_recorded_state(self):
+        record = self.recorded()
+        hooks = {hook for hook, _ in record['events']}
+        self.assertTrue({'throw_the_dice', 'reach_a_property', 'choose_next_action'} <= hooks)
+        self.assertEqual(record['seed'], 1)
+        model = replay(record)
+        self.assertEqual(state_hash(model), record['final_hash'])
+
+    def test_record_survives_json(self):
+        record = json.loads(json.dumps(self.recorded(2)))
+        replay(record)
+
+    def test_changed_outcome_is_caught(self):
+        record = self.recorded(3)
+        for event in record['events']:
+            if event[0] == 'reach_a_chance':
+                event[1] += 100
+                break
+        with self.assertRaises(ReplayError):
+            replay(record)
+
+    def test_wrong_final_state_is_caught(self):
+        record = self.recorded(4)
+        record['final_hash'] = '0' * 64
+        with self.assertRaisesRegex(ReplayError, "different state"):
+            replay(record)
+
+    def test_missing_events_are_caught(self):
+        record = self.recorded(5)
+        del record['events'][len(record['events']) // 2:]
+        with self.assertRaises(ReplayError):
+            replay(record)
+
+    def test_start_is_not_changed_by_the_game(self):
+        model = GameState()
+        model.setup_from_map_data(self.simulator.map_data, self.names)
+        start = model.save_data()
+        start_players = json.loads(json.dumps(start['players']))
+        record = self.recorded(6)
+        self.assertEqual(record['start']['players'], start_players)
+
+    def test_interactive_game_save_and_quit(self):
+        # a person at the console: always rolls, never buys, quits after round 1
+        previous = view.set_sink(NullSink())
+        self.addCleanup(view.set_sink, previous)
+        model = GameState()
+        model.setup_new_game(MAP_FILE, ["Alan", "Ben"])
+        recorder = GameRecorder()
+        view_class = type('View', (), {'GameView': GameView})
+        with patch('builtins.input', side_effect=lambda prompt='': '1' if prompt else 'n'), \
+                patch.object(GameView, 'choose_next_action', return_value=2), \
+                patch.object(GameState, 'save_game') as save_game:
+            GameController(model, view_class, rng=GameRng(8), recorder=recorder).game_loop()
+        save_game.assert_called_once()
+        self.assertEqual(recorder.record['events'][-1], ['choose_next_action', 2])
+        self.assertEqual(recorder.record['final_hash'], state_hash(model))
+        replay(recorder.record)
+
+
+class TestRecordFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_and_replay_files(self):
+        with patch('sys.stdout', new_callable=io.StringIO):
+            record_games(MAP_FILE, self.directory, 3, 2, 10, 'bargain')
+        files = sorted(os.listdir(self.directory))
+        self.assertEqual(files, ['game_10.record', 'game_11.record', 'game_12.record'])
+        for name in files:
+            replay(load_record(os.path.join(self.directory, name)))
+
+    def test_unknown_version(self):
+        path = os.path.join(self.directory, 'old.record')
+        with open(path, 'w') as f:
+            json.dump({'version': 0}, f)
+        with self.assertRaises(ReplayError):
+            load_record(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
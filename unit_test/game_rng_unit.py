@@ -0,0 +1,81 @@
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+import view
+from view import GameView
+from view_sink import NullSink
+from controller import GameController
+from game_rng import GameRng, CHANCE_AMOUNTS, DICE_THROWS, np
+from simulator import Simulator, AlwaysBuyPolicy
+
+MAP_FILE = 'map/default_board.map'
+
+
+def draws(rng, count):
+    return [rng.roll() for _ in range(count)], [rng.chance() for _ in range(count)]
+
+
+class TestGameRng(unittest.TestCase):
+    def test_same_seed_same_draws(self):
+        self.assertEqual(draws(GameRng(7), 3000), draws(GameRng(7), 3000))
+        self.assertNotEqual(draws(GameRng(7), 100), draws(GameRng(8), 100))
+
+    def test_draws_cover_every_outcome(self):
+        throws, chances = draws(GameRng(1, block_size=64), 5000)
+        self.assertEqual(set(throws), set(DICE_THROWS))
+        self.assertEqual(set(chances), set(CHANCE_AMOUNTS))
+
+    def test_draws_do_not_depend_on_each_other(self):
+        # dice and chance blocks are separate, so extra chance draws leave the dice alone
+        rng = GameRng(3)
+        other = GameRng(3)
+        other.chance()
+        self.assertEqual([rng.roll() for _ in range(10)], [other.roll() for _ in range(10)])
+
+    def test_spawn_is_fixed_by_the_seed(self):
+        first, second = GameRng(5).spawn(), GameRng(5).spawn()
+        self.assertEqual(draws(first, 50), draws(second, 50))
+        parent = GameRng(5)
+        self.assertNotEqual(draws(parent.spawn(), 50), draws(parent.spawn(), 50))
+
+    def test_source(self):
+        self.assertEqual(draws(GameRng(source=random.Random(2)), 20), draws(GameRng(source=random.Random(2)), 20))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_blocks(self):
+        throws, chances = draws(GameRng(4, numpy=True), 3000)
+        self.assertEqual(set(throws), set(DICE_THROWS))
+        self.assertEqual(set(chances), set(CHANCE_AMOUNTS))
+        self.assertEqual((throws, chances), draws(GameRng(4, numpy=True), 3000))
+        self.assertIsInstance(throws[0][0], int)
+
+
+class TestRngInjection(unittest.TestCase):
+    def test_game_view_draws_from_the_rng_it_is_given(self):
+        previous = view.set_sink(NullSink())
+        self.addCleanup(view.set_sink, previous)
+        rng, expected = GameRng(9), GameRng(9)
+        self.assertEqual(GameView.throw_the_dice(rng), expected.roll())
+        self.assertEqual(GameView.reach_a_chance(rng), expected.chance())
+
+    def test_controller_passes_its_rng(self):
+        model = MagicMock()
+        game_view = MagicMock()
+        game_view.throw_the_dice.return_value = (1, 2)
+        model.board_index.move.return_value = (4, False)
+        rng = GameRng(1)
+        controller = GameController(model, type('View', (), {'GameView': game_view}), rng=rng)
+        with patch.object(GameController, 'handle_square'):
+            controller.handle_dice_throw(1)
+        game_view.throw_the_dice.assert_called_once_with(rng)
+
+    def test_game_is_set_by_its_seed(self):
+        simulator = Simulator(MAP_FILE)
+        names = ["Alan", "Ben", "Cat"]
+        results = [simulator.run_game(names, [AlwaysBuyPolicy()] * 3, seed=seed) for seed in (11, 11, 12)]
+        self.assertEqual(results[0], results[1])
+        self.assertNotEqual(results[0], results[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
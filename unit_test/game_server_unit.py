@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+from game_server import GameServer, GameClient, bot_answer
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = GameServer(MAP_FILE, turn_timeout=5)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def join(self, game_id, name):
+        client = await GameClient.connect('127.0.0.1', self.server.port)
+        client.send(f"JOIN {game_id} {name}")
+        return client
+
+    async def test_game_plays_to_the_end(self):
+        alan = await self.join('table', 'Alan')
+        ben = await self.join('table', 'Ben')
+        await asyncio.sleep(0.05)
+        alan.send('START')
+        results = await asyncio.wait_for(asyncio.gather(alan.play(bot_answer), ben.play(bot_answer)), 30)
+        self.assertEqual(results, [True, True])
+        self.assertTrue(any(message.startswith('Congratulations') or message.startswith('Draw!')
+                            for message in alan.messages))
+        self.assertIn("Alan's turn!", alan.messages)
+        self.assertIn("Ben's turn!", alan.messages)
+        self.assertEqual(alan.errors, [])
+        self.assertEqual(self.server.sessions, set())
+
+    async def test_idle_player_times_out(self):
+        self.server.turn_timeout = 0.02
+        alan = await self.join('idle', 'Alan')
+        ben = await self.join('idle', 'Ben')
+        await asyncio.sleep(0.05)
+        alan.send('START')
+        # Ben never answers; his turns fall back to the defaults
+        results = await asyncio.wait_for(asyncio.gather(alan.play(bot_answer), ben.play(lambda prompt: None)), 60)
+        self.assertEqual(results, [True, True])
+        self.assertIn("Ben did not answer in time.", alan.messages)
+
+    async def test_protocol_errors(self):
+        client = await GameClient.connect('127.0.0.1', self.server.port)
+        client.send('HELLO')
+        self.assertEqual(await client.receive(), ('ERR', 'Expected JOIN <game> <name>.'))
+        client.send('JOIN solo Alan')
+        self.assertEqual((await client.receive())[0], 'MSG')
+        client.send('START')
+        self.assertEqual(await client.receive(), ('ERR', 'A game needs at least 2 players.'))
+        client.send('1')
+        self.assertEqual(await client.receive(), ('ERR', 'The game has not started yet.'))
+        other = await self.join('solo', 'Alan')
+        self.assertEqual(await other.receive(), ('ERR', 'This name is taken at this table.'))
+        client.writer.close()
+        other.writer.close()
+
+    async def test_invalid_answer_is_asked_again(self):
+        alan = await self.join('retry', 'Alan')
+        ben = await self.join('retry', 'Ben')
+        await asyncio.sleep(0.05)
+        alan.send('START')
+        answers = iter(['9'])
+        results = await asyncio.wait_for(asyncio.gather(
+            alan.play(lambda prompt: next(answers, None) or bot_answer(prompt)), ben.play(bot_answer)), 30)
+        self.assertEqual(results, [True, True])
+        self.assertTrue(alan.errors[0].startswith('Please answer one of'))
+
+    async def test_start_beyond_the_game_cap_is_refused(self):
+        await self.server.close()
+        self.server = GameServer(MAP_FILE, turn_timeout=5, max_games=1)
+        await self.server.start()
+        first = [await self.join('first', 'Alan'), await self.join('first', 'Ben')]
+        second = [await self.join('second', 'Cat'), await self.join('second', 'Dan')]
+        await asyncio.sleep(0.05)
+        first[0].send('START')
+        second[0].send('START')
+        while True:
+            kind, text = await asyncio.wait_for(second[0].receive(), 5)
+            if kind == 'ERR':
+                break
+        self.assertEqual(text, 'The server is already running as many games as it can (1); try again later.')
+        results = await asyncio.wait_for(asyncio.gather(*(c.play(bot_answer) for c in first)), 30)
+        self.assertEqual(results, [True, True])
+        while not self.server.game_slots.acquire(timeout=0.01):
+            await asyncio.sleep(0.01)
+        self.server.game_slots.release()
+        second[0].send('START')
+        results = await asyncio.wait_for(asyncio.gather(*(c.play(bot_answer) for c in second)), 30)
+        self.assertEqual(results, [True, True])
+
+    async def test_many_concurrent_games(self):
+        clients = []
+        for game in range(10):
+            for name in ('Alan', 'Ben', 'Cat'):
+                clients.append(await self.join(f"game{game}", name))
+        await asyncio.sleep(0.1)
+        for game in range(10):
+            clients[game * 3].send('START')
+        results = await asyncio.wait_for(asyncio.gather(*(c.play(bot_answer) for c in clients)), 120)
+        self.assertTrue(all(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from journal import TurnJournal, read_journal, last_snapshot, journal_tail
+from model import GameState
+from controller import GameController
+from simulator import Simulator, HeadlessGameView, AlwaysBuyPolicy
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestTurnJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'game.journal')
+        self.snapshot = os.path.join(self.directory, 'game.snapshot')
+        open(self.snapshot, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fsync_is_batched(self):
+        journal = TurnJournal(self.path, fsync_every=3)
+        with patch('os.fsync') as mock_fsync:
+            for i in range(7):
+                journal.append(['move', 1, i])
+            self.assertEqual(mock_fsync.call_count, 2)
+            journal.close()
+            self.assertEqual(mock_fsync.call_count, 3)
+
+    def test_tail_after_snapshot(self):
+        journal = TurnJournal(self.path)
+        journal.append(['move', 1, 2])
+        journal.mark_snapshot(self.snapshot)
+        journal.append(['cash', 1, -50])
+        journal.append(['turn', 1])
+        journal.close()
+        self.assertEqual(last_snapshot(self.path), self.snapshot)
+        self.assertEqual(journal_tail(self.path, self.snapshot), [['cash', 1, -50], ['turn', 1]])
+
+    def test_torn_write_and_unfinished_turn_are_dropped(self):
+        journal = TurnJournal(self.path)
+        journal.mark_snapshot(self.snapshot)
+        journal.append(['move', 1, 4])
+        journal.append(['turn', 1])
+        journal.append(['cash', 2, -100])
+        journal.close()
+        with open(self.path, 'a') as f:
+            f.write('["move", 2')
+        self.assertEqual(read_journal(self.path)[-1], ['turn', 1])
+
+        reopened = TurnJournal(self.path)
+        self.assertEqual(reopened.snapshot, self.snapshot)
+        reopened.append(['turn', 2])
+        reopened.close()
+        self.assertEqual(journal_tail(self.path, self.snapshot), [['move', 1, 4], ['turn', 1], ['turn', 2]])
+
+
+class TestJournalRecovery(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'game.journal')
+        self.map_data = Simulator(MAP_FILE).map_data
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def play(self, journal, seed=4):
+        model = GameState()
+        model.setup_from_map_data(self.map_data, ["Alan", "Ben", "Cat"])
+        game_view = HeadlessGameView(model, [AlwaysBuyPolicy()] * 3, random.Random(seed))
+        view = type('HeadlessView', (), {'GameView': game_view})
+        GameController(model, view, journal).game_loop()
+        return model
+
+    def test_recovered_game_matches_played_game(self):
+        journal = TurnJournal(self.path, fsync_every=16, snapshot_every=5)
+        model = self.play(journal)
+        journal.close()
+
+        recovered = GameState()
+        recovered.load_game(None, self.path)
+        self.assertEqual(recovered.save_data(), model.save_data())
+        self.assertEqual(recovered.active_seats, model.active_seats)
+        self.assertEqual(recovered.ownership.owners, model.ownership.owners)
+        snapshots = [name for name in os.listdir(self.directory) if name.endswith('.snapshot')]
+        self.assertEqual(len(snapshots), 1)
+
+    def test_recovery_resumes_mid_round(self):
+        model = GameState()
+        model.setup_from_map_data(self.map_data, ["Alan", "Ben", "Cat"])
+        journal = TurnJournal(self.path)
+        snapshot = self.path + '.round1.snapshot'
+        model.write_snapshot(snapshot)
+        journal.mark_snapshot(snapshot)
+        journal.append(['move', 1, 3])
+        journal.append(['turn', 1])
+        journal.append(['cash', 2, -200])
+        journal.close()
+
+        recovered = GameState()
+        recovered.load_game(None, self.path)
+        self.assertEqual(recovered.players[1].position, 3)
+        self.assertEqual(recovered.players[2].cash, 1500)
+        self.assertEqual(recovered.turn_order(), [2, 3])
+        self.assertEqual(recovered.turn_order(), [1, 2, 3])
+
+    def test_replay_bankruptcy_releases_properties(self):
+        model = GameState()
+        model.setup_from_map_data(self.map_data, ["Alan", "Ben"])
+        model.apply_event(['buy', 1, 2])
+        self.assertEqual(model.squares[2].owner_id, 1)
+        model.apply_event(['bankrupt', 1, True])
+        self.assertEqual(model.squares[2].owner_id, None)
+        self.assertEqual(model.players[1].properties, [])
+        self.assertEqual(model.turn_order(), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+from map_editor import (
+    MapData, GoSquare, PropertySquare, ChanceSquare, GoToJailSquare, InJailSquare, main_menu
+)
+from map_analysis import np, dice_sum_distribution, landing_probabilities, analyze_map
+
+
+@unittest.skipIf(np is None, "numpy/scipy are not installed")
+class TestMapAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.map_data = MapData(12)
+        self.map_data.add_square(1, GoSquare())
+        for pos in range(2, 13):
+            self.map_data.add_square(pos, PropertySquare(f"Street {pos}", 100 * pos, 10 * pos))
+
+    def test_dice_sum_distribution(self):
+        distribution = dice_sum_distribution()
+        self.assertEqual(sorted(distribution), list(range(2, 9)))
+        self.assertAlmostEqual(distribution[5], 4 / 16)
+        self.assertAlmostEqual(sum(distribution.values()), 1.0)
+
+    def test_board_without_jail_is_uniform(self):
+        landing = landing_probabilities(self.map_data)
+        self.assertTrue(np.allclose(landing, 1 / 12))
+
+    def test_go_to_jail_feeds_jail_square(self):
+        self.map_data.edit_square(4, InJailSquare())
+        self.map_data.edit_square(10, GoToJailSquare())
+        landing = landing_probabilities(self.map_data)
+        # turns spent waiting in jail land nowhere
+        self.assertLess(landing.sum(), 1.0)
+        self.assertGreater(landing[4], landing[2])
+        paying = landing_probabilities(self.map_data, jail_policy='pay')
+        self.assertAlmostEqual(paying.sum(), 1.0)
+
+    def test_analyze_map_reports_properties(self):
+        analysis = analyze_map(self.map_data, opponents=3)
+        self.assertEqual(len(analysis['properties']), 11)
+        prop = analysis['properties'][0]
+        self.assertEqual(prop['name'], "Street 2")
+        self.assertAlmostEqual(prop['expected_rent'], 20 * 3 / 12)
+        self.assertAlmostEqual(prop['payback_rounds'], 200 / prop['expected_rent'])
+
+    def test_invalid_jail_policy(self):
+        with self.assertRaises(ValueError):
+            landing_probabilities(self.map_data, jail_policy='bribe')
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['3', 'map/default_board.map', '4'])
+    def test_main_menu_analyze_option(self, mock_input, mock_print):
+        main_menu()
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertIn("Map Analysis (per opponent turn):", printed)
+        self.assertTrue(any(line.startswith("Square 12: Shatin") for line in printed))
+
+
+if __name__ == '__main__':
+    unittest.main()
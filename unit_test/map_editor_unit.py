@@ -1,6 +1,7 @@
 import unittest
+from unittest.mock import patch
 from map_editor import (
-    MapData, GoSquare, PropertySquare, IncomeTaxSquare,
+    MapData, define_square, create_new_map, GoSquare, PropertySquare, IncomeTaxSquare,
     ChanceSquare, FreeParkingSquare, GoToJailSquare, InJailSquare, Square
 )
 
@@ -73,6 +74,28 @@ class TestMapData(unittest.TestCase):
         errors = self.map_data.validate_map()
         self.assertIn("Duplicate property names found. Each property must have a unique name.", errors)
 
+    def test_validation_follows_edits(self):
+        # Counts are updated by each edit rather than recomputed
+        self.map_data.add_square(1, self.go_square)
+        self.map_data.add_square(2, self.property_square)
+        self.map_data.add_square(3, PropertySquare("Park Place", 300, 30))
+        self.assertIn("Duplicate property names found. Each property must have a unique name.",
+                      self.map_data.validate_map())
+        self.map_data.edit_square(3, PropertySquare("Boardwalk", 400, 50))
+        self.assertEqual(self.map_data.validate_map(), [])
+        self.map_data.edit_square(1, self.chance_square)
+        self.assertEqual(self.map_data.validate_map(), ["Map must have exactly one 'Go' square, but has 0."])
+        self.assertEqual(self.map_data.type_counts['Go'], 0)
+        self.assertEqual(dict(self.map_data.property_names), {"Park Place": 1, "Boardwalk": 1})
+
+    def test_full_validation_recounts(self):
+        self.map_data.add_square(1, self.go_square)
+        # bypasses the counts; only a full validation sees it
+        self.map_data.squares[2] = GoSquare()
+        self.assertEqual(self.map_data.validate_map(), [])
+        self.assertEqual(self.map_data.validate_map(full=True),
+                         ["Map must have exactly one 'Go' square, but has 2."])
+
     def test_to_dict(self):
         # Test conversion to dictionary
         self.map_data.add_square(1, self.go_square)
@@ -183,5 +206,34 @@ class TestMapData(unittest.TestCase):
         self.assertEqual(square.name, "Park Place")
 
 
+@patch('map_editor.display')
+class TestDefineSquare(unittest.TestCase):
+    def test_rejects_second_go_and_jail(self, mock_display):
+        map_data = MapData(10)
+        map_data.add_square(1, GoSquare())
+        map_data.add_square(2, InJailSquare())
+        with patch('map_editor.prompt', side_effect=['1', '7', '4']):
+            square = define_square(3, map_data)
+        self.assertIsInstance(square, ChanceSquare)
+        mock_display.assert_any_call("Already exists a 'Go' square, cannot have multiple 'Go' squares.")
+        mock_display.assert_any_call("Already exists an 'In Jail/Just Visiting' square, cannot have multiple.")
+
+    def test_rejects_duplicate_property_name(self, mock_display):
+        map_data = MapData(10)
+        map_data.add_square(1, PropertySquare("Park Place", 350, 35))
+        with patch('map_editor.prompt', side_effect=['2', 'Park Place', '2', 'Boardwalk', '400', '50']):
+            square = define_square(2, map_data)
+        self.assertEqual(square.name, "Boardwalk")
+        mock_display.assert_any_call("Duplicate property name found. Please use a different name.")
+
+    def test_create_new_map(self, mock_display):
+        answers = ['8', '1', '2', 'A', '100', '10', '2', 'B', '120', '12', '3', '4', '5', '6', '7']
+        with patch('map_editor.prompt', side_effect=answers):
+            map_data = create_new_map()
+        self.assertEqual(map_data.validate_map(), [])
+        self.assertEqual(map_data.count('Property'), 2)
+        mock_display.assert_any_call("Map validation passed.")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
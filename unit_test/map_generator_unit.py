@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from map_generator import MapSpec, generate_squares, generate_map, write_map
+import map_editor
+
+
+class TestMapGenerator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generated_maps_are_valid(self):
+        for size, seed in ((8, 0), (40, 1), (5000, 2)):
+            map_data = generate_map(MapSpec(size, seed=seed))
+            self.assertEqual(map_data.validate_map(full=True), [])
+            self.assertEqual(len(map_data.squares), size)
+            self.assertEqual(map_data.get_square(1).square_type, 'Go')
+            self.assertEqual(map_data.count('In Jail/Just Visiting'), 1)
+
+    def test_spec_is_followed(self):
+        spec = MapSpec(2000, {'Property': 3, 'Chance': 1}, price_range=(200, 400), price_step=50,
+                       rent_ratio=(0.1, 0.1), seed=5)
+        squares = dict(generate_squares(spec))
+        self.assertEqual(list(squares), list(range(1, 2001)))
+        types = {sq['square_type'] for sq in squares.values()}
+        self.assertEqual(types, {'Go', 'Property', 'Chance'})
+        properties = [sq for sq in squares.values() if sq['square_type'] == 'Property']
+        self.assertAlmostEqual(len(properties) / 1999, 0.75, delta=0.05)
+        self.assertTrue(all(sq['price'] in (200, 250, 300, 350, 400) for sq in properties))
+        self.assertTrue(all(sq['rent'] == round(sq['price'] * 0.1) for sq in properties))
+        self.assertEqual(len({sq['name'] for sq in properties}), len(properties))
+
+    def test_same_seed_same_map(self):
+        self.assertEqual(list(generate_squares(MapSpec(300, seed=9))), list(generate_squares(MapSpec(300, seed=9))))
+        self.assertNotEqual(list(generate_squares(MapSpec(300, seed=9))), list(generate_squares(MapSpec(300, seed=10))))
+
+    def test_rejects_impossible_specs(self):
+        with self.assertRaises(ValueError):
+            MapSpec(4)
+        with self.assertRaises(ValueError):
+            MapSpec(40, {'Property': 1, 'Go': 1})
+        with self.assertRaises(ValueError):
+            MapSpec(40, {'Property': 1, 'Go to Jail': 1}, jail=False)
+        with self.assertRaises(ValueError):
+            MapSpec(40, {'Property': 0})
+        spec = MapSpec(40, {'Property': 1}, jail=False)
+        self.assertNotIn('In Jail/Just Visiting', [sq['square_type'] for _, sq in generate_squares(spec)])
+
+    @patch('map_editor.display')
+    def test_write_map_and_board(self, mock_display):
+        spec = MapSpec(500, seed=3)
+        expected = {str(pos): sq for pos, sq in generate_squares(spec)}
+        for name in ('generated.map', 'generated.board'):
+            path = os.path.join(self.directory, name)
+            write_map(spec, path)
+            map_data = map_editor.load_map(path)
+            self.assertEqual(map_data.validate_map(), [])
+            self.assertEqual(map_data.to_dict(), {'map_size': 500, 'squares': expected})
+        with open(os.path.join(self.directory, 'generated.map')) as f:
+            self.assertEqual(json.load(f)['map_size'], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
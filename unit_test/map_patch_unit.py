@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from board_file import convert_map_to_board
+from map_generator import MapSpec, write_map
+from map_patch import PatchError, compile_patch, apply_patch, patch_map, map_files
+import map_editor
+
+MAP_FILE = 'map/default_board.map'
+
+
+@patch('map_editor.display')
+class TestMapPatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.directory, 'default.map')
+        shutil.copy(MAP_FILE, self.map_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load(self, path=None):
+        return map_editor.load_map(path or self.map_file)
+
+    def test_reprice(self, mock_display):
+        map_data = self.load()
+        changed = apply_patch(map_data, compile_patch([{'op': 'reprice', 'price': 1.1, 'rent': 2}]))
+        self.assertEqual(changed, 12)
+        self.assertEqual(map_data.get_square(2).price, 880)
+        self.assertEqual(map_data.get_square(2).rent, 180)
+        self.assertEqual(map_data.get_square(1).square_type, 'Go')
+
+    def test_set_range_and_rename(self, mock_display):
+        map_data = self.load()
+        operations = [
+            {'op': 'set', 'positions': '17-18', 'square': {'square_type': 'Chance'}},
+            {'op': 'set', 'positions': [20], 'square': {'square_type': 'Property', 'name': 'Lot {position}',
+                                                         'price': 100, 'rent': 5}},
+            {'op': 'rename', 'names': {'Central': 'Admiralty'}},
+            {'op': 'rename', 'replace': ['Tai ', 'Big '], 'positions': '1-19'},
+        ]
+        self.assertEqual(apply_patch(map_data, compile_patch(operations)), 5)
+        self.assertEqual([map_data.get_square(pos).square_type for pos in (17, 18)], ['Chance', 'Chance'])
+        self.assertEqual(map_data.get_square(20).name, 'Lot 20')
+        self.assertEqual(map_data.get_square(2).name, 'Admiralty')
+        self.assertEqual(map_data.get_square(15).name, 'Big Po')
+        self.assertEqual(map_data.count('Chance'), 5)
+        self.assertEqual(map_data.validate_map(), [])
+
+    def test_operations_apply_in_order(self, mock_display):
+        map_data = self.load()
+        operations = [{'op': 'rename', 'names': {'Central': 'A'}}, {'op': 'rename', 'names': {'A': 'B'}}]
+        apply_patch(map_data, compile_patch(operations))
+        self.assertEqual(map_data.get_square(2).name, 'B')
+
+    def test_invalid_patches(self, mock_display):
+        for operations in ({'op': 'reprice'}, [{'op': 'delete'}], [{'op': 'set', 'square': {}}],
+                           [{'op': 'set', 'square': {'square_type': 'Property', 'name': 'X'}}],
+                           [{'op': 'reprice', 'positions': 'a-b'}], [{'op': 'rename', 'replace': 'x'}]):
+            with self.assertRaises(PatchError):
+                compile_patch(operations)
+
+    def test_invalid_result_is_not_saved(self, mock_display):
+        with open(self.map_file) as f:
+            before = f.read()
+        compiled = compile_patch([{'op': 'set', 'positions': 2, 'square': {'square_type': 'Go'}}])
+        changed, errors = patch_map(self.map_file, compiled)
+        self.assertEqual(changed, 1)
+        self.assertEqual(errors, ["Map must have exactly one 'Go' square, but has 2."])
+        with open(self.map_file) as f:
+            self.assertEqual(f.read(), before)
+
+    def test_patch_directory_of_maps(self, mock_display):
+        board_file = os.path.join(self.directory, 'default.board')
+        convert_map_to_board(MAP_FILE, board_file)
+        generated = os.path.join(self.directory, 'generated.map')
+        write_map(MapSpec(3000, seed=1), generated)
+        with patch('map_patch.BATCH_STREAMING_MIN_BYTES', 1000):
+            files = list(map_files([self.directory]))
+            self.assertEqual(files, [board_file, self.map_file, generated])
+            compiled = compile_patch([{'op': 'reprice', 'price': 1.5}])
+            for map_file in files:
+                changed, errors = patch_map(map_file, compiled)
+                self.assertEqual(errors, [])
+        self.assertEqual(self.load(board_file).get_square(2).price, 1200)
+        self.assertEqual(self.load().get_square(2).price, 1200)
+        with open(generated) as f:
+            data = json.load(f)
+        self.assertEqual(len(data['squares']), 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
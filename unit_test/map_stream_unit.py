@@ -0,0 +1,196 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from board_file import BoardFile, convert_map_to_board
+from map_stream import MapStream, MapStreamError, iter_squares, read_square, write_map_json
+import map_editor
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestMapStream(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(MAP_FILE) as f:
+            self.map_data = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_iter_squares_matches_json(self):
+        squares = {str(pos): sq for pos, sq in iter_squares(MAP_FILE)}
+        self.assertEqual(squares, self.map_data['squares'])
+
+    @patch('map_stream.CHUNK_SIZE', 7)
+    def test_offsets_survive_chunk_boundaries_and_utf8(self):
+        data = {'map_size': 3, 'squares': {
+            '1': {'square_type': 'Go', 'name': 'Go'},
+            '2': {'square_type': 'Property', 'name': '中环 Central', 'price': 800, 'rent': 90, 'owner': None},
+            '3': {'square_type': 'Property', 'name': '湾仔', 'price': 12345678, 'rent': 65, 'owner': None},
+        }}
+        path = self.write('utf8.map', json.dumps(data, ensure_ascii=False, indent=4))
+        with open(path, 'rb') as f:
+            stream = MapStream(f)
+            self.assertEqual(stream.header, {'map_size': 3})
+            entries = list(stream.squares())
+            with open(path, 'rb') as reader:
+                for pos, square, offset in entries:
+                    self.assertEqual(square, data['squares'][str(pos)])
+                    self.assertEqual(read_square(reader, offset), square)
+
+    def test_fields_after_squares(self):
+        path = self.write('late.map', '{"squares": {"1": {"square_type": "Go", "name": "Go"}}, "map_size": 8}')
+        with open(path, 'rb') as f:
+            stream = MapStream(f)
+            self.assertEqual(stream.header, {})
+            self.assertEqual(len(list(stream.squares())), 1)
+            self.assertEqual(stream.header, {'map_size': 8})
+        self.assertEqual(map_editor.MapData.from_stream(path).map_size, 8)
+
+    def test_invalid_json(self):
+        path = self.write('broken.map', '{"map_size": 8, "squares": {"1": {"square_type": "Go"')
+        with self.assertRaises(MapStreamError):
+            list(iter_squares(path))
+
+    def test_write_map_json(self):
+        out = io.StringIO()
+        write_map_json(20, ((int(pos), sq) for pos, sq in self.map_data['squares'].items()), out)
+        self.assertEqual(json.loads(out.getvalue()), self.map_data)
+
+
+@patch('map_editor.display')
+class TestStreamedMap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.directory, 'board.map')
+        shutil.copy(MAP_FILE, self.map_file)
+        with open(MAP_FILE) as f:
+            self.map_data = json.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reads_only_as_far_as_needed(self, mock_display):
+        map_data = map_editor.load_map(self.map_file, streaming=True)
+        self.assertIsInstance(map_data.squares, map_editor.StreamedSquares)
+        self.assertEqual(map_data.map_size, 20)
+        self.assertEqual(map_data.get_square(2).name, 'Central')
+        self.assertEqual(len(map_data.squares.offsets), 2)
+        self.assertFalse(map_data.squares.complete)
+        self.assertEqual(map_data.get_square(20).name, 'Tai O')
+        self.assertEqual(map_data.validate_map(), [])
+        self.assertTrue(map_data.squares.complete)
+        map_data.squares.close()
+
+    def test_cache_is_bounded(self, mock_display):
+        map_data = map_editor.MapData.from_stream(self.map_file)
+        map_data.squares.cache_size = 5
+        names = [map_data.get_square(pos).name for pos in range(1, 21)]
+        self.assertEqual(len(map_data.squares.cache), 5)
+        self.assertEqual(names[1], 'Central')
+        # evicted squares are read again from their recorded offset
+        self.assertEqual(map_data.get_square(2).name, 'Central')
+        map_data.squares.close()
+
+    def test_edit_and_save_over_source(self, mock_display):
+        map_data = map_editor.load_map(self.map_file, streaming=True)
+        map_data.edit_square(3, map_editor.PropertySquare('Admiralty', 900, 95))
+        map_editor.save_map(map_data, self.map_file)
+        with open(self.map_file) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['squares']['3']['name'], 'Admiralty')
+        self.assertEqual(saved['squares']['2'], self.map_data['squares']['2'])
+        self.assertEqual(len(saved['squares']), 20)
+        map_data.squares.close()
+
+    def test_hand_edited_map_compiles_unchanged(self, mock_display):
+        squares = self.map_data['squares']
+        squares['2']['price'] = None
+        squares['3']['rent'] = None
+        del squares['5']['price']
+        del squares['7']['rent']
+        with open(self.map_file, 'w') as f:
+            json.dump(self.map_data, f)
+        board_file = os.path.join(self.directory, 'board.board')
+        convert_map_to_board(self.map_file, board_file)
+        with BoardFile(board_file) as board:
+            self.assertEqual(board.to_dict(), self.map_data)
+
+        compiled = map_editor.load_map(board_file)
+        self.assertIsInstance(compiled.squares, map_editor.BoardFileSquares)
+        self.assertIsNone(compiled.get_square(2).price)
+        self.assertIsNone(compiled.get_square(3).rent)
+        self.assertEqual(compiled.get_square(3).price, 700)
+        self.assertEqual(compiled.to_dict(), self.map_data)
+        streamed = map_editor.load_map(self.map_file, streaming=True)
+        self.assertEqual(streamed.to_dict(), compiled.to_dict())
+        compiled.squares.close()
+        streamed.squares.close()
+
+    def test_save_twice_over_source(self, mock_display):
+        map_data = map_editor.load_map(self.map_file, streaming=True)
+        map_data.edit_square(3, map_editor.PropertySquare('Admiralty', 900, 95))
+        map_editor.save_map(map_data, self.map_file)
+        map_editor.save_map(map_data, self.map_file)
+        with open(self.map_file) as f:
+            saved = json.load(f)
+        self.assertEqual(len(saved['squares']), 20)
+        self.assertEqual(saved['squares']['2'], self.map_data['squares']['2'])
+        # the squares still read by position come from the file that was loaded
+        map_data.squares.cache.clear()
+        self.assertEqual(map_data.get_square(20).name, 'Tai O')
+        map_data.squares.close()
+        self.assertEqual(len(map_editor.load_map(self.map_file).squares), 20)
+
+    def test_editor_closes_the_maps_it_opens(self, mock_display):
+        answers = ['3', self.map_file, '4']
+        with patch('map_editor.STREAMING_MIN_BYTES', 100), \
+                patch('map_editor.prompt', side_effect=answers), \
+                patch('map_editor.analyze_map', side_effect=ImportError("no numpy")), \
+                patch.object(map_editor.StreamedSquares, 'close', autospec=True) as close:
+            map_editor.main_menu()
+        self.assertTrue(close.called)
+        close.call_args.args[0].read_file.close()
+
+    def test_counted_once_then_updated_by_edits(self, mock_display):
+        map_data = map_editor.MapData.from_stream(self.map_file)
+        self.assertIsNone(map_data.type_counts)
+        self.assertEqual(map_data.validate_map(), [])
+        self.assertEqual(map_data.type_counts['Go'], 1)
+        map_data.edit_square(2, map_editor.PropertySquare('Wan Chai', 700, 65))
+        self.assertEqual(map_data.validate_map(),
+                         ["Duplicate property names found. Each property must have a unique name."])
+        self.assertEqual(map_data.property_names['Wan Chai'], 2)
+        map_data.squares.close()
+
+    def test_large_maps_stream_by_default(self, mock_display):
+        with patch('map_editor.STREAMING_MIN_BYTES', 100):
+            map_data = map_editor.load_map(self.map_file)
+        self.assertIsInstance(map_data.squares, map_editor.StreamedSquares)
+        map_data.squares.close()
+        self.assertIsInstance(map_editor.load_map(self.map_file).squares, dict)
+
+    @patch('map_editor.prompt', side_effect=['', 'q'])
+    def test_summary_is_paged(self, mock_prompt, mock_display):
+        map_data = map_editor.MapData.from_stream(self.map_file)
+        map_editor.display_map_summary(map_data, page_size=6)
+        self.assertEqual(mock_prompt.call_count, 2)
+        shown = [call.args[0] for call in mock_display.call_args_list if call.args[0].startswith('Square')]
+        self.assertEqual(len(shown), 12)
+        # the stream never went past the squares on the pages shown
+        self.assertEqual(len(map_data.squares.offsets), 12)
+        map_data.squares.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
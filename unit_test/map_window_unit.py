@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import view
+from view import GameView
+from view_sink import NullSink
+from board_file import BoardFile, write_board
+from map_generator import MapSpec, generate_squares
+from map_window import MapWindow, square_line
+from model import RecordTable, Square, BoardSquares
+
+
+def generated_squares(size):
+    return {str(pos): sq for pos, sq in generate_squares(MapSpec(size, seed=3))}
+
+
+class RecordingSink(NullSink):
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event, lines, fields):
+        self.events.append((event, lines, fields))
+
+
+class TestMapWindow(unittest.TestCase):
+    def setUp(self):
+        self.squares = RecordTable.from_dict(generated_squares(1000), Square)
+        self.window = MapWindow(self.squares)
+
+    def test_page_around_position(self):
+        start = self.window.page_start(self.window.positions, 500)
+        lines, entries = self.window.page(self.window.positions, start)
+        self.assertEqual(len(lines), self.window.page_size)
+        self.assertEqual([e['position'] for e in entries], list(range(490, 510)))
+        self.assertEqual(lines[10], square_line(500, self.squares[500]))
+
+    def test_page_is_kept_on_the_board(self):
+        positions = self.window.positions
+        self.assertEqual(self.window.page_start(positions, 1), 0)
+        self.assertEqual(self.window.page_start(positions, 1000), 1000 - self.window.page_size)
+
+    def test_only_changed_owners_are_formatted_again(self):
+        positions = self.window.positions
+        self.window.page(positions, 0)
+        self.assertEqual(self.window.formatted, 20)
+        self.window.page(positions, 0)
+        self.assertEqual(self.window.formatted, 20)
+        pos = self.window.of_type('Property')[0]
+        self.squares[pos]['owner'] = 'Alan'
+        lines, entries = self.window.page(positions, self.window.page_start(positions, pos))
+        self.assertIn(f"Position {pos}: {self.squares[pos]['name']} (Property, owned by Alan)", lines)
+        self.assertEqual(entries[lines.index(square_line(pos, self.squares[pos]))]['owner'], 'Alan')
+
+    def test_filters(self):
+        chances = self.window.of_type('chance')
+        self.assertTrue(chances)
+        self.assertTrue(all(self.squares[pos]['square_type'] == 'Chance' for pos in chances))
+        properties = self.window.of_type('Property')
+        for pos in properties[:3]:
+            self.squares[pos]['owner'] = 'Ben'
+        self.assertEqual(self.window.owned_by('ben'), properties[:3])
+        self.assertEqual(self.window.owned_by('Cat'), [])
+
+    def test_plain_dict_squares(self):
+        window = MapWindow({'1': {'name': 'Go', 'square_type': 'Go'}})
+        self.assertEqual(window.page(window.positions, 0)[0], ["Position 1: Go (Go)"])
+
+
+class TestBoardMapWindow(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        board_file = os.path.join(self.directory, 'big.board')
+        write_board({'map_size': 500, 'squares': generated_squares(500)}, board_file)
+        self.board = BoardFile(board_file)
+        self.squares = BoardSquares(self.board)
+
+    def tearDown(self):
+        self.board.close()
+        shutil.rmtree(self.directory)
+
+    def test_filters_read_the_board_columns(self):
+        window = MapWindow(self.squares)
+        properties = window.of_type('property')
+        self.assertEqual(properties, list(self.board.positions_of('Property')))
+        self.assertEqual(self.squares.loaded, {})
+        self.squares[properties[1]]['owner'] = 'Alan'
+        self.assertEqual(window.owned_by('Alan'), [properties[1]])
+
+    def test_page_reads_only_its_squares(self):
+        window = MapWindow(self.squares)
+        window.page(window.positions, window.page_start(window.positions, 250))
+        self.assertEqual(len(self.squares.loaded), window.page_size)
+
+
+class TestShowMap(unittest.TestCase):
+    def setUp(self):
+        self.sink = RecordingSink()
+        previous = view.set_sink(self.sink)
+        self.addCleanup(view.set_sink, previous)
+        self.squares = RecordTable.from_dict(generated_squares(200), Square)
+
+    def shown(self):
+        return [fields for event, lines, fields in self.sink.events if event == 'map']
+
+    @patch('builtins.input', side_effect=AssertionError("asked for input"))
+    def test_small_board_is_shown_whole(self, mock_input):
+        squares = RecordTable.from_dict(generated_squares(20), Square)
+        GameView.show_map(squares, 7)
+        self.assertEqual(len(self.shown()[0]['squares']), 20)
+
+    @patch('builtins.input', side_effect=['n', 'p', '150', '/chance', ''])
+    def test_paging_jumping_and_filtering(self, mock_input):
+        GameView.show_map(self.squares, 40)
+        pages = [[entry['position'] for entry in fields['squares']] for fields in self.shown()]
+        self.assertEqual(pages[0], list(range(30, 50)))
+        self.assertEqual(pages[1], list(range(50, 70)))
+        self.assertEqual(pages[2], list(range(30, 50)))
+        self.assertEqual(pages[3], list(range(140, 160)))
+        self.assertTrue(all(self.squares[pos]['square_type'] == 'Chance' for pos in pages[4]))
+
+    @patch('builtins.input', side_effect=['@Nobody', 'x', ''])
+    def test_bad_input(self, mock_input):
+        GameView.show_map(self.squares, 1)
+        events = [event for event, lines, fields in self.sink.events]
+        self.assertEqual(events, ['map', 'invalid_input', 'invalid_input'])
+
+    @patch('builtins.input', side_effect=['', ''])
+    def test_lines_are_kept_between_calls(self, mock_input):
+        GameView.show_map(self.squares, 1)
+        window = view._map_window
+        GameView.show_map(self.squares, 1)
+        self.assertIs(view._map_window, window)
+        self.assertEqual(window.formatted, window.page_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
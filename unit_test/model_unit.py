@@ -1,8 +1,12 @@
 import unittest
 import os
 import json
+import tempfile
 from unittest.mock import patch, mock_open
-from model import GameState
+import random
+import time
+from save_format import decode_binary
+from model import GameState, BoardIndex, OwnershipLedger, RecordTable, Player, Square, ForkedSquares, MAX_FORK_DEPTH
 
 
 class TestGameState(unittest.TestCase):
@@ -33,25 +37,26 @@ class TestGameState(unittest.TestCase):
         self.assertEqual(self.game_state.players_num, 1)
         self.assertEqual(self.game_state.round_num, 1)
 
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("os.makedirs")
-    def test_save_game(self, mock_makedirs, mock_file):
+    def test_save_game(self):
         self.game_state.map_size = 10
         self.game_state.squares = self.map_data['squares']
         self.game_state.players = {
             '1': {'name': 'Alice', 'cash': 1500, 'position': 1, 'in_jail': False, 'jail_turns': 0, 'bankrupt': False, 'properties': []}
         }
         self.game_state.round_num = 1
-        self.game_state.save_game()
-
-        mock_file.assert_called_with('save/save_round_1.save', 'w')
-        handle = mock_file()
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                self.assertEqual(self.game_state.save_game(durable=True), 'save/save_round_1.save')
+                with open('save/save_round_1.save') as f:
+                    written_data = json.load(f)
+                self.assertEqual(sorted(os.listdir('save')), ['catalog.jsonl', 'save_round_1.save'])
+                # nothing changed since, so the second save is skipped
+                self.assertIsNone(self.game_state.save_game(durable=True))
+            finally:
+                os.chdir(cwd)
 
-        # Retrieve all write calls and concatenate their arguments
-        written_content = ''.join(call.args[0] for call in handle.write.call_args_list)
-
-        # Compare the deserialized objects
-        written_data = json.loads(written_content)
         expected_data = {
             'map_size': 10,
             'squares': self.map_data['squares'],
@@ -61,10 +66,58 @@ class TestGameState(unittest.TestCase):
 
         self.assertEqual(written_data, expected_data)
 
+    def test_only_changes_make_a_new_save(self):
+        self.game_state.setup_from_map_data(self.map_data, self.player_names)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                self.assertIsNotNone(self.game_state.save_game(durable=True))
+                # an unchanged game is not even serialized again
+                with patch.object(GameState, 'save_data') as save_data:
+                    self.assertIsNone(self.game_state.save_game(durable=True))
+                save_data.assert_not_called()
+                self.game_state.update_player_position('2', 5)
+                self.assertIsNotNone(self.game_state.save_game(durable=True))
+                self.game_state.players['1']['cash'] = 7
+                self.game_state.mark_changed()
+                self.assertIsNotNone(self.game_state.save_game(durable=True))
+                # the same game in the other format is a new save
+                self.game_state.save_format = 'binary'
+                self.assertIsNotNone(self.game_state.save_game(durable=True))
+                with open('save/save_round_1.save', 'rb') as f:
+                    self.assertEqual(decode_binary(f.read())['players']['1']['cash'], 7)
+            finally:
+                os.chdir(cwd)
+
+    def test_failed_save_is_not_taken_as_the_last_save(self):
+        self.game_state.setup_from_map_data(self.map_data, self.player_names)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                self.game_state.save_game(durable=True)
+                self.game_state.update_player_cash('1', 100)
+                with patch("save_writer.write_atomic", side_effect=OSError("disk full")):
+                    with self.assertRaises(OSError):
+                        self.game_state.save_game(durable=True)
+                # the file on disk is still the earlier game, so this save is written
+                self.assertEqual(self.game_state.save_game(durable=True), 'save/save_round_1.save')
+                with open('save/save_round_1.save') as f:
+                    self.assertEqual(json.load(f)['players']['1']['cash'], self.game_state.players['1']['cash'])
+            finally:
+                os.chdir(cwd)
+
     def test_save_game_creates_directory(self):
-        with patch("os.makedirs") as mock_makedirs, patch("builtins.open", mock_open()) as mock_file:
-            self.game_state.save_game()
-            mock_makedirs.assert_called_once_with('save')
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                with patch("os.makedirs", wraps=os.makedirs) as mock_makedirs:
+                    self.game_state.save_game(durable=True)
+                    mock_makedirs.assert_called_once_with('save')
+            finally:
+                os.chdir(cwd)
 
     @patch("builtins.open", new_callable=mock_open)
     def test_setup_new_game(self, mock_file):
@@ -118,6 +171,38 @@ class TestGameState(unittest.TestCase):
         winners = self.game_state.get_winners()
         self.assertCountEqual(winners, ['Alice', 'Bob'])
 
+    def test_tied_seats_with_the_same_name(self):
+        self.game_state.players = {
+            '1': {'name': 'Bot', 'cash': 2000},
+            '2': {'name': 'Bot', 'cash': 2000},
+            '3': {'name': 'Bot', 'cash': 100}
+        }
+        self.assertEqual(self.game_state.get_winner_seats(), [1, 2])
+        self.assertEqual(self.game_state.get_winners(), ['Bot', 'Bot'])
+
+    @patch("builtins.open", new_callable=mock_open)
+    def test_declare_bankrupt_updates_active_seats(self, mock_file):
+        mock_file().read.return_value = json.dumps(self.map_data)
+        self.game_state.setup_new_game('dummy_map_file.map', ["Alice", "Bob", "Carol"])
+        self.assertEqual(self.game_state.turn_order(), [1, 2, 3])
+        self.game_state.declare_bankrupt(2)
+        self.assertTrue(self.game_state.players[2]['bankrupt'])
+        self.assertEqual(self.game_state.turn_order(), [1, 3])
+        self.assertFalse(self.game_state.is_game_over())
+        self.game_state.declare_bankrupt(3)
+        self.assertTrue(self.game_state.is_game_over())
+
+    def test_load_game_restores_active_seats(self):
+        self.game_state.load_game('save/example_save.save')
+        self.assertEqual(self.game_state.active_seats, {1, 2})
+
+    def test_get_winners_single(self):
+        self.game_state.players = {
+            '1': {'name': 'Alice', 'cash': -20},
+            '2': {'name': 'Bob', 'cash': 900}
+        }
+        self.assertEqual(self.game_state.get_winners(), ['Bob'])
+
     def test_load_game_invalid_file(self):
         with patch("builtins.open", side_effect=FileNotFoundError):
             with self.assertRaises(FileNotFoundError):
@@ -129,5 +214,292 @@ class TestGameState(unittest.TestCase):
                 self.game_state.setup_new_game("invalid_map.map", self.player_names)
 
 
+class TestBoardIndex(unittest.TestCase):
+    def setUp(self):
+        self.squares = {
+            '1': {'square_type': 'Go', 'name': 'Go'},
+            '2': {'square_type': 'Property', 'name': 'Park Place', 'price': 350, 'rent': 35, 'owner': None},
+            '3': {'square_type': 'Go to Jail', 'name': 'Go to Jail'},
+            '4': {'square_type': 'Chance', 'name': 'Chance'},
+            '5': {'square_type': 'In Jail/Just Visiting', 'name': 'In Jail/Just Visiting'},
+            '6': {'square_type': 'Chance', 'name': 'Chance'},
+            '7': {'square_type': 'Free Parking', 'name': 'Free Parking'},
+            '8': {'square_type': 'Property', 'name': 'Boardwalk', 'price': 400, 'rent': 50, 'owner': None},
+        }
+        self.index = BoardIndex(self.squares, 8)
+
+    def test_positions(self):
+        self.assertEqual(self.index.jail_position, 5)
+        self.assertEqual(self.index.go_position, 1)
+        self.assertEqual(self.index.property_positions['Boardwalk'], 8)
+        self.assertEqual(self.index.positions_of('Chance'), (4, 6))
+        self.assertEqual(self.index.positions_of('Income Tax'), ())
+
+    def test_move_matches_modular_arithmetic(self):
+        for position in range(1, 9):
+            for steps in range(2, 9):
+                new_position = (position + steps - 1) % 8 + 1
+                passed_go = position + steps > 8 and new_position != 1
+                self.assertEqual(self.index.move(position, steps), (new_position, passed_go))
+
+    def test_index_is_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.index.jail_position = 3
+        with self.assertRaises(TypeError):
+            self.index.property_positions['Central'] = 2
+
+    @patch("builtins.open", new_callable=mock_open)
+    def test_setup_new_game_builds_index(self, mock_file):
+        mock_file().read.return_value = json.dumps({'map_size': 8, 'squares': self.squares})
+        game_state = GameState()
+        game_state.setup_new_game('dummy_map_file.map', ["Alice", "Bob"])
+        self.assertEqual(game_state.board_index.jail_position, 5)
+
+
+class TestOwnershipLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = OwnershipLedger()
+
+    def test_acquire_and_release(self):
+        self.ledger.acquire(2, 1)
+        self.ledger.acquire(5, 1)
+        self.ledger.acquire(7, 2)
+        self.assertEqual(self.ledger.owner_of(5), 1)
+        self.assertIsNone(self.ledger.owner_of(3))
+        self.assertEqual(self.ledger.release_all(1), [2, 5])
+        self.assertIsNone(self.ledger.owner_of(2))
+        self.assertEqual(self.ledger.positions_of(1), set())
+        self.assertEqual(self.ledger.positions_of(2), {7})
+
+    def test_acquire_moves_ownership(self):
+        self.ledger.acquire(2, 1)
+        self.ledger.acquire(2, 2)
+        self.assertEqual(self.ledger.positions_of(1), set())
+        self.assertEqual(self.ledger.owner_of(2), 2)
+
+    def test_fork_layers_changes(self):
+        self.ledger.acquire(2, 1)
+        self.ledger.acquire(5, 1)
+        child = self.ledger.fork()
+        child.acquire(5, 2)
+        child.acquire(7, 2)
+        self.assertEqual(child.owners, {5: 2, 7: 2})
+        self.assertEqual(child.positions_of(1), {2})
+        self.assertEqual(child.positions_of(2), {5, 7})
+        self.assertEqual(child.release_all(2), [5, 7])
+        self.assertIsNone(child.owner_of(5))
+        self.ledger.release_all(1)
+        self.assertEqual(child.owner_of(2), 1)
+        self.assertEqual(self.ledger.positions_of(1), set())
+        self.assertIsNone(self.ledger.owner_of(7))
+
+    def test_layers_are_merged_on_a_ledger_forked_every_turn(self):
+        forks = []
+        for turn in range(MAX_FORK_DEPTH * 2):
+            self.ledger.acquire(turn % 5, turn)
+            forks.append((turn, self.ledger.fork()))
+            self.assertLessEqual(self.ledger.depth, MAX_FORK_DEPTH + 1)
+        for turn, child in forks[-5:]:
+            self.assertEqual(child.owner_of(turn % 5), turn)
+            self.assertEqual(child.positions_of(turn), {turn % 5})
+
+    def test_purchase_after_a_fork_does_not_grow_with_holdings(self):
+        def purchase_time(owned):
+            ledger = OwnershipLedger()
+            for position in range(owned):
+                ledger.acquire(position, position % 4)
+            best = None
+            for _ in range(5):
+                child = ledger.fork()
+                start = time.perf_counter()
+                child.acquire(owned, 1)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        # copying the ledger would take several milliseconds here
+        small, large = purchase_time(10), purchase_time(100000)
+        self.assertLess(large, small * 5 + 50e-6)
+
+    def test_from_squares_prefers_owner_id(self):
+        squares = {
+            '2': {'square_type': 'Property', 'name': 'A', 'owner': 'Bob', 'owner_id': 3},
+            '3': {'square_type': 'Property', 'name': 'B', 'owner': 'Bob'},
+            '4': {'square_type': 'Property', 'name': 'C', 'owner': ''},
+        }
+        players = {'1': {'name': 'Alice'}, '2': {'name': 'Bob'}, '3': {'name': 'Bob'}}
+        ledger = OwnershipLedger.from_squares(squares, players)
+        self.assertEqual(ledger.owner_of(2), 3)
+        self.assertEqual(ledger.owner_of(3), 2)
+        self.assertIsNone(ledger.owner_of(4))
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState()
+
+    def test_player_dict_access(self):
+        player = Player("Alice")
+        player['cash'] -= 200
+        self.assertEqual(player.cash, 1300)
+        self.assertEqual(player.get('properties'), [])
+        self.assertIsNone(player.get('unknown'))
+        with self.assertRaises(KeyError):
+            player['unknown'] = 1
+
+    def test_square_keeps_json_shape(self):
+        data = {'square_type': 'Chance', 'name': 'Chance'}
+        square = Square.from_dict(data)
+        self.assertEqual(square.to_dict(), data)
+        self.assertNotIn('owner', square)
+        with self.assertRaises(KeyError):
+            square['price']
+
+    def test_player_from_old_save_gets_properties(self):
+        player = Player.from_dict({'name': 'Bob', 'cash': 10, 'position': 3, 'in_jail': False,
+                                   'jail_turns': 0, 'bankrupt': False})
+        self.assertEqual(player.properties, [])
+
+    def test_record_table_int_and_str_keys(self):
+        table = RecordTable.from_dict({'1': {'name': 'Alice'}, '2': {'name': 'Bob'}}, Player)
+        self.assertIs(table[2], table['2'])
+        self.assertIn('1', table)
+        self.assertNotIn(3, table)
+        self.assertEqual(table.keys(), ['1', '2'])
+        self.assertEqual(len(table), 2)
+        with self.assertRaises(KeyError):
+            table[0]
+        with self.assertRaises(KeyError):
+            table['x']
+
+    def test_example_save_round_trip(self):
+        with open('save/example_save.save', 'r') as f:
+            data = json.load(f)
+        self.game_state.load_game('save/example_save.save')
+        self.assertEqual(self.game_state.squares.to_dict(), data['squares'])
+        self.assertEqual(self.game_state.players[1].name, 'Player 1')
+
+
+class TestFork(unittest.TestCase):
+    def setUp(self):
+        self.game_state = GameState()
+        self.game_state.setup_new_game('map/default_board.map', ["Alice", "Bob"])
+        self.property_position = self.game_state.board_index.property_positions['Central']
+
+    def buy(self, state, player_id, position):
+        square = state.squares.writable(position)
+        player = state.players[player_id]
+        player['cash'] -= square['price']
+        state.ownership.acquire(position, player_id)
+        square['owner'] = player['name']
+        square['owner_id'] = player_id
+        player['properties'].append(square['name'])
+
+    def test_child_changes_stay_in_the_child(self):
+        before = self.game_state.save_data()
+        child = self.game_state.fork()
+        self.buy(child, 1, self.property_position)
+        child.update_round_num(5)
+        self.assertEqual(self.game_state.save_data(), before)
+        self.assertIsNone(self.game_state.ownership.owner_of(self.property_position))
+        self.assertEqual(child.ownership.owner_of(self.property_position), 1)
+        self.assertEqual(child.squares[self.property_position]['owner'], "Alice")
+        self.assertEqual(child.players[1]['properties'], ['Central'])
+
+    def test_parent_changes_do_not_reach_the_child(self):
+        child = self.game_state.fork()
+        self.buy(self.game_state, 2, self.property_position)
+        self.game_state.declare_bankrupt(1)
+        self.assertIsNone(child.squares[self.property_position].get('owner'))
+        self.assertEqual(child.players[2]['cash'], 1500)
+        self.assertEqual(child.active_seats, {1, 2})
+        self.assertEqual(self.game_state.ownership.positions_of(2), {self.property_position})
+        self.assertEqual(child.ownership.positions_of(2), set())
+
+    def test_siblings_and_grandchildren_are_independent(self):
+        first = self.game_state.fork()
+        second = self.game_state.fork()
+        self.buy(first, 1, self.property_position)
+        grandchild = first.fork()
+        grandchild.squares.writable(self.property_position)['owner'] = "Bob"
+        self.assertEqual(first.squares[self.property_position]['owner'], "Alice")
+        self.assertIsNone(second.squares[self.property_position].get('owner'))
+        self.assertEqual(grandchild.ownership.owner_of(self.property_position), 1)
+
+    def test_fork_shares_the_board(self):
+        board = self.game_state.squares
+        child = self.game_state.fork()
+        self.assertIsInstance(child.squares, ForkedSquares)
+        self.assertIs(child.squares.parent, board)
+        self.assertEqual(child.squares.own, {})
+        self.assertIs(child.board_index, self.game_state.board_index)
+        self.assertIs(child.ownership.parent, self.game_state.ownership.parent)
+        # reads hand out the shared record; only a write copies it
+        self.assertIs(child.squares[self.property_position], board[self.property_position])
+        self.assertIsNot(child.squares.writable(self.property_position), board[self.property_position])
+        self.assertEqual(list(child.squares.own), [self.property_position])
+        # forking again without changes shares the same layer
+        self.assertIs(self.game_state.fork().squares.parent, self.game_state.fork().squares.parent)
+        self.assertEqual(child.squares, self.game_state.squares)
+        self.assertEqual(len(child.squares), 20)
+
+    def test_writes_after_a_fork_copy_the_frozen_record(self):
+        self.buy(self.game_state, 1, self.property_position)
+        read = self.game_state.squares[self.property_position]
+        child = self.game_state.fork()
+        self.game_state.squares.writable(self.property_position)['owner'] = "Bob"
+        self.assertEqual(read['owner'], "Alice")
+        self.assertEqual(child.squares[self.property_position]['owner'], "Alice")
+        self.assertEqual(self.game_state.squares[self.property_position]['owner'], "Bob")
+
+    def test_layers_are_merged_on_a_state_forked_every_turn(self):
+        positions = list(self.game_state.board_index.property_positions.values())
+        children = []
+        for turn in range(MAX_FORK_DEPTH * 2):
+            position = positions[turn % len(positions)]
+            self.game_state.squares.writable(position)['rent'] = turn
+            children.append((turn, position, self.game_state.fork()))
+            self.assertLessEqual(self.game_state.squares.depth, MAX_FORK_DEPTH + 1)
+        for turn, position, child in children[-len(positions):]:
+            self.assertEqual(child.squares[position]['rent'], turn)
+        self.assertEqual(self.game_state.squares, children[-1][2].squares)
+
+    def test_fork_time_does_not_grow_with_the_board(self):
+        def fork_time(size):
+            state = GameState()
+            squares = {str(pos): {'square_type': 'Property', 'name': f"P{pos}", 'price': 100, 'rent': 10, 'owner': None}
+                       for pos in range(1, size + 1)}
+            state.setup_from_map_data({'map_size': size, 'squares': squares}, ["Alice", "Bob"])
+            state.fork()
+            best = None
+            for turn in range(5):
+                # the state has changed a fifth of its board since the last fork
+                for pos in range(1 + turn, size + 1, 5):
+                    state.squares.writable(pos)['owner_id'] = 1
+                start = time.perf_counter()
+                state.fork()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        # copying the changed records would take about half a millisecond here
+        small, large = fork_time(100), fork_time(100000)
+        self.assertLess(large, small * 5 + 150e-6)
+
+    def test_forked_game_plays_and_saves(self):
+        from controller import GameController
+        from simulator import HeadlessGameView, AlwaysBuyPolicy
+        before = self.game_state.save_data()
+        child = self.game_state.fork()
+        game_view = HeadlessGameView(child, [AlwaysBuyPolicy()] * 2, random.Random(4))
+        GameController(child, type('HeadlessView', (), {'GameView': game_view})).game_loop()
+        self.assertTrue(game_view.winners)
+        self.assertEqual(self.game_state.save_data(), before)
+        data = child.save_data()
+        owned = {int(pos) for pos, sq in data['squares'].items() if sq.get('owner_id') is not None}
+        positions = range(1, child.map_size + 1)
+        self.assertEqual(owned, {pos for pos in positions if child.ownership.owner_of(pos) is not None})
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from save_catalog import record_save, read_catalog, list_saves, find_entry, catalog_path, CATALOG_FILE
+from model import GameState
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestSaveCatalog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def add_save(self, name, round_num, players, map_id='default_board.map', timestamp=0.0):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write('{}')
+        record_save(path, {'round_num': round_num, 'players': players, 'map_id': map_id,
+                           'timestamp': timestamp, 'size': 2})
+
+    def test_later_entry_replaces_earlier(self):
+        self.add_save('a.save', 1, ['Alan'])
+        self.add_save('a.save', 2, ['Alan'])
+        entries, lines = read_catalog(self.directory)
+        self.assertEqual(lines, 2)
+        self.assertEqual(entries['a.save']['round_num'], 2)
+
+    def test_list_sorts_and_filters(self):
+        self.add_save('a.save', 5, ['Alan', 'Ben'], timestamp=10.0)
+        self.add_save('b.save', 9, ['Cat'], map_id='small.map', timestamp=30.0)
+        self.add_save('c.save', 1, ['Ben'], timestamp=20.0)
+        self.assertEqual([e['file'] for e in list_saves(self.directory)], ['b.save', 'c.save', 'a.save'])
+        self.assertEqual([e['file'] for e in list_saves(self.directory, sort_by='round_num', reverse=False)],
+                         ['c.save', 'a.save', 'b.save'])
+        self.assertEqual([e['file'] for e in list_saves(self.directory, player='Ben')], ['c.save', 'a.save'])
+        self.assertEqual([e['file'] for e in list_saves(self.directory, map_id='small.map')], ['b.save'])
+        self.assertEqual([e['file'] for e in list_saves(self.directory, text='cat')], ['b.save'])
+        with self.assertRaises(ValueError):
+            list_saves(self.directory, sort_by='players')
+
+    def test_listing_never_opens_saves(self):
+        self.add_save('a.save', 3, ['Alan'])
+        with open(os.path.join(self.directory, 'legacy.save'), 'w') as f:
+            f.write('{"map_size": 1}')
+        catalog = catalog_path(self.directory)
+        real_open = open
+
+        def only_catalog(path, *args, **kwargs):
+            self.assertEqual(path, catalog)
+            return real_open(path, *args, **kwargs)
+
+        with patch('builtins.open', side_effect=only_catalog):
+            entries = {e['file']: e for e in list_saves(self.directory)}
+        self.assertEqual(set(entries), {'a.save', 'legacy.save'})
+        self.assertEqual(entries['legacy.save']['round_num'], None)
+        self.assertEqual(entries['legacy.save']['size'], 15)
+
+    def test_catalog_is_compacted(self):
+        for i in range(100):
+            self.add_save('a.save', i, ['Alan'])
+        self.add_save('gone.save', 1, ['Ben'])
+        os.remove(os.path.join(self.directory, 'gone.save'))
+        self.assertEqual(len(list_saves(self.directory)), 1)
+        entries, lines = read_catalog(self.directory)
+        self.assertEqual(lines, 1)
+        self.assertEqual(entries['a.save']['round_num'], 99)
+
+    def test_compaction_keeps_saves_recorded_meanwhile(self):
+        # the writer thread records a save after list_saves read the catalog
+        # but before it compacts: that entry must survive the compaction
+        for i in range(100):
+            self.add_save('a.save', i, ['Alan'])
+        real_read = read_catalog
+        calls = []
+
+        def read_then_record(save_dir):
+            result = real_read(save_dir)
+            if not calls:
+                calls.append(save_dir)
+                self.add_save('b.save', 7, ['Ben'])
+            return result
+
+        with patch('save_catalog.read_catalog', side_effect=read_then_record):
+            list_saves(self.directory)
+        entries, lines = read_catalog(self.directory)
+        self.assertEqual(lines, 2)
+        self.assertEqual(entries['b.save']['round_num'], 7)
+
+    def test_save_game_records_metadata(self):
+        cwd = os.getcwd()
+        map_file = os.path.abspath(MAP_FILE)
+        os.chdir(self.directory)
+        try:
+            game_state = GameState()
+            game_state.setup_new_game(map_file, ["Alan", "Ben"])
+            game_state.save_game(durable=True)
+            entry = find_entry('save/save_round_1.save')
+            self.assertEqual(entry['round_num'], 1)
+            self.assertEqual(entry['players'], ["Alan", "Ben"])
+            self.assertEqual(entry['map_id'], 'default_board.map')
+            self.assertEqual(entry['size'], os.path.getsize('save/save_round_1.save'))
+            self.assertEqual(sorted(os.listdir('save')), [CATALOG_FILE, 'save_round_1.save'])
+
+            loaded = GameState()
+            loaded.load_game('save/save_round_1.save')
+            self.assertEqual(loaded.map_id, 'default_board.map')
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
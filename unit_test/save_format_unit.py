@@ -0,0 +1,91 @@
+import unittest
+import json
+import os
+import tempfile
+from save_format import encode_binary, decode_binary, is_binary, SaveFormatError, BINARY_MAGIC
+from model import GameState
+
+
+class TestBinarySaveFormat(unittest.TestCase):
+    def setUp(self):
+        with open('save/example_save.save', 'r') as f:
+            self.data = json.load(f)
+        self.data['round_num'] = 7
+        self.data['squares']['2'].update({'owner': 'Player 2', 'owner_id': 2})
+        self.data['squares']['3']['owner'] = ''
+        self.data['players']['2'].update({'cash': -40, 'in_jail': True, 'jail_turns': 1,
+                                           'bankrupt': True, 'properties': ['Central']})
+        self.data['players']['1']['properties'] = []
+
+    def test_round_trip(self):
+        raw = encode_binary(self.data)
+        self.assertTrue(is_binary(raw))
+        self.assertTrue(raw.startswith(BINARY_MAGIC))
+        self.assertEqual(decode_binary(raw), self.data)
+
+    def test_non_ascii_names(self):
+        self.data['players']['1']['name'] = '玩家1'
+        self.data['squares']['2'].update({'name': 'Café', 'owner': '玩家1'})
+        self.assertEqual(decode_binary(encode_binary(self.data)), self.data)
+
+    def test_missing_price_is_not_zero(self):
+        self.data['squares']['2']['price'] = None
+        self.data['squares']['2']['rent'] = 0
+        self.data['squares']['3']['rent'] = None
+        decoded = decode_binary(encode_binary(self.data))
+        self.assertEqual(decoded, self.data)
+        self.assertIsNone(decoded['squares']['2']['price'])
+        self.assertEqual(decoded['squares']['2']['rent'], 0)
+
+    def test_values_the_columns_cannot_hold(self):
+        for field, change in (('cash', lambda: self.data['players']['1'].update(cash=2 ** 63)),
+                              ('price', lambda: self.data['squares']['2'].update(price=12.5)),
+                              ('player position', lambda: self.data['players']['2'].update(position=-1)),
+                              ('rent', lambda: self.data['squares']['2'].update(rent='35'))):
+            with self.subTest(field=field):
+                self.setUp()
+                change()
+                with self.assertRaisesRegex(ValueError, f"Cannot store {field} "):
+                    encode_binary(self.data)
+
+    def test_version_1_files_still_load(self):
+        raw = bytearray(encode_binary(self.data))
+        raw[len(BINARY_MAGIC):len(BINARY_MAGIC) + 2] = (1).to_bytes(2, 'little')
+        self.assertEqual(decode_binary(bytes(raw)), self.data)
+
+    def test_smaller_than_json(self):
+        self.assertLess(len(encode_binary(self.data)), len(json.dumps(self.data)))
+
+    def test_json_is_not_binary(self):
+        self.assertFalse(is_binary(json.dumps(self.data).encode()))
+        with self.assertRaises(SaveFormatError):
+            decode_binary(json.dumps(self.data).encode())
+
+    def test_truncated_file(self):
+        raw = encode_binary(self.data)
+        with self.assertRaises(SaveFormatError):
+            decode_binary(raw[:len(raw) - 5])
+
+    def test_game_state_saves_and_detects_binary(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            game_state = GameState()
+            game_state.load_game(os.path.join(cwd, 'save/example_save.save'))
+            game_state.players[1].cash = 1234
+            game_state.save_format = 'binary'
+            os.chdir(tmp)
+            try:
+                game_state.save_game(durable=True)
+                with open('save/save_round_1.save', 'rb') as f:
+                    self.assertTrue(is_binary(f.read()))
+                loaded = GameState()
+                loaded.load_game('save/save_round_1.save')
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(loaded.players[1].cash, 1234)
+        self.assertEqual(loaded.squares.to_dict(), game_state.squares.to_dict())
+        self.assertEqual(loaded.active_seats, {1, 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
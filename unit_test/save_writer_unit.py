@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import save_writer
+from save_writer import SaveWriter, write_atomic
+from save_format import decode_binary
+
+
+class TestSaveWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data = {'map_size': 2, 'squares': {'1': {'square_type': 'Go', 'name': 'Go'}},
+                     'players': {}, 'round_num': 3}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_write_atomic_leaves_no_temp_file(self):
+        write_atomic(self.path('a.save'), self.data)
+        write_atomic(self.path('b.save'), self.data, 'binary')
+        self.assertEqual(sorted(os.listdir(self.directory)), ['a.save', 'b.save'])
+        with open(self.path('a.save')) as f:
+            self.assertEqual(json.load(f), self.data)
+        with open(self.path('b.save'), 'rb') as f:
+            self.assertEqual(decode_binary(f.read()), self.data)
+
+    def test_failed_write_keeps_previous_save(self):
+        write_atomic(self.path('a.save'), self.data)
+        with patch('save_writer.os.replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_atomic(self.path('a.save'), dict(self.data, round_num=4))
+        with open(self.path('a.save')) as f:
+            self.assertEqual(json.load(f)['round_num'], 3)
+
+    def blocked_writer(self, writer):
+        # the first submitted save holds the worker until release is set
+        started = threading.Event()
+        release = threading.Event()
+        written = []
+        original = save_writer.write_atomic
+
+        def slow_write(save_file, data, save_format, durable):
+            started.set()
+            release.wait(5)
+            written.append((os.path.basename(save_file), data['round_num']))
+            return original(save_file, data, save_format, durable)
+
+        return started, release, written, patch('save_writer.write_atomic', side_effect=slow_write)
+
+    def test_queued_saves_of_one_file_coalesce(self):
+        writer = SaveWriter()
+        started, release, written, slow = self.blocked_writer(writer)
+        with slow:
+            writer.submit(self.path('first.save'), self.data)
+            started.wait(5)
+            for round_num in range(4, 9):
+                writer.submit(self.path('game.save'), dict(self.data, round_num=round_num))
+            release.set()
+            writer.flush(5)
+        self.assertEqual(written, [('first.save', 3), ('game.save', 8)])
+
+    def test_full_queue_waits_instead_of_dropping(self):
+        writer = SaveWriter(max_pending=2)
+        started, release, written, slow = self.blocked_writer(writer)
+        with slow:
+            writer.submit(self.path('first.save'), self.data)
+            started.wait(5)
+            for i in range(2):
+                writer.submit(self.path(f'{i}.save'), dict(self.data, round_num=i))
+            waiting = threading.Thread(target=writer.submit,
+                                       args=(self.path('2.save'), dict(self.data, round_num=2)))
+            waiting.start()
+            waiting.join(0.2)
+            self.assertTrue(waiting.is_alive())
+            # the same file still coalesces without waiting
+            writer.submit(self.path('1.save'), dict(self.data, round_num=5))
+            release.set()
+            waiting.join(5)
+            writer.flush(5)
+        self.assertEqual(written, [('first.save', 3), ('0.save', 0), ('1.save', 5), ('2.save', 2)])
+
+    def test_flush_reports_write_errors(self):
+        open(self.path('not_a_directory'), 'w').close()
+        writer = SaveWriter()
+        writer.submit(self.path('not_a_directory/x.save'), self.data)
+        with self.assertRaises(OSError):
+            writer.flush(5)
+        writer.flush(5)
+
+    def test_every_failed_save_is_reported(self):
+        writer = SaveWriter()
+
+        def broken_callback(save_file, size):
+            raise RuntimeError("callback failed")
+
+        writer.submit(self.path('a.save'), self.data, on_written=broken_callback)
+        writer.submit(self.path('b.save'), {'round_num': object()})
+        with self.assertRaises(OSError) as caught:
+            writer.flush(5)
+        self.assertIn('a.save', str(caught.exception))
+        self.assertIn('b.save', str(caught.exception))
+        self.assertIsNone(writer.thread)
+        writer.submit(self.path('c.save'), self.data)
+        writer.flush(5)
+        self.assertTrue(os.path.exists(self.path('c.save')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch
+import pickle
+from simulator import (
+    Simulator, HeadlessGameView, AlwaysBuyPolicy, NeverBuyPolicy, CautiousPolicy, run_game,
+    TablePolicy, ReserveBuyer, RentYieldBuyer, BargainBuyer, POLICIES, CASH_BUCKET, CASH_BUCKETS, cash_bucket
+)
+from model import GameState
+from view import GameView
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Simulator(MAP_FILE)
+        self.names = ["Alan", "Ben", "Cat"]
+
+    def test_headless_view_covers_game_view(self):
+        hooks = [name for name in vars(GameView) if not name.startswith('_')]
+        for name in hooks:
+            self.assertTrue(hasattr(HeadlessGameView, name), name)
+
+    @patch('builtins.input', side_effect=AssertionError("headless game asked for input"))
+    @patch('builtins.print', side_effect=AssertionError("headless game printed"))
+    def test_run_game_without_io(self, mock_print, mock_input):
+        result = self.simulator.run_game(self.names, [AlwaysBuyPolicy()] * 3, seed=1)
+        self.assertTrue(result['winners'])
+        self.assertEqual(len(result['cash']), 3)
+
+    def test_same_seed_same_game(self):
+        policies = [AlwaysBuyPolicy(), NeverBuyPolicy(), CautiousPolicy()]
+        first = self.simulator.run_game(self.names, policies, seed=42)
+        second = self.simulator.run_game(self.names, policies, seed=42)
+        self.assertEqual(first, second)
+
+    def test_games_do_not_share_board_state(self):
+        self.simulator.run_game(self.names, [AlwaysBuyPolicy()] * 3, seed=3)
+        owners = [sq.get('owner') for sq in self.simulator.map_data['squares'].values()]
+        self.assertTrue(all(owner is None for owner in owners))
+
+    def test_setup_from_map_data_copies_squares(self):
+        model = GameState()
+        model.setup_from_map_data(self.simulator.map_data, self.names)
+        model.squares['2']['owner'] = "Alan"
+        self.assertIsNone(self.simulator.map_data['squares']['2']['owner'])
+
+    def test_run_game_module_entry_point(self):
+        result = run_game(MAP_FILE, self.names, [NeverBuyPolicy()] * 3, seed=7)
+        self.assertEqual(result['seed'], 7)
+        self.assertLessEqual(result['round_num'], 101)
+
+    def test_policy_count_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.simulator.run_game(self.names, [AlwaysBuyPolicy()], seed=1)
+
+    def test_seats_with_the_same_name_keep_their_policies(self):
+        policies = [SeatPolicy(), SeatPolicy(), SeatPolicy()]
+        self.simulator.run_game(["Bot", "Bot", "Bot"], policies, seed=5)
+        seen = [policy.players for policy in policies]
+        self.assertEqual([len(players) for players in seen], [1, 1, 1])
+        self.assertEqual(len(set.union(*seen)), 3)
+
+
+class SeatPolicy(AlwaysBuyPolicy):
+    # notes which player records it was asked to decide for
+    def __init__(self):
+        self.players = set()
+
+    def want_to_buy(self, player, property_name, property_price):
+        self.players.add(id(player))
+        return True
+
+
+class CountingPolicy(ReserveBuyer):
+    def __init__(self):
+        super().__init__(reserve=200)
+        self.calls = 0
+
+    def should_buy(self, square, cash):
+        self.calls += 1
+        return super().should_buy(square, cash)
+
+
+class TestTablePolicies(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Simulator(MAP_FILE)
+        self.map_data = self.simulator.map_data
+        self.properties = [sq for sq in self.map_data['squares'].values() if sq['square_type'] == 'Property']
+
+    def test_cash_bucket(self):
+        self.assertEqual(cash_bucket(-50), 0)
+        self.assertEqual(cash_bucket(CASH_BUCKET * 3 + 1), 3)
+        self.assertEqual(cash_bucket(10 ** 9), CASH_BUCKETS - 1)
+
+    def test_tables_are_built_once_per_map(self):
+        policy = CountingPolicy()
+        for seed in range(3):
+            self.simulator.run_game(["Alan", "Ben"], [policy, AlwaysBuyPolicy()], seed=seed)
+        self.assertEqual(policy.calls, len(self.properties) * CASH_BUCKETS)
+
+    def test_lookups_match_the_strategy(self):
+        for policy in (ReserveBuyer(), RentYieldBuyer(reserve=100), BargainBuyer()):
+            policy.prepare(self.map_data)
+            for sq in self.properties:
+                for cash in (0, 250, 1000, 1500, 5000):
+                    floor = cash_bucket(cash) * CASH_BUCKET
+                    self.assertEqual(policy.want_to_buy({'cash': cash}, sq['name'], sq['price']),
+                                     policy.should_buy(sq, floor))
+            self.assertEqual(policy.jail_option({'cash': 1500}), 2 if policy.should_pay_fine(1500) else 1)
+
+    def test_unknown_property_is_decided_directly(self):
+        policy = ReserveBuyer(reserve=100)
+        policy.prepare(self.map_data)
+        self.assertTrue(policy.want_to_buy({'cash': 1000}, "Nowhere", 900))
+        self.assertFalse(policy.want_to_buy({'cash': 1000}, "Nowhere", 901))
+
+    def test_default_table_policy_buys_everything(self):
+        policy = TablePolicy()
+        policy.prepare(self.map_data)
+        self.assertTrue(all(all(row) for row in policy.buy_table.values()))
+        self.assertEqual(policy.jail_option({'cash': 1500}), 1)
+
+    def test_pickled_policy_rebuilds_its_tables(self):
+        policy = ReserveBuyer()
+        policy.prepare(self.map_data)
+        copy = pickle.loads(pickle.dumps(policy))
+        self.assertEqual(copy.buy_table, {})
+        copy.prepare(self.map_data)
+        self.assertEqual(copy.buy_table, policy.buy_table)
+
+    def test_every_builtin_policy_plays(self):
+        names = list(POLICIES)
+        policies = [POLICIES[name]() for name in names]
+        first = self.simulator.run_game(names, policies, seed=5)
+        second = self.simulator.run_game(names, policies, seed=5)
+        self.assertEqual(first, second)
+        self.assertTrue(first['winners'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from simulator import AlwaysBuyPolicy, RandomPolicy
+from tournament import game_seed, run_tournament, rerun_game, merge_results
+
+MAP_FILE = 'map/default_board.map'
+
+
+class TestTournament(unittest.TestCase):
+    def setUp(self):
+        self.names = ["Alan", "Ben", "Cat"]
+        self.policies = [AlwaysBuyPolicy(), RandomPolicy(), AlwaysBuyPolicy()]
+
+    def test_game_seed_is_stable_and_distinct(self):
+        self.assertEqual(game_seed(7, 3), game_seed(7, 3))
+        self.assertNotEqual(game_seed(7, 3), game_seed(7, 4))
+        self.assertNotEqual(game_seed(7, 3), game_seed(8, 3))
+
+    def test_pool_matches_single_process(self):
+        single = run_tournament(MAP_FILE, self.names, self.policies, 12, base_seed=1, workers=1)
+        pooled = run_tournament(MAP_FILE, self.names, self.policies, 12, base_seed=1, workers=2, chunk_size=5)
+        self.assertEqual(single, pooled)
+        self.assertEqual([game['index'] for game in pooled['games']], list(range(12)))
+        self.assertAlmostEqual(sum(pooled['wins']), 12)
+
+    def test_rerun_single_game(self):
+        summary = run_tournament(MAP_FILE, self.names, self.policies, 6, base_seed=9, workers=1)
+        replay = rerun_game(MAP_FILE, self.names, self.policies, 9, 4)
+        self.assertEqual(replay, summary['games'][4])
+
+    def test_same_names_are_credited_per_seat(self):
+        named = run_tournament(MAP_FILE, self.names, self.policies, 30, base_seed=2, workers=1)
+        same = run_tournament(MAP_FILE, ["Bot"] * 3, self.policies, 30, base_seed=2, workers=1)
+        self.assertEqual(same['wins'], named['wins'])
+        self.assertEqual([game['winner_seats'] for game in same['games']],
+                         [game['winner_seats'] for game in named['games']])
+        self.assertGreater(sum(same['wins'][1:]), 0)
+
+    def test_merge_results(self):
+        records = [
+            (1, (1, 2), 101, (), (500, 500, 100)),
+            (0, (3,), 40, (1, 2), (-10, -20, 900)),
+        ]
+        summary = merge_results(self.names, 0, records)
+        self.assertEqual(summary['wins'], [0.5, 0.5, 1.0])
+        self.assertEqual(summary['bankruptcies'], [1, 1, 0])
+        self.assertEqual(summary['mean_rounds'], 70.5)
+        self.assertEqual(summary['games'][0]['index'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+import view
+from view import GameView
+from view_sink import ConsoleSink, BufferedSink, NullSink, JsonLinesSink
+
+
+class TestViewSinks(unittest.TestCase):
+    def use(self, sink):
+        previous = view.set_sink(sink)
+        self.addCleanup(view.set_sink, previous)
+        return sink
+
+    @patch('builtins.print')
+    def test_console_is_the_default(self, mock_print):
+        self.assertIsInstance(view._sink, ConsoleSink)
+        GameView.show_player_turn("Alan", 1500, 3, ["Central"], True, 1)
+        mock_print.assert_any_call("\nAlan's turn!")
+        mock_print.assert_any_call("Properties owned: Central")
+        mock_print.assert_any_call("In jail for 1 turns!")
+
+    def test_buffered_sink_writes_at_turn_boundaries(self):
+        out = io.StringIO()
+        self.use(BufferedSink(out))
+        GameView.pay_income_tax(150)
+        GameView.pass_go()
+        self.assertEqual(out.getvalue(), '')
+        GameView.show_player_turn("Ben", 100, 1, [], False, 0)
+        self.assertEqual(out.getvalue(), "You need to pay income tax $150.\n"
+                                         "You passed the starting point and received $1500 salary!\n")
+
+    @patch('builtins.input', return_value='2')
+    def test_buffered_sink_flushes_before_input(self, mock_input):
+        out = io.StringIO()
+        self.use(BufferedSink(out))
+        self.assertEqual(GameView.choose_next_action(), 2)
+        self.assertIn("2. Save and quit", out.getvalue())
+
+    @patch('builtins.print')
+    def test_null_sink(self, mock_print):
+        self.use(NullSink())
+        GameView.show_game_over(["Alan"])
+        GameView.show_map({1: {'name': 'Go', 'square_type': 'Go'}})
+        mock_print.assert_not_called()
+
+    def test_json_lines_sink(self):
+        out = io.StringIO()
+        self.use(JsonLinesSink(out))
+        GameView.pay_rent("Alan", "Ben", 90)
+        GameView.show_map({1: {'name': 'Go', 'square_type': 'Go'}})
+        GameView.show_game_over(["Alan", "Ben"])
+        events = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(events[0], {'event': 'rent', 'player': 'Alan', 'owner': 'Ben', 'rent': 90})
+        self.assertEqual(events[1]['squares'], [{'position': 1, 'name': 'Go', 'square_type': 'Go', 'owner': None}])
+        self.assertEqual(events[2], {'event': 'game_over', 'winners': ['Alan', 'Ben']})
+
+    def test_set_sink_flushes_the_previous_sink(self):
+        out = io.StringIO()
+        self.use(BufferedSink(out))
+        GameView.reach_a_jail()
+        view.set_sink(NullSink())
+        self.assertEqual(out.getvalue(), "You were sent to jail!\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
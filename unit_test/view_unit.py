@@ -34,6 +34,13 @@ class TestMainmenuView(unittest.TestCase):
         result = MainmenuView.choose_save_file()
         self.assertEqual(result, os.path.join('save', 'save1.save'))
 
+    @patch('os.listdir', return_value=['save1.save', 'save2.save'])
+    @patch('builtins.input', side_effect=['/save2', '1'])
+    @patch('builtins.print')
+    def test_choose_save_file_filtered(self, mock_print, mock_input, mock_listdir):
+        result = MainmenuView.choose_save_file()
+        self.assertEqual(result, os.path.join('save', 'save2.save'))
+
     @patch('os.listdir', return_value=[])
     @patch('builtins.print')
     def test_choose_save_file_no_files(self, mock_print, mock_listdir):
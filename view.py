@@ -1,6 +1,11 @@
 import os
 import random
 import string
+import time
+from save_catalog import list_saves, save_matches
+from game_rng import GameRng
+from map_window import MapWindow
+from view_sink import ConsoleSink
 class MainmenuView:
     @staticmethod
     def welcome():
@@ -25,17 +30,22 @@ class MainmenuView:
     def choose_save_file():
         try:
             print("Please select a save file:")
-            saves = os.listdir('save')
+            saves = list_saves('save')
             if not saves:
                 print("No save files available.")
                 return None
-            for i, save in enumerate(saves):
-                print(f"{i+1}. {save}")
+            shown = saves
+            MainmenuView.show_save_list(shown)
             while True:
                 try:
-                    i = int(input("Please enter the file number: ")) - 1
-                    if 0 <= i < len(saves):
-                        file_path = os.path.join('save', saves[i])
+                    choice = input("Please enter the file number (or /text to filter): ").strip()
+                    if choice.startswith('/'):
+                        shown = [save for save in saves if save_matches(save, choice[1:])] if choice[1:] else saves
+                        MainmenuView.show_save_list(shown)
+                        continue
+                    i = int(choice) - 1
+                    if 0 <= i < len(shown):
+                        file_path = os.path.join('save', shown[i]['file'])
                         print(f"You selected {file_path}")
                         return file_path
                     else:
@@ -48,7 +58,25 @@ class MainmenuView:
         except Exception as e:
             print(f"An error occurred: {e}")
             return None
-    
+
+    @staticmethod
+    def show_save_list(saves):
+        if not saves:
+            print("No save files match.")
+        for i, save in enumerate(saves):
+            details = [save['file']]
+            if save['round_num'] is not None:
+                details.append(f"round {save['round_num']}")
+            if save['players']:
+                details.append(', '.join(save['players']))
+            if save['map_id']:
+                details.append(save['map_id'])
+            if save['timestamp'] is not None:
+                details.append(time.strftime('%Y-%m-%d %H:%M', time.localtime(save['timestamp'])))
+            if save['size'] is not None:
+                details.append(f"{save['size'] / 1024:.1f} KiB")
+            print(f"{i+1}. {' | '.join(details)}")
+
     @staticmethod
     def choose_new_game_map():
         try:
@@ -153,164 +181,222 @@ class MainmenuView:
             except Exception as e:
                 print(f"An error occurred: {e}")
 
+# every GameView line goes through this sink; see view_sink for the choices
+_sink = ConsoleSink()
+
+def set_sink(sink):
+    # returns the sink it replaces, flushed
+    global _sink
+    previous = _sink
+    previous.flush()
+    _sink = sink
+    return previous
+
+ACTIONS = ("Roll dice", "View map", "View player status", "View all players' status", "View next player")
+DEBUG_ACTIONS = ACTIONS + ("Debug options",)
+# the menu as printed, without and with the debug entry
+ACTION_MENU_LINES = tuple(("What would you like to do?",) + tuple(f"{i}. {option}" for i, option in enumerate(options, 1))
+                          for options in (ACTIONS, DEBUG_ACTIONS))
+
+def _show(event, *lines, **fields):
+    _sink.emit(event, lines, fields)
+
+# dice and chance draws when the controller does not pass the game's rng
+_rng = GameRng()
+
+# the map window of the board being played, kept so its lines stay cached
+_map_window = None
+
+def _window_for(squares):
+    global _map_window
+    if _map_window is None or _map_window.squares is not squares:
+        _map_window = MapWindow(squares)
+    return _map_window
+
+def _show_map_page(window, shown, start, heading):
+    lines, entries = window.page(shown, start)
+    if len(shown) > len(lines):
+        title = f"{heading}, {start + 1}-{start + len(lines)} of {len(shown)} squares:"
+    else:
+        title = f"{heading}:"
+    _show('map', title, *lines, squares=entries, total=len(shown))
+
+def _input(prompt=''):
+    # whatever the sink is holding is shown before waiting on the player
+    _sink.flush()
+    return input(prompt)
+
 class GameView:
     @staticmethod
     def show_round_start(round_num):
-        print(f"\n----------Round {round_num} Start!----------")
+        _show('round_start', f"\n----------Round {round_num} Start!----------", round_num=round_num)
 
     @staticmethod
     def show_round_end(round_num):
-        print(f"\n----------Round {round_num} End!----------")
+        _show('round_end', f"\n----------Round {round_num} End!----------", round_num=round_num)
+        _sink.flush()
 
     @staticmethod
     def choose_next_action():
-        print("Choose your next action:")
-        print("1. Start next round")
-        print("2. Save and quit")
+        _show('menu', "Choose your next action:", "1. Start next round", "2. Save and quit",
+              options=["Start next round", "Save and quit"])
         while True:
             try:
-                choice = int(input("Please enter the option number: "))
+                choice = int(_input("Please enter the option number: "))
                 if choice in [1, 2]:
                     return choice
                 else:
-                    print("Please enter a valid option number (1 or 2).")
+                    _show('invalid_input', "Please enter a valid option number (1 or 2).")
             except ValueError:
-                print("Invalid input, please enter a number.")
+                _show('invalid_input', "Invalid input, please enter a number.")
             except Exception as e:
-                print(f"An error occurred: {e}")
+                _show('error', f"An error occurred: {e}", error=str(e))
     
+    @staticmethod
+    def game_saved(save_file):
+        _show('saved', f"Game saved to {save_file}", save_file=save_file)
+
+    @staticmethod
+    def save_unchanged(save_file):
+        _show('save_unchanged', f"No changes since the last save to {save_file}", save_file=save_file)
+
+    @staticmethod
+    def save_failed(error):
+        _show('save_failed', f"The game could not be saved: {error}", error=error)
+
     @staticmethod
     def is_100_round():
-        print("Game Over! Round 100 has been reached!")
+        _show('round_limit', "Game Over! Round 100 has been reached!")
 
     @staticmethod
-    def show_player_turn(player_name, money, position, properties, in_jail, jail_turns):
-        print(f"\n{player_name}'s turn!")
-        print(f"Money: ${money}")
-        print(f"Position: Square {position}")
-        print(f"Properties owned: {', '.join(properties) if properties else 'None'}")
+    def show_player_turn(player_name, money, position, properties, in_jail, jail_turns, player_id=None):
+        # a new turn: what the last one produced goes out now
+        _sink.flush()
+        lines = [f"\n{player_name}'s turn!", f"Money: ${money}", f"Position: Square {position}",
+                 f"Properties owned: {', '.join(properties) if properties else 'None'}"]
         if in_jail:
-            print(f"In jail for {jail_turns} turns!")
+            lines.append(f"In jail for {jail_turns} turns!")
+        _show('player_turn', *lines, player=player_name, cash=money, position=position,
+              properties=list(properties), in_jail=in_jail, jail_turns=jail_turns)
 
     @staticmethod
     def player_action_menu(debug_mode=False):
-        print("What would you like to do?")
-        print("1. Roll dice")
-        print("2. View map")
-        print("3. View player status")
-        print("4. View all players' status")
-        print("5. View next player")
-        if debug_mode:
-            print("6. Debug options")
+        options = DEBUG_ACTIONS if debug_mode else ACTIONS
+        _show('menu', *ACTION_MENU_LINES[debug_mode], options=options)
         while True:
             try:
-                choice = int(input("Please enter the option number: "))
+                choice = int(_input("Please enter the option number: "))
                 if debug_mode and choice in [1, 2, 3, 4, 5, 6]:
                     return choice
                 elif not debug_mode and choice in [1, 2, 3, 4, 5]:
                     return choice
                 else:
-                    print("Please enter a valid option number.")
+                    _show('invalid_input', "Please enter a valid option number.")
             except ValueError:
-                print("Invalid input, please enter a number.")
+                _show('invalid_input', "Invalid input, please enter a number.")
             except Exception as e:
-                print(f"An error occurred: {e}")
+                _show('error', f"An error occurred: {e}", error=str(e))
     
     @staticmethod
-    def throw_the_dice():
-        dice1 = random.randint(1, 4)
-        dice2 = random.randint(1, 4)
-        print(f"You rolled {dice1} and {dice2}!")
+    def throw_the_dice(rng=None):
+        dice1, dice2 = (rng or _rng).roll()
+        _show('dice', f"You rolled {dice1} and {dice2}!", dice=[dice1, dice2])
         return dice1, dice2
 
     @staticmethod
     def reach_a_property(property_name, property_price, property_owner):
         try:
-            print(f"You reached {property_name}!")
+            _show('property', f"You reached {property_name}!", property=property_name,
+                  price=property_price, owner=property_owner or None)
             if not property_owner:
-                print(f"This property is unowned, priced at ${property_price}. Do you want to buy it? (y/n)")
+                _show('offer', f"This property is unowned, priced at ${property_price}. Do you want to buy it? (y/n)",
+                      property=property_name, price=property_price)
                 while True:
-                    choice = input().strip().lower()
+                    choice = _input().strip().lower()
                     if choice == 'y':
                         return True
                     elif choice == 'n':
                         return False
                     else:
-                        print("Invalid input, please enter 'y' or 'n'.")
+                        _show('invalid_input', "Invalid input, please enter 'y' or 'n'.")
             else:
-                print(f"This property is already owned by {property_owner}! You need to pay rent ${property_price}.")
+                _show('owned_property', f"This property is already owned by {property_owner}! You need to pay rent ${property_price}.",
+                      property=property_name, owner=property_owner)
                 return False
         except Exception as e:
-            print(f"An error occurred: {e}")
+            _show('error', f"An error occurred: {e}", error=str(e))
             return False
 
     @staticmethod
     def buy_success(property_name):
         try:
-            print(f"You successfully bought {property_name}!")
+            _show('buy', f"You successfully bought {property_name}!", property=property_name)
         except Exception as e:
-            print(f"An error occurred when showing the purchase success prompt: {e}")
+            _show('error', f"An error occurred when showing the purchase success prompt: {e}", error=str(e))
 
     @staticmethod
     def buy_fail(property_name):
         try:
-            print(f"Your funds are insufficient to buy {property_name}!")
+            _show('buy_fail', f"Your funds are insufficient to buy {property_name}!", property=property_name)
         except Exception as e:
-            print(f"An error occurred when showing the purchase failure prompt: {e}")
+            _show('error', f"An error occurred when showing the purchase failure prompt: {e}", error=str(e))
 
     @staticmethod
     def not_buy_property():
         try:
-            print("You chose not to buy this property.")
+            _show('not_buy', "You chose not to buy this property.")
         except Exception as e:
-            print(f"An error occurred when choosing not to buy the property: {e}")
+            _show('error', f"An error occurred when choosing not to buy the property: {e}", error=str(e))
 
     @staticmethod
     def pay_rent(player_name, owner_name, rent):
-        print(f"{player_name} paid rent ${rent} to {owner_name}.")
+        _show('rent', f"{player_name} paid rent ${rent} to {owner_name}.", player=player_name, owner=owner_name,
+              rent=rent)
 
     @staticmethod
     def reach_own_property(property_name):
-        print(f"You reached your property {property_name}.")
+        _show('own_property', f"You reached your property {property_name}.", property=property_name)
 
     @staticmethod
     def player_bankrupt(player_name):
-        print(f"{player_name} is bankrupt! All properties have been confiscated.")
+        _show('bankrupt', f"{player_name} is bankrupt! All properties have been confiscated.", player=player_name)
 
     @staticmethod
-    def reach_a_chance():
-        print("You reached a chance square!")
-        print("Drawing a chance card...")
-        amount = random.choice([i * 10 for i in range(-30, 21) if i != 0])
+    def reach_a_chance(rng=None):
+        amount = (rng or _rng).chance()
         if amount > 0:
-            print(f"Good luck! You received ${amount}!")
+            outcome = f"Good luck! You received ${amount}!"
         else:
-            print(f"Unlucky! You lost ${-amount}!")
+            outcome = f"Unlucky! You lost ${-amount}!"
+        _show('chance', "You reached a chance square!", "Drawing a chance card...", outcome, amount=amount)
         return amount
 
     @staticmethod
     def reach_a_jail():
-        print("You were sent to jail!")
+        _show('jail', "You were sent to jail!")
+
+    @staticmethod
+    def jail_not_found():
+        _show('jail_not_found', "未找到监狱方格，无法入狱。")
 
     @staticmethod
     def pass_go():
-        print("You passed the starting point and received $1500 salary!")
+        _show('pass_go', "You passed the starting point and received $1500 salary!", salary=1500)
 
     @staticmethod
     def pay_income_tax(tax):
-        print(f"You need to pay income tax ${tax}.")
+        _show('income_tax', f"You need to pay income tax ${tax}.", tax=tax)
 
     @staticmethod
     def no_effect_square(square_name):
-        print(f"You reached {square_name}, nothing happens here.")
+        _show('no_effect', f"You reached {square_name}, nothing happens here.", square=square_name)
 
     @staticmethod
     def in_jail_options():
         try:
-            print("You are in jail, you can choose:")
-            print("1. Roll dice to try to get double points out of jail")
-            print("2. Pay a $150 fine to get out of jail")
-            choice = input("Please enter the option number: ")
+            _show('menu', "You are in jail, you can choose:", "1. Roll dice to try to get double points out of jail",
+                  "2. Pay a $150 fine to get out of jail", options=["Roll dice", "Pay a $150 fine"])
+            choice = _input("Please enter the option number: ")
             if not choice.isdigit():
                 raise ValueError("Please enter a number option")
             choice = int(choice)
@@ -318,37 +404,39 @@ class GameView:
                 raise ValueError("Please enter a valid option number (1 or 2)")
             return choice
         except ValueError as e:
-            print(f"Invalid input: {e}")
+            _show('invalid_input', f"Invalid input: {e}")
             return 0
         except Exception as e:
-            print(f"An unknown error occurred: {e}")
+            _show('error', f"An unknown error occurred: {e}", error=str(e))
             return 0
 
     @staticmethod
     def release_from_jail():
-        print("Congratulations! You rolled double points and were immediately released from jail!")
+        _show('jail_release', "Congratulations! You rolled double points and were immediately released from jail!")
 
     @staticmethod
     def fail_to_release():
-        print("You did not roll double points, so you remain in jail.")
+        _show('jail_stay', "You did not roll double points, so you remain in jail.")
 
     @staticmethod
     def no_money_to_pay_fine():
-        print("Your funds are insufficient to pay the fine, so you cannot get out of jail.")
+        _show('fine_unpaid', "Your funds are insufficient to pay the fine, so you cannot get out of jail.")
 
     @staticmethod
     def invalid_choice():
-        print("Invalid choice, please enter again.")
+        _show('invalid_input', "Invalid choice, please enter again.")
 
     @staticmethod
     def show_player_states(player):
-        print(f"Player {player['name']} status:")
-        print(f"Money: ${player['cash']}")
-        print(f"Position: Square {player['position']}")
-        print(f"Properties: {', '.join(player.get('properties', [])) if player.get('properties') else 'None'}")
-        print(f"In jail: {'Yes' if player['in_jail'] else 'No'}")
+        lines = [f"Player {player['name']} status:", f"Money: ${player['cash']}",
+                 f"Position: Square {player['position']}",
+                 f"Properties: {', '.join(player.get('properties', [])) if player.get('properties') else 'None'}",
+                 f"In jail: {'Yes' if player['in_jail'] else 'No'}"]
         if player['in_jail']:
-            print(f"In jail for {player['jail_turns']} turns")
+            lines.append(f"In jail for {player['jail_turns']} turns")
+        _show('player_state', *lines, player=player['name'], cash=player['cash'], position=player['position'],
+              properties=list(player.get('properties') or []), in_jail=player['in_jail'],
+              jail_turns=player['jail_turns'])
 
     @staticmethod
     def show_all_players_states(players):
@@ -357,79 +445,112 @@ class GameView:
 
     @staticmethod
     def show_next_player(player_name):
-        print(f"Next player is {player_name}.")
-
-    @staticmethod
-    def show_map(squares):
-        print("Current map:")
-        for pos, square in squares.items():
-            print(f"Position {pos}: {square['name']} ({square['square_type']})")
+        _show('next_player', f"Next player is {player_name}.", player=player_name)
+
+    @staticmethod
+    def show_map(squares, position=None):
+        # a page around position; boards longer than a page can be paged,
+        # jumped in and filtered by square type or owner
+        window = _window_for(squares)
+        shown = window.positions
+        start = window.page_start(shown, position or 1)
+        heading = "Current map"
+        _show_map_page(window, shown, start, heading)
+        if len(shown) <= window.page_size:
+            return
+        while True:
+            choice = _input("n/p: next/previous page, a number: jump to position, /type or @owner: filter, "
+                            "/: whole map, Enter: back ").strip()
+            if not choice:
+                return
+            if choice in ('n', 'p'):
+                step = window.page_size if choice == 'n' else -window.page_size
+                start = max(0, min(start + step, len(shown) - window.page_size))
+            elif choice[0] in '/@':
+                if choice == '/':
+                    found, label = window.positions, "Current map"
+                elif choice[0] == '/':
+                    found, label = window.of_type(choice[1:]), f"{choice[1:]} squares"
+                else:
+                    found, label = window.owned_by(choice[1:]), f"Squares owned by {choice[1:]}"
+                if not found:
+                    _show('invalid_input', "No squares match.")
+                    continue
+                shown, heading, start = found, label, 0
+            else:
+                try:
+                    start = window.page_start(shown, int(choice))
+                except ValueError:
+                    _show('invalid_input', "Invalid input, please try again.")
+                    continue
+            _show_map_page(window, shown, start, heading)
 
     @staticmethod
     def show_game_over(winners):
-        print("\nGame Over!")
         if len(winners) > 1:
-            print(f"Draw! Winners: {', '.join(winners)}")
+            result = f"Draw! Winners: {', '.join(winners)}"
         else:
-            print(f"Congratulations {winners[0]}!")
+            result = f"Congratulations {winners[0]}!"
+        _show('game_over', "\nGame Over!", result, winners=list(winners))
+        _sink.flush()
 
     @staticmethod
     def choose_player_to_view(players):
-        print("Choose a player to view:")
-        for i, player in players.items():
-            print(f"{i}. {player['name']}")
+        _show('menu', "Choose a player to view:", *(f"{i}. {player['name']}" for i, player in players.items()),
+              options=[player['name'] for player in players.values()])
         while True:
             try:
-                choice = input("Enter player number: ").strip()
+                choice = _input("Enter player number: ").strip()
                 if choice in players:
                     return choice
                 else:
-                    print("Please enter a valid player number.")
+                    _show('invalid_input', "Please enter a valid player number.")
             except Exception as e:
-                print(f"An error occurred: {e}")
+                _show('error', f"An error occurred: {e}", error=str(e))
 
     @staticmethod
     def debug_action_menu():
-        print("\nDebug Options:")
-        print("1. Modify cash")
-        print("2. Move to specific position")
+        _show('menu', "\nDebug Options:", "1. Modify cash", "2. Move to specific position",
+              options=["Modify cash", "Move to specific position"])
         while True:
             try:
-                choice = int(input("Choose debug action: "))
+                choice = int(_input("Choose debug action: "))
                 if choice in [1, 2]:
                     return choice
-                print("Please enter a valid option number.")
+                _show('invalid_input', "Please enter a valid option number.")
             except ValueError:
-                print("Invalid input, please enter a number.")
+                _show('invalid_input', "Invalid input, please enter a number.")
 
     @staticmethod
     def debug_modify_cash():
         while True:
             try:
-                amount = int(input("Enter amount to add or subtract: "))
+                amount = int(_input("Enter amount to add or subtract: "))
                 return amount
             except ValueError:
-                print("Invalid input, please enter a number.")
+                _show('invalid_input', "Invalid input, please enter a number.")
 
     @staticmethod
     def debug_choose_position(map_size):
         while True:
             try:
-                position = int(input(f"Enter target position (1-{map_size}): "))
+                position = int(_input(f"Enter target position (1-{map_size}): "))
                 if 1 <= position <= map_size:
                     return position
-                print(f"Position must be between 1 and {map_size}.")
+                _show('invalid_input', f"Position must be between 1 and {map_size}.")
             except ValueError:
-                print("Invalid input, please enter a number.")
+                _show('invalid_input', "Invalid input, please enter a number.")
 
     @staticmethod
     def show_debug_mode_status(enabled):
-        print(f"Debug mode {'enabled' if enabled else 'disabled'}")
+        _show('debug_mode', f"Debug mode {'enabled' if enabled else 'disabled'}", enabled=enabled)
 
     @staticmethod
     def show_debug_bankrupt_status(player_name, is_bankrupt):
-        print(f"{player_name} is {'bankrupt' if is_bankrupt else 'not bankrupt'}")
+        _show('debug_bankrupt', f"{player_name} is {'bankrupt' if is_bankrupt else 'not bankrupt'}",
+              player=player_name, bankrupt=is_bankrupt)
 
     @staticmethod
     def show_debug_jail_status(player_name, in_jail):
-        print(f"{player_name} is {'in jail' if in_jail else 'not in jail'}")
+        _show('debug_jail', f"{player_name} is {'in jail' if in_jail else 'not in jail'}",
+              player=player_name, in_jail=in_jail)
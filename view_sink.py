@@ -0,0 +1,62 @@
+import json
+import sys
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+# Where GameView output goes. A view method reports one event: a name, the
+# lines a person would read, and the same facts as fields. Sinks keep what
+# they need of that; flush() is called at every turn boundary and before the
+# view reads input, so buffered text is never behind a prompt.
+
+
+class ConsoleSink:
+    # the default: each line printed as it is produced
+    def emit(self, event, lines, fields):
+        for line in lines:
+            print(line)
+
+    def flush(self):
+        pass
+
+
+class BufferedSink:
+    # lines are kept and written in one go at the next flush
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.lines = []
+
+    def emit(self, event, lines, fields):
+        self.lines.extend(lines)
+
+    def flush(self):
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write('\n'.join(self.lines) + '\n')
+            stream.flush()
+            self.lines = []
+
+
+class NullSink:
+    # for runs whose output nobody reads
+    def emit(self, event, lines, fields):
+        pass
+
+    def flush(self):
+        pass
+
+
+class JsonLinesSink:
+    # one JSON object per event, {"event": name, **fields}, for other programs
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.records = []
+
+    def emit(self, event, lines, fields):
+        self.records.append(_encode({'event': event, **fields}))
+
+    def flush(self):
+        if self.records:
+            stream = self.stream or sys.stdout
+            stream.write('\n'.join(self.records) + '\n')
+            stream.flush()
+            self.records = []